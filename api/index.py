@@ -1,14 +1,9 @@
-import os
 import sys
 from pathlib import Path
 
-# Add the project root to Python path for Vercel
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
-# Also add the visualizer directory for module imports
-visualizer_dir = project_root / "visualizer"
-sys.path.insert(0, str(visualizer_dir))
+# Vercel runs this file directly; make the project root importable so the
+# visualizer package (and its relative imports) resolve
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import the Flask app
 from visualizer.app import create_app
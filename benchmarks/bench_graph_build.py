@@ -0,0 +1,73 @@
+"""
+Graph build scaling benchmark.
+
+Builds the graph from synthetic corpora at several scales and reports the
+time per node. A linear builder keeps the per-node cost roughly flat; the
+script exits non-zero when the cost at the largest scale exceeds
+--max-ratio times the cost at the smallest one.
+
+    python benchmarks/bench_graph_build.py --scales 1 10 50 100
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.synthetic_corpus import generate_corpus
+from visualizer import graph_builder
+
+
+def time_build(root_data, components, subcomponents, repeat):
+    best = float("inf")
+    graph = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        graph = graph_builder.build_graph_data(root_data, components, subcomponents)
+        best = min(best, time.perf_counter() - start)
+    return best, graph
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ratio", type=float, default=2.0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    results = []
+    print(f"{'scale':>6} {'subcomps':>9} {'nodes':>9} {'links':>9} {'build ms':>10} {'us/node':>8}")
+    for scale in args.scales:
+        root_data, components, subcomponents = generate_corpus(scale)
+        seconds, graph = time_build(root_data, components, subcomponents, args.repeat)
+        nodes = len(graph["nodes"])
+        result = {
+            "scale": scale,
+            "subcomponents": len(subcomponents),
+            "nodes": nodes,
+            "links": len(graph["links"]),
+            "build_ms": seconds * 1000,
+            "us_per_node": seconds * 1e6 / nodes,
+        }
+        results.append(result)
+        print(f"{scale:>6g} {result['subcomponents']:>9} {nodes:>9} {result['links']:>9} "
+              f"{result['build_ms']:>10.1f} {result['us_per_node']:>8.2f}")
+
+    ratio = results[-1]["us_per_node"] / results[0]["us_per_node"]
+    print(f"per-node cost ratio (largest/smallest scale): {ratio:.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "graph_build", "results": results, "ratio": ratio}, f, indent=2)
+
+    return 0 if ratio <= args.max_ratio else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+JSON loader microbenchmark.
+
+Loads every file of the shipped corpus (ai-alignment.json, components/ and
+subcomponents/) with the current node_details_helper.load_json_file and
+with the previous text-mode loader, which tried up to four encodings per
+file, and reports the time per pass. Both loaders must return the same data
+for every file the legacy loader can parse.
+
+    python benchmarks/bench_json_loader.py --repeat 20
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from visualizer import node_details_helper
+
+
+def legacy_load_json_file(file_path):
+    """The loader this benchmark replaces, minus its logging: text reads in up to four encodings."""
+    normalized_path = os.path.normpath(file_path)
+    if not os.path.isfile(normalized_path):
+        return None
+    for encoding in ['utf-8-sig', 'utf-8', 'latin1', 'cp1252']:
+        try:
+            with open(normalized_path, 'r', encoding=encoding) as f:
+                content = f.read().strip()
+                if not content:
+                    continue
+                if content.startswith('\ufeff'):
+                    content = content[1:]
+                content = content.strip()
+                if not content.startswith('{') and not content.startswith('['):
+                    continue
+                try:
+                    return json.loads(content)
+                except json.JSONDecodeError:
+                    continue
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def corpus_files():
+    paths = node_details_helper.setup_paths()
+    return (
+        [paths['ROOT_JSON_FILE']]
+        + sorted(glob.glob(os.path.join(paths['COMPONENTS_DIR'], "*.json")))
+        + sorted(glob.glob(os.path.join(paths['SUBCOMPONENTS_DIR'], "*.json")))
+    )
+
+
+def time_loader(loader, files, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in files:
+            loader(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.CRITICAL)
+    files = corpus_files()
+    # Files the legacy loader could not parse either are not compared
+    mismatched = []
+    for path in files:
+        expected = legacy_load_json_file(path)
+        if expected is not None and node_details_helper.load_json_file(path) != expected:
+            mismatched.append(path)
+    parser_name = "json" if node_details_helper.json_loads is json.loads else "orjson"
+    total_bytes = sum(os.path.getsize(path) for path in files)
+
+    loaders = {
+        "legacy": legacy_load_json_file,
+        "current": node_details_helper.load_json_file,
+    }
+    results = {}
+    print(f"{len(files)} files, {total_bytes / 1e6:.2f} MB, parser: {parser_name}")
+    print(f"{'loader':>8} {'ms/pass':>9} {'MB/s':>8}")
+    for name, loader in loaders.items():
+        seconds = time_loader(loader, files, args.repeat)
+        results[name] = {"ms_per_pass": seconds * 1000, "mb_per_second": total_bytes / 1e6 / seconds}
+        print(f"{name:>8} {seconds * 1000:>9.2f} {results[name]['mb_per_second']:>8.1f}")
+
+    speedup = results["legacy"]["ms_per_pass"] / results["current"]["ms_per_pass"]
+    print(f"speedup: {speedup:.2f}x")
+    if mismatched:
+        print(f"loaders disagree on {len(mismatched)} files, e.g. {mismatched[0]}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "benchmark": "json_loader",
+                "files": len(files),
+                "bytes": total_bytes,
+                "parser": parser_name,
+                "results": results,
+                "speedup": speedup,
+                "mismatched": mismatched,
+            }, f, indent=2)
+
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Cold start profile.
+
+Starts fresh interpreters the way a serverless container does, imports the
+WSGI entry point (api/index.py), then sends the first request(s). Reports
+the median over --runs of the import time, the time to each first
+response and the total. Results can be written as JSON and compared with a
+recorded baseline; the script exits non-zero when the total cold start is
+more than --max-regression times the baseline's.
+
+    python benchmarks/bench_startup.py --output startup-baseline.json
+    python benchmarks/bench_startup.py --baseline startup-baseline.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Runs in the child interpreter; prints one JSON object of timings in ms
+PROFILE_SCRIPT = """
+import json, logging, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {api_dir!r})
+import index
+imported = time.perf_counter()
+logging.disable(logging.CRITICAL)
+client = index.app.test_client()
+timings = {{"import_ms": (imported - start) * 1000}}
+previous = imported
+for url in {urls!r}:
+    response = client.get(url)
+    now = time.perf_counter()
+    timings[url] = {{"status": response.status_code, "ms": (now - previous) * 1000}}
+    previous = now
+timings["total_ms"] = (previous - start) * 1000
+print(json.dumps(timings))
+"""
+
+
+def profile_once(urls):
+    script = PROFILE_SCRIPT.format(api_dir=os.path.join(PROJECT_ROOT, "api"), urls=urls)
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=PROJECT_ROOT, check=True,
+        capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--urls", nargs="+", default=["/api/health/live", "/api/graph", "/api/details/value-learning"])
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    runs = [profile_once(args.urls) for _ in range(args.runs)]
+    result = {
+        "import_ms": statistics.median(run["import_ms"] for run in runs),
+        "first_requests": {
+            url: {
+                "status": runs[-1][url]["status"],
+                "ms": statistics.median(run[url]["ms"] for run in runs),
+            }
+            for url in args.urls
+        },
+        "total_ms": statistics.median(run["total_ms"] for run in runs),
+    }
+
+    print(f"import: {result['import_ms']:.1f} ms")
+    for url, timing in result["first_requests"].items():
+        print(f"first {url} ({timing['status']}): {timing['ms']:.1f} ms")
+    print(f"total cold start: {result['total_ms']:.1f} ms (median of {args.runs})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": "startup", "runs": args.runs, **result}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        ratio = result["total_ms"] / baseline["total_ms"]
+        print(f"baseline total {baseline['total_ms']:.1f} ms -> {result['total_ms']:.1f} ms ({ratio:.2f}x)")
+        if ratio > args.max_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+End-to-end benchmark suite for the graph and details paths.
+
+For each scale a synthetic corpus is written to a temporary directory and
+served through AI_ALIGNMENT_DATA_DIR. The suite measures:
+
+    functions  corpus load, build_graph_data (cold and with reused fragments),
+               find_nested_node and get_node_details (cold and warm)
+    routes     first-request (cold) latency, warm p50/p95 and sequential
+               throughput through the Flask test client
+    memory     peak traced allocation of a cold graph + details request, and
+               the process's peak RSS
+
+Results are written as JSON. With --baseline, every latency (keys ending in
+"_ms") is compared with a previous results file and the script exits
+non-zero when one is more than --max-regression times slower.
+
+    python benchmarks/bench_suite.py --scales 1 5 --output bench-results.json
+    python benchmarks/bench_suite.py --baseline bench-results.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.synthetic_corpus import write_corpus
+from visualizer import graph_builder, node_details_helper
+from visualizer.app import AIAlignmentVisualizer
+
+
+def elapsed_ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def cold_cache():
+    """Forget every parsed file and derived structure, as in a fresh process."""
+    node_details_helper.CORPUS_CACHE.clear()
+
+
+def new_visualizer():
+    visualizer = AIAlignmentVisualizer()
+    # The suite sends far more requests from one client than the limiter allows
+    visualizer.rate_limiter.limit = float("inf")
+    return visualizer
+
+
+def bench_functions(sample_ids, repeat):
+    results = {}
+    cold_cache()
+    start = time.perf_counter()
+    root_data = node_details_helper.get_root_data()
+    components = node_details_helper.get_components()
+    subcomponents = node_details_helper.get_subcomponents()
+    results["corpus_load_ms"] = elapsed_ms(start)
+
+    fragments = graph_builder.FragmentCache()
+    start = time.perf_counter()
+    graph = graph_builder.build_graph_data(root_data, components, subcomponents, fragments=fragments)
+    results["graph_build_cold_ms"] = elapsed_ms(start)
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        graph_builder.build_graph_data(root_data, components, subcomponents, fragments=fragments)
+        warm.append(elapsed_ms(start))
+    results["graph_build_warm_ms"] = statistics.median(warm)
+    results["nodes"] = len(graph["nodes"])
+    results["links"] = len(graph["links"])
+
+    start = time.perf_counter()
+    for node_id in sample_ids:
+        node_details_helper.find_nested_node(node_id, subcomponents)
+    results["find_nested_node_ms"] = elapsed_ms(start) / len(sample_ids)
+
+    cold_cache()
+    start = time.perf_counter()
+    node_details_helper.get_node_details(sample_ids[0])
+    results["node_details_cold_ms"] = elapsed_ms(start)
+    start = time.perf_counter()
+    for node_id in sample_ids:
+        node_details_helper.get_node_details(node_id)
+    results["node_details_warm_ms"] = elapsed_ms(start) / len(sample_ids)
+    return results
+
+
+def bench_routes(routes, repeat, requests):
+    results = {}
+    for name, (url, headers) in routes.items():
+        cold_cache()
+        client = new_visualizer().app.test_client()
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        cold = elapsed_ms(start)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+
+        warm = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            client.get(url, headers=headers)
+            warm.append(elapsed_ms(start))
+
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(url, headers=headers)
+        seconds = time.perf_counter() - start
+
+        results[name] = {
+            "cold_ms": cold,
+            "warm_p50_ms": percentile(warm, 0.5),
+            "warm_p95_ms": percentile(warm, 0.95),
+            "requests_per_second": requests / seconds,
+            "bytes": len(response.data),
+        }
+    return results
+
+
+def bench_memory(detail_id):
+    cold_cache()
+    client = new_visualizer().app.test_client()
+    tracemalloc.start()
+    try:
+        client.get("/api/graph")
+        client.get(f"/api/details/{detail_id}")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"cold_peak_traced_mb": peak / 1e6}
+
+
+def run_scale(scale, repeat, requests, seed):
+    with tempfile.TemporaryDirectory(prefix="ai-alignment-bench-") as directory:
+        write_corpus(directory, scale, seed)
+        os.environ["AI_ALIGNMENT_DATA_DIR"] = directory
+        os.environ["AI_ALIGNMENT_CACHE_DIR"] = os.path.join(directory, "cache")
+        try:
+            cold_cache()
+            subcomponents = node_details_helper.get_subcomponents()
+            nested_ids = sorted(node_details_helper.build_node_index(subcomponents))
+            sample_ids = random.Random(seed).sample(nested_ids, min(200, len(nested_ids)))
+            # Routes only accept ids without dots, which subcomponent ids are
+            subcomp_id = sorted(subcomponents)[0]
+
+            routes = {
+                "graph": ("/api/graph", {}),
+                "graph_gzip": ("/api/graph", {"Accept-Encoding": "gzip"}),
+                "graph_columns": ("/api/graph", {"Accept": "application/vnd.ai-alignment.graph-columns"}),
+                "details": (f"/api/details/{subcomp_id}", {}),
+                "hierarchy_path": (f"/api/hierarchy-path/{subcomp_id}", {}),
+                "search": ("/api/search?q=value%20oversight", {}),
+                "health_ready": ("/api/health/ready", {}),
+            }
+            result = {"scale": scale, "subcomponents": len(subcomponents)}
+            result["functions"] = bench_functions(sample_ids, repeat)
+            result["routes"] = bench_routes(routes, repeat, requests)
+            result["memory"] = bench_memory(subcomp_id)
+            return result
+        finally:
+            os.environ.pop("AI_ALIGNMENT_DATA_DIR", None)
+            os.environ.pop("AI_ALIGNMENT_CACHE_DIR", None)
+            cold_cache()
+
+
+def latencies(result, prefix=""):
+    """Flatten every *_ms value of a scale's result into {dotted.key: ms}."""
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(latencies(value, f"{prefix}{key}."))
+        elif key.endswith("_ms"):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(results, baseline, max_regression):
+    """Return [(scale, metric, baseline ms, current ms)] for metrics slower than allowed."""
+    previous = {str(result["scale"]): latencies(result) for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(str(result["scale"]))
+        if before is None:
+            continue
+        for metric, value in latencies(result).items():
+            # Sub-millisecond timings are too noisy to gate on
+            if metric in before and value > max(before[metric], 1.0) * max_regression:
+                regressions.append((result["scale"], metric, before[metric], value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 5])
+    parser.add_argument("--repeat", type=int, default=20, help="Warm samples per measurement")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route for throughput")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    results = []
+    for scale in args.scales:
+        result = run_scale(scale, args.repeat, args.requests, args.seed)
+        results.append(result)
+        functions = result["functions"]
+        print(f"scale {scale:g}: {result['subcomponents']} subcomponents, {functions['nodes']} nodes, "
+              f"load {functions['corpus_load_ms']:.1f} ms, build {functions['graph_build_cold_ms']:.1f} ms cold / "
+              f"{functions['graph_build_warm_ms']:.2f} ms warm, peak {result['memory']['cold_peak_traced_mb']:.1f} MB")
+        print(f"  {'route':<16} {'cold ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>9} {'bytes':>10}")
+        for name, route in result["routes"].items():
+            print(f"  {name:<16} {route['cold_ms']:>9.1f} {route['warm_p50_ms']:>8.2f} {route['warm_p95_ms']:>8.2f} "
+                  f"{route['requests_per_second']:>9.0f} {route['bytes']:>10}")
+
+    report = {
+        "benchmark": "suite",
+        "created": time.time(),
+        "python": platform.python_version(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for scale, metric, before, after in regressions:
+            print(f"REGRESSION scale {scale:g} {metric}: {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Synthetic corpus generator for benchmarks.
+
+Produces root/component/subcomponent data with the same schema as the real
+corpus (capabilities -> functions -> specifications -> integration ->
+techniques -> applications -> inputs/outputs). At scale 1 the node count is
+close to today's corpus; scale N multiplies the number of components and
+subcomponents by N.
+"""
+
+import json
+import os
+import random
+
+COMPONENTS_PER_SCALE = 5
+SUBCOMPONENTS_PER_COMPONENT = 4
+
+
+def _text(rng, words=12):
+    vocabulary = ("alignment", "oversight", "value", "model", "safety", "signal", "human",
+                  "feedback", "policy", "monitoring", "verification", "interpretability",
+                  "preference", "governance", "constraint", "behavior", "evaluation", "risk")
+    return " ".join(rng.choice(vocabulary) for _ in range(words)).capitalize() + "."
+
+
+def _literature(rng):
+    return [f"Author{rng.randint(1, 500)} et al. ({rng.randint(2000, 2025)})" for _ in range(2)]
+
+
+def make_subcomponent(subcomp_id, parent_id, component_ids, rng, capabilities=4, functions=2):
+    """Build one subcomponent dict with a full nested hierarchy."""
+    caps = []
+    for c in range(capabilities):
+        cap_id = f"{subcomp_id}.cap-{c}"
+        funcs = []
+        for f in range(functions):
+            func_id = f"{cap_id}.fn-{f}"
+            spec_id = f"{func_id}.spec"
+            integration_id = f"{spec_id}.integration"
+            technique_id = f"{integration_id}.technique"
+            applications = []
+            for a in range(1 + (c + f) % 2):
+                app_id = f"{technique_id}.app-{a}"
+                applications.append({
+                    "id": app_id,
+                    "name": f"Application {a}",
+                    "type": "application",
+                    "description": _text(rng),
+                    "parent": technique_id,
+                    "inputs": [{"id": f"{app_id}.in-{i}", "name": f"Input {i}", "description": _text(rng, 6),
+                                "data_type": "object", "constraints": _text(rng, 4)} for i in range(3)],
+                    "outputs": [{"id": f"{app_id}.out-{o}", "name": f"Output {o}", "description": _text(rng, 6),
+                                 "data_type": "object", "interpretation": _text(rng, 4)} for o in range(2)],
+                })
+            funcs.append({
+                "id": func_id,
+                "name": f"Function {f}",
+                "description": _text(rng),
+                "implements_component_functions": [f"{rng.choice(component_ids)}.function"],
+                "type": "function",
+                "parent": cap_id,
+                "supported_by_literature": _literature(rng),
+                "specifications": [{
+                    "id": spec_id,
+                    "name": "Specification",
+                    "description": _text(rng),
+                    "type": "specification",
+                    "parent": func_id,
+                    "requirements": [_text(rng, 6)],
+                    "integration": {
+                        "id": integration_id,
+                        "name": "Integration",
+                        "description": _text(rng),
+                        "type": "integration",
+                        "parent": spec_id,
+                        "techniques": [{
+                            "id": technique_id,
+                            "name": "Technique",
+                            "type": "technique",
+                            "description": _text(rng),
+                            "parent": integration_id,
+                            "applications": applications,
+                        }],
+                    },
+                }],
+            })
+        caps.append({
+            "id": cap_id,
+            "name": f"Capability {c}",
+            "description": _text(rng),
+            "implements_component_capabilities": [f"{parent_id}.capability"],
+            "type": "capability",
+            "parent": subcomp_id,
+            "functions": funcs,
+            "supported_by_literature": _literature(rng),
+        })
+
+    return {
+        "id": subcomp_id,
+        "name": subcomp_id.replace("-", " ").title(),
+        "description": _text(rng, 20),
+        "type": "subcomponent",
+        "parent": parent_id,
+        "capabilities": caps,
+        "cross_connections": [{
+            "source_id": f"{subcomp_id}.cap-0",
+            "target_id": f"{subcomp_id}.cap-{capabilities - 1}",
+            "type": "complements",
+            "description": _text(rng, 8),
+        }],
+        "literature": {"references": _literature(rng)},
+    }
+
+
+def generate_corpus(scale=1, seed=0):
+    """Return (root_data, components, subcomponents) dicts for the given scale."""
+    rng = random.Random(seed)
+    component_ids = [f"component-{i}" for i in range(max(1, int(COMPONENTS_PER_SCALE * scale)))]
+
+    root_data = {
+        "id": "ai-alignment",
+        "name": "AI Alignment",
+        "description": _text(rng, 20),
+        "type": "component_group",
+        "components": [{"id": cid, "name": cid.title(), "description": _text(rng)} for cid in component_ids],
+    }
+
+    components = {}
+    subcomponents = {}
+    for index, component_id in enumerate(component_ids):
+        sub_ids = [f"{component_id}-sub-{s}" for s in range(SUBCOMPONENTS_PER_COMPONENT)]
+        components[component_id] = {
+            "id": component_id,
+            "name": component_id.title(),
+            "description": _text(rng, 20),
+            "type": "component",
+            "parent": "ai-alignment",
+            "subcomponents": [{"id": sid} for sid in sub_ids],
+            "relationships": [{
+                "id": component_ids[(index + 1) % len(component_ids)],
+                "relationship_type": "bidirectional",
+                "description": _text(rng, 8),
+            }],
+        }
+        for sub_id in sub_ids:
+            subcomponents[sub_id] = make_subcomponent(sub_id, component_id, component_ids, rng)
+
+    return root_data, components, subcomponents
+
+
+def write_corpus(directory, scale=1, seed=0):
+    """Write a synthetic corpus laid out like the repository root; returns the directory."""
+    root_data, components, subcomponents = generate_corpus(scale, seed)
+    os.makedirs(os.path.join(directory, "components"), exist_ok=True)
+    os.makedirs(os.path.join(directory, "subcomponents"), exist_ok=True)
+    with open(os.path.join(directory, "ai-alignment.json"), "w", encoding="utf-8") as f:
+        json.dump(root_data, f, indent=2)
+    for folder, items in (("components", components), ("subcomponents", subcomponents)):
+        for item_id, data in items.items():
+            with open(os.path.join(directory, folder, f"{item_id}.json"), "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+    return directory
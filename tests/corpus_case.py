@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.synthetic_corpus import write_corpus
+from visualizer import node_details_helper
+from visualizer.app import AIAlignmentVisualizer
+
+
+class CorpusTestCase(unittest.TestCase):
+    """Runs each test against its own small synthetic corpus, with a cold corpus cache."""
+
+    scale = 0.4  # two components, eight subcomponents
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        write_corpus(self.directory.name, self.scale)
+        environ = mock.patch.dict(os.environ, {
+            "AI_ALIGNMENT_DATA_DIR": self.directory.name,
+            "AI_ALIGNMENT_CACHE_DIR": os.path.join(self.directory.name, "cache"),
+        })
+        environ.start()
+        self.addCleanup(environ.stop)
+        node_details_helper.CORPUS_CACHE.clear()
+        self.addCleanup(node_details_helper.CORPUS_CACHE.clear)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, *parts):
+        return os.path.join(self.directory.name, *parts)
+
+    def edit(self, relative_path, change):
+        """Apply change to the parsed file, write it back and move its mtime on."""
+        path = self.path(relative_path)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        change(data)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def make_visualizer(self):
+        visualizer = AIAlignmentVisualizer()
+        visualizer.rate_limiter.limit = float("inf")
+        return visualizer
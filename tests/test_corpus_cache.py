@@ -0,0 +1,156 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from visualizer.corpus_cache import CorpusCache
+
+
+def parse(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def in_thread(function):
+    """Run function on another thread, as a request would, and return its result."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(function()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+class FileCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = CorpusCache(parse)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as f:
+            json.dump(data, f)
+        # Same-size rewrites within one mtime tick would otherwise look unchanged
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        return path
+
+    def load_all(self):
+        """Memoized {file name: data} for the directory, the way the corpus getters read it."""
+        def build():
+            paths = self.cache.list_files(self.directory.name)
+            return {os.path.basename(path): data for path, data in self.cache.load_many(paths).items()}
+        return self.cache.memoize("all", build)
+
+
+class InvalidationTest(FileCacheTest):
+    def test_files_are_parsed_once(self):
+        path = self.write("a.json", {"n": 1})
+        self.assertIs(self.cache.load(path), self.cache.load(path))
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 1))
+
+    def test_changed_file_rebuilds_derived_values(self):
+        self.write("a.json", {"n": 1})
+        first = self.load_all()
+        self.assertIs(self.load_all(), first)
+        self.write("a.json", {"n": 2})
+        self.assertEqual(self.load_all(), {"a.json": {"n": 2}})
+        self.assertEqual(self.cache.reloads, 1)
+
+    def test_added_and_removed_files_rebuild_derived_values(self):
+        self.write("a.json", {"n": 1})
+        self.load_all()
+        self.write("b.json", {"n": 2})
+        self.assertEqual(sorted(self.load_all()), ["a.json", "b.json"])
+        os.remove(os.path.join(self.directory.name, "a.json"))
+        self.assertEqual(sorted(self.load_all()), ["b.json"])
+
+    def test_primed_builder_is_used_until_a_file_changes(self):
+        path = self.write("a.json", {"n": 1})
+        self.cache.prime([path], {(self.directory.name, "*.json"): [path]}, {"all": lambda: "from snapshot"})
+        self.assertEqual(self.load_all(), "from snapshot")
+        self.assertEqual(self.cache.stats()["files"], 0)
+        self.write("a.json", {"n": 2})
+        self.assertEqual(self.load_all(), {"a.json": {"n": 2}})
+
+
+class RequestRevalidationTest(FileCacheTest):
+    def test_changes_are_checked_once_per_request(self):
+        self.write("a.json", {"n": 1})
+        self.cache.begin_request()
+        first = self.load_all()
+        self.write("a.json", {"n": 2})
+        # Within the request the change is not looked for
+        self.assertIs(self.load_all(), first)
+        self.cache.end_request()
+        self.assertEqual(self.load_all(), {"a.json": {"n": 2}})
+
+    def test_next_request_sees_changes(self):
+        self.write("a.json", {"n": 1})
+        self.cache.begin_request()
+        self.load_all()
+        self.cache.end_request()
+        self.write("a.json", {"n": 2})
+        self.cache.begin_request()
+        self.assertEqual(self.load_all(), {"a.json": {"n": 2}})
+        self.cache.end_request()
+
+    def test_other_threads_keep_revalidating(self):
+        self.write("a.json", {"n": 1})
+        self.cache.begin_request()
+        self.load_all()
+        self.write("a.json", {"n": 2})
+        self.assertEqual(in_thread(self.load_all), {"a.json": {"n": 2}})
+        self.cache.end_request()
+
+
+class PublishedModeTest(FileCacheTest):
+    def test_requests_get_published_values_until_the_next_rebuild(self):
+        self.write("a.json", {"n": 1})
+        self.cache.rebuild(self.load_all)
+        first = in_thread(self.load_all)
+        self.assertEqual(first, {"a.json": {"n": 1}})
+        self.write("a.json", {"n": 2})
+        self.assertIs(in_thread(self.load_all), first)
+        version = self.cache.rebuild(self.load_all)
+        self.assertEqual(self.cache.published_version, version)
+        self.assertEqual(in_thread(self.load_all), {"a.json": {"n": 2}})
+
+
+class PublishTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = CorpusCache(parse)
+
+    def test_rebuild_publishes_only_what_it_built(self):
+        in_thread(lambda: self.cache.memoize("request", lambda: "built by a request"))
+        self.cache.rebuild(lambda: self.cache.memoize("warm", lambda: "built by rebuild"))
+        self.assertEqual(self.cache._published[1], {"warm": "built by rebuild"})
+
+    def test_request_does_not_replace_a_rebuild_value(self):
+        started, stored = threading.Event(), threading.Event()
+
+        def slow_request_build():
+            started.set()
+            stored.wait()
+            return "without layout"
+
+        # A request starts building before the rebuild and stores after it
+        request = threading.Thread(target=lambda: self.cache.memoize("graph", slow_request_build))
+        request.start()
+        started.wait()
+
+        def warm():
+            self.cache.memoize("graph", lambda: "with layout")
+            stored.set()
+            request.join()
+
+        self.cache.rebuild(warm)
+        self.assertEqual(self.cache._published[1], {"graph": "with layout"})
+        self.assertEqual(self.cache._derived["graph"][1], "with layout")
+
+
+if __name__ == "__main__":
+    unittest.main()
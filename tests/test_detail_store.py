@@ -0,0 +1,140 @@
+import json
+import os
+import stat
+import tempfile
+import unittest
+
+from corpus_case import CorpusTestCase
+from visualizer import detail_store, node_details_helper
+
+SUBCOMPONENT_ID = "component-0-sub-1"
+DETAILS = {"a": {"id": "a", "name": "Café"}, "b": {"id": "b", "items": [1, 2]}}
+
+
+def decoded(store, node_id):
+    return json.loads(bytes(store.get(node_id)))
+
+
+class DetailStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store_dir = os.path.join(self.directory.name, "cache")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_in_memory_round_trip(self):
+        index, data = detail_store.encode_details(DETAILS)
+        store = detail_store.DetailStore(data, index)
+        self.assertEqual(len(store), 2)
+        self.assertIn("a", store)
+        self.assertEqual(decoded(store, "a"), DETAILS["a"])
+        self.assertIsNone(store.get("c"))
+
+    def test_shared_store_round_trip(self):
+        store = detail_store.build_shared_store(self.store_dir, DETAILS)
+        self.assertIsInstance(store.get("b"), memoryview)
+        self.assertEqual({node_id: decoded(store, node_id) for node_id in DETAILS}, DETAILS)
+        reopened = detail_store.DetailStore.open(store.path)
+        self.assertEqual(decoded(reopened, "a"), DETAILS["a"])
+
+    def test_same_details_reuse_the_file(self):
+        first = detail_store.build_shared_store(self.store_dir, DETAILS)
+        written = os.stat(first.path).st_mtime_ns
+        second = detail_store.build_shared_store(self.store_dir, dict(DETAILS), previous=first.path)
+        self.assertEqual(second.path, first.path)
+        self.assertEqual(os.stat(second.path).st_mtime_ns, written)
+
+    def test_new_details_replace_the_previous_file(self):
+        first = detail_store.build_shared_store(self.store_dir, DETAILS)
+        second = detail_store.build_shared_store(self.store_dir, {"a": {"id": "a"}}, previous=first.path)
+        self.assertNotEqual(second.path, first.path)
+        self.assertFalse(os.path.exists(first.path))
+        # Mappings of the removed file stay readable
+        self.assertEqual(decoded(first, "b"), DETAILS["b"])
+        self.assertEqual(os.listdir(self.store_dir), [os.path.basename(second.path)])
+
+    def test_damaged_file_is_rewritten(self):
+        first = detail_store.build_shared_store(self.store_dir, DETAILS)
+        path = first.path
+        del first
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 1)
+        self.assertEqual(decoded(detail_store.build_shared_store(self.store_dir, DETAILS), "b"), DETAILS["b"])
+
+    def test_directory_is_private(self):
+        store = detail_store.build_shared_store(self.store_dir, DETAILS)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(store.path)).st_mode), 0o700)
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "POSIX permissions")
+    def test_shared_directory_is_refused(self):
+        os.makedirs(self.store_dir)
+        os.chmod(self.store_dir, 0o777)
+        with self.assertRaises(detail_store.DetailStoreError):
+            detail_store.build_shared_store(self.store_dir, DETAILS)
+
+    def test_other_files_are_not_opened(self):
+        path = os.path.join(self.directory.name, "other.bin")
+        with open(path, "wb") as f:
+            f.write(b"not a detail store")
+        with self.assertRaises(detail_store.DetailStoreError):
+            detail_store.DetailStore.open(path)
+
+
+class DetailRoutesTest(CorpusTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self.make_visualizer().app.test_client()
+
+    def get(self, url):
+        response = self.client.get(url)
+        # Servers close responses once sent; a missing store is built then
+        response.get_data()
+        response.close()
+        return response
+
+    def store_is_ready(self):
+        return node_details_helper.get_ready_detail_store() is not None
+
+    def test_store_is_built_after_the_first_response(self):
+        first = self.get(f"/api/details/{SUBCOMPONENT_ID}")
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(self.store_is_ready())
+        second = self.get(f"/api/details/{SUBCOMPONENT_ID}")
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual(second.get_json()["id"], SUBCOMPONENT_ID)
+
+    def test_requests_do_not_build_the_store(self):
+        response = self.client.get("/api/details/component-0")
+        self.assertEqual(response.get_json()["id"], "component-0")
+        self.assertFalse(self.store_is_ready())
+        response.close()
+
+    def test_unknown_node_with_and_without_store(self):
+        for _ in range(2):
+            response = self.get("/api/details/no-such-node")
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.get_json()["id"], "no-such-node")
+        self.assertTrue(self.store_is_ready())
+
+    def test_root_details(self):
+        for _ in range(2):
+            self.assertEqual(self.get("/api/root").get_json()["id"], "ai-alignment")
+
+    def test_batch_with_and_without_store(self):
+        url = f"/api/details?ids=component-0,{SUBCOMPONENT_ID},no-such-node"
+        first = self.get(url).get_json()
+        self.assertEqual(sorted(first["details"]), ["component-0", SUBCOMPONENT_ID])
+        self.assertEqual(first["not_found"], ["no-such-node"])
+        self.assertTrue(self.store_is_ready())
+        self.assertEqual(self.get(url).get_json(), first)
+
+    def test_store_is_rebuilt_after_an_edit(self):
+        self.get("/api/details/component-0")
+        self.edit("components/component-0.json", lambda data: data.update(name="Renamed"))
+        self.assertEqual(self.get("/api/details/component-0").get_json()["name"], "Renamed")
+        self.assertEqual(self.get("/api/details/component-0").get_json()["name"], "Renamed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from collections import Counter
+
+from visualizer import graph_builder
+
+ROOT = {"id": "root", "name": "Root"}
+COMPONENTS = {"c1": {"name": "One"}, "c2": {"name": "Two"}}
+# Both subcomponents have a capability with the id "cap", as the corpus does
+SUBCOMPONENTS = {
+    "s1": {
+        "parent": "c1",
+        "capabilities": [{"id": "cap", "functions": [{"id": "f1"}]}],
+        "cross_connections": [{"source_id": "f1", "target_id": "s2", "type": "supports"}],
+    },
+    "s2": {
+        "parent": "c2",
+        "capabilities": [{"id": "cap", "functions": [{"id": "f2"}]}],
+        "cross_connections": [{"source_id": "c1", "target_id": "f2", "type": "relates"}],
+    },
+}
+
+
+def build_graph():
+    return graph_builder.build_graph_data(ROOT, COMPONENTS, SUBCOMPONENTS)
+
+
+def link_key(link):
+    return link["source"], link["target"], link["type"]
+
+
+class SplitLinksTest(unittest.TestCase):
+    def test_repeated_ids_keep_their_parent_links(self):
+        graph = build_graph()
+        parent_links, cross_links = graph_builder.split_links(graph)
+        self.assertEqual([link is None for link in parent_links], [True] + [False] * (len(graph["nodes"]) - 1))
+        self.assertIn(("s2", "cap", "has_capability"), [link_key(link) for link in parent_links if link])
+        self.assertEqual(sorted(link["type"] for link in cross_links), ["relates", "supports"])
+
+
+class GraphIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = build_graph()
+        self.index = graph_builder.GraphIndex(self.graph)
+
+    def test_full_subtree_has_every_link_once(self):
+        window = self.index.subtree("root", 10)
+        self.assertEqual(len(window["nodes"]), len(self.graph["nodes"]))
+        self.assertEqual(Counter(map(link_key, window["links"])), Counter(map(link_key, self.graph["links"])))
+
+    def test_full_budget_summary_is_the_graph(self):
+        summary = self.index.summary(len(self.graph["nodes"]), 10)
+        self.assertEqual(summary["collapsed"], 0)
+        self.assertEqual(len(summary["nodes"]), len(self.graph["nodes"]))
+        self.assertEqual(Counter(map(link_key, summary["links"])), Counter(map(link_key, self.graph["links"])))
+
+    def test_collapsed_summary_accounts_for_every_cross_link(self):
+        summary = self.index.summary(3)
+        nodes = {node["id"]: node for node in summary["nodes"]}
+        self.assertEqual(set(nodes), {"root", "c1", "c2"})
+        contains = [link for link in summary["links"] if link["type"] == "contains"]
+        crossing = [link for link in summary["links"] if link["type"] != "contains"]
+        self.assertEqual(len(contains), 2)
+        internal = sum(node.get("internal_links", 0) for node in nodes.values())
+        self.assertEqual(sum(link.get("count", 1) for link in crossing) + internal, 2)
+        self.assertEqual(nodes["c1"]["descendants"] + nodes["c2"]["descendants"], len(self.graph["nodes"]) - 3)
+
+
+class FragmentCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.fragments = graph_builder.FragmentCache()
+        self.subcomponents = dict(SUBCOMPONENTS)
+
+    def build(self):
+        return graph_builder.build_graph_data(ROOT, COMPONENTS, self.subcomponents, fragments=self.fragments)
+
+    def test_cached_build_matches_a_walk(self):
+        records = list(graph_builder.iter_graph(ROOT, COMPONENTS, SUBCOMPONENTS))
+        nodes = [record[1] for record in records if record[0] == "node"]
+        self.assertEqual(self.build()["nodes"], nodes)
+        self.assertEqual(self.build()["nodes"], nodes)
+
+    def test_unchanged_subcomponents_are_reused(self):
+        first = self.build()
+        self.assertEqual(self.fragments.builds, 2)
+        second = self.build()
+        self.assertEqual(self.fragments.builds, 2)
+        # The very same subcomponent-level objects, which graph versions rely on to carry hashes over
+        pairs = [(a, b) for a, b in zip(first["nodes"], second["nodes"]) if a["level"] >= 2]
+        self.assertEqual(len(pairs), 6)
+        self.assertTrue(all(a is b for a, b in pairs))
+
+    def test_changed_subcomponent_is_rebuilt(self):
+        first = self.build()
+        self.subcomponents["s2"] = dict(SUBCOMPONENTS["s2"], name="Renamed")
+        second = self.build()
+        self.assertEqual(self.fragments.builds, 3)
+        self.assertEqual(second, graph_builder.build_graph_data(ROOT, COMPONENTS, self.subcomponents))
+        by_id = {node["id"]: node for node in first["nodes"]}
+        self.assertIs(next(node for node in second["nodes"] if node["id"] == "s1"), by_id["s1"])
+        self.assertIsNot(next(node for node in second["nodes"] if node["id"] == "s2"), by_id["s2"])
+
+    def test_removed_subcomponent_is_forgotten(self):
+        self.build()
+        del self.subcomponents["s2"]
+        graph = self.build()
+        self.assertNotIn("s2", [node["id"] for node in graph["nodes"]])
+        self.assertEqual(sorted(self.fragments._fragments), ["s1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
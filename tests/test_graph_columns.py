@@ -0,0 +1,40 @@
+import unittest
+
+from benchmarks.synthetic_corpus import generate_corpus
+from visualizer import graph_builder, graph_columns, graph_layout
+
+
+def build_graph():
+    return graph_builder.build_graph_data(*generate_corpus(scale=0.4))
+
+
+class GraphColumnsTest(unittest.TestCase):
+    def test_round_trip(self):
+        graph = build_graph()
+        decoded = graph_columns.decode_graph(graph_columns.encode_graph(graph))
+        self.assertEqual(decoded, {"nodes": graph["nodes"], "links": graph["links"]})
+
+    def test_positions_round_trip_as_float32(self):
+        graph = build_graph()
+        layout = [[index / 3, -index, 0.5] for index in range(len(graph["nodes"]))]
+        decoded = graph_columns.decode_graph(graph_columns.encode_graph(graph_layout.with_positions(graph, layout)))
+        for node, position in zip(decoded["nodes"], layout):
+            for axis, value in zip("xyz", position):
+                self.assertAlmostEqual(node[axis], value, places=4)
+
+    def test_unknown_ids_and_non_string_text(self):
+        graph = {
+            "nodes": [{"id": "a", "name": ["not", "text"], "type": "component", "description": "", "level": 1}],
+            "links": [{"source": "a", "target": "missing", "type": "uses", "description": 3}],
+        }
+        decoded = graph_columns.decode_graph(graph_columns.encode_graph(graph))
+        self.assertEqual(decoded["nodes"][0]["name"], '["not", "text"]')
+        self.assertEqual(decoded["links"], [{"source": "a", "target": "missing", "type": "uses", "description": "3"}])
+
+    def test_other_payloads_are_refused(self):
+        with self.assertRaises(graph_columns.GraphColumnsError):
+            graph_columns.decode_graph(b'{"nodes": []}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import copy
+import threading
+import unittest
+
+from corpus_case import CorpusTestCase
+from visualizer import graph_delta
+
+SUBCOMPONENT = "subcomponents/component-0-sub-0.json"
+GRAPH = {
+    "nodes": [{"id": "root"}, {"id": "a", "parent": "root"}, {"id": "a", "parent": "root", "copy": True}],
+    "links": [{"source": "root", "target": "a", "type": "contains"}] * 2,
+    "dangling_links": [],
+}
+
+
+def rename(data):
+    data["name"] = "Renamed"
+
+
+def edited(graph, change):
+    graph = copy.deepcopy(graph)
+    change(graph)
+    return graph
+
+
+def apply_delta(graph, delta):
+    """Apply delta to graph, matching nodes by their GraphVersion keys and links by content."""
+    nodes = graph_delta.GraphVersion(graph).nodes
+    for key in delta["nodes"]["removed"]:
+        del nodes[key]
+    nodes.update(delta["nodes"]["changed"])
+    nodes.update(delta["nodes"]["added"])
+    result = {"nodes": list(nodes.values())}
+    for collection in graph_delta.LINK_COLLECTIONS:
+        links = list(graph[collection])
+        for link in delta[collection]["removed"]:
+            links.remove(link)
+        result[collection] = links + delta[collection]["added"]
+    return result
+
+
+def canonical(graph):
+    return {key: sorted(map(graph_delta.content_hash, value)) for key, value in graph.items()}
+
+
+class GraphVersionTest(unittest.TestCase):
+    def test_id_depends_only_on_content(self):
+        version = graph_delta.GraphVersion(GRAPH)
+        self.assertEqual(graph_delta.GraphVersion(copy.deepcopy(GRAPH)).id, version.id)
+        reordered = dict(GRAPH, links=list(reversed(GRAPH["links"])))
+        self.assertEqual(graph_delta.GraphVersion(reordered).id, version.id)
+        self.assertNotEqual(graph_delta.GraphVersion(edited(GRAPH, lambda g: g["nodes"][1].update(name="x"))).id, version.id)
+
+    def test_repeated_ids_and_links_are_kept_apart(self):
+        version = graph_delta.GraphVersion(GRAPH)
+        self.assertEqual(list(version.nodes), ["root", "a", "a#1"])
+        self.assertEqual(len(version.links["links"]), 2)
+
+    def test_delta_turns_one_graph_into_the_other(self):
+        def change(graph):
+            graph["nodes"][2]["name"] = "changed"
+            graph["nodes"].append({"id": "b", "parent": "root"})
+            graph["links"].pop()
+            graph["links"].append({"source": "root", "target": "b", "type": "contains"})
+            graph["dangling_links"].append({"source": "b", "target": "gone", "type": "x", "missing": ["target"]})
+
+        new = edited(GRAPH, change)
+        delta = graph_delta.diff(graph_delta.GraphVersion(GRAPH), graph_delta.GraphVersion(new))
+        self.assertEqual(list(delta["nodes"]["added"]), ["b"])
+        self.assertEqual(list(delta["nodes"]["changed"]), ["a#1"])
+        self.assertEqual(canonical(apply_delta(GRAPH, delta)), canonical(new))
+
+    def test_hashes_are_carried_over_for_shared_objects(self):
+        old = graph_delta.GraphVersion(GRAPH)
+        new = graph_delta.GraphVersion(GRAPH, previous=old)
+        self.assertEqual(new.id, old.id)
+        self.assertEqual(new._hashes, old._hashes)
+
+
+class GraphHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.history = graph_delta.GraphHistory(size=2)
+        self.versions = [
+            graph_delta.GraphVersion(edited(GRAPH, lambda g, n=n: g["nodes"][0].update(n=n))) for n in range(3)
+        ]
+
+    def test_oldest_versions_are_forgotten(self):
+        for version in self.versions:
+            self.history.record(version)
+        self.assertNotIn(self.versions[0].id, self.history)
+        self.assertIsNone(self.history.delta(self.versions[0].id, self.versions[2]))
+        self.assertEqual(self.history.delta(self.versions[1].id, self.versions[2])["to"], self.versions[2].id)
+        self.assertIs(self.history.latest, self.versions[2])
+
+    def test_deltas_are_cached(self):
+        self.history.record(self.versions[0])
+        first = self.history.delta(self.versions[0].id, self.versions[1])
+        self.assertIs(self.history.delta(self.versions[0].id, self.versions[1]), first)
+
+    def test_wait_returns_when_a_new_version_is_recorded(self):
+        self.history.record(self.versions[0])
+        self.assertIs(self.history.wait(self.versions[0].id, 0.01), self.versions[0])
+        timer = threading.Timer(0.05, self.history.record, [self.versions[1]])
+        timer.start()
+        self.assertIs(self.history.wait(self.versions[0].id, 5), self.versions[1])
+        timer.join()
+
+
+class GraphDeltaRouteTest(CorpusTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self.make_visualizer().app.test_client()
+
+    def fetch_graph(self):
+        response = self.client.get("/api/graph")
+        # Servers close responses once sent; the served version is recorded then
+        response.close()
+        self.assertEqual(response.status_code, 200)
+        return response.headers["X-Graph-Version"]
+
+    def test_delta_from_the_served_version(self):
+        served = self.fetch_graph()
+        self.edit(SUBCOMPONENT, rename)
+        response = self.client.get(f"/api/graph/delta?since={served}")
+        self.assertEqual(response.status_code, 200)
+        delta = response.get_json()
+        self.assertEqual(delta["from"], served)
+        self.assertEqual(delta["to"], response.headers["X-Graph-Version"])
+        self.assertEqual([node["name"] for node in delta["nodes"]["changed"].values()], ["Renamed"])
+        self.assertEqual(delta["nodes"]["added"], {})
+        self.assertEqual(delta["nodes"]["removed"], [])
+
+    def test_unknown_version_is_gone(self):
+        self.fetch_graph()
+        response = self.client.get("/api/graph/delta?since=" + "0" * 24)
+        self.assertEqual(response.status_code, 410)
+
+    def test_invalid_version_is_rejected(self):
+        self.assertEqual(self.client.get("/api/graph/delta?since=v1").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import codecs
+import os
+import tempfile
+import unittest
+
+from visualizer import node_details_helper
+from visualizer.node_details_helper import load_json_file, parse_json_bytes
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA = {"id": "café", "name": "“Quoted”", "items": [1, 2]}
+TEXT = '{"id": "café", "name": "“Quoted”", "items": [1, 2]}'
+
+
+class ParseJsonBytesTest(unittest.TestCase):
+    def test_utf8(self):
+        self.assertEqual(parse_json_bytes(TEXT.encode("utf-8")), DATA)
+
+    def test_byte_order_marks(self):
+        for bom, encoding in (
+            (codecs.BOM_UTF8, "utf-8"),
+            (codecs.BOM_UTF16_LE, "utf-16-le"),
+            (codecs.BOM_UTF16_BE, "utf-16-be"),
+            (codecs.BOM_UTF32_LE, "utf-32-le"),
+            (codecs.BOM_UTF32_BE, "utf-32-be"),
+        ):
+            with self.subTest(encoding=encoding):
+                self.assertEqual(parse_json_bytes(bom + TEXT.encode(encoding)), DATA)
+
+    def test_surrounding_whitespace(self):
+        self.assertEqual(parse_json_bytes(b"\r\n  [1, 2]\n"), [1, 2])
+
+    def test_cp1252_fallback(self):
+        self.assertEqual(parse_json_bytes(TEXT.encode("cp1252")), DATA)
+
+    def test_latin1_fallback_for_bytes_cp1252_lacks(self):
+        self.assertEqual(parse_json_bytes(b'{"id": "a\x81b"}'), {"id": "a\x81b"})
+
+    def test_not_json(self):
+        for raw in (b"", b"plain text", b'{"id": '):
+            with self.subTest(raw=raw):
+                self.assertRaises(ValueError, parse_json_bytes, raw)
+
+
+class LoadJsonFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, raw):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "wb") as f:
+            f.write(raw)
+        return path
+
+    def test_unreadable_files(self):
+        self.assertIsNone(load_json_file(os.path.join(self.directory.name, "missing.json")))
+        self.assertIsNone(load_json_file(self.write("broken.json", b"{")))
+
+    def test_root_falls_back_to_default(self):
+        self.assertIs(load_json_file(self.write("ai-alignment.json", b"{")), node_details_helper.DEFAULT_ROOT_DATA)
+
+    def test_utf16_corpus_file(self):
+        # Saved as UTF-16 with a BOM; skipped by the loader before BOM detection
+        data = load_json_file(os.path.join(REPO_DIR, "subcomponents", "governance-structures.json"))
+        self.assertEqual(data["id"], "governance-structures")
+
+
+if __name__ == "__main__":
+    unittest.main()
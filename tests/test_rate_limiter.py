@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+
+from visualizer import rate_limiter
+
+WINDOW = 60
+LIMIT = 3
+
+
+def hits(backend, key, now, count):
+    return [backend.hit(key, now, WINDOW, LIMIT) for _ in range(count)]
+
+
+class BackendBehaviour:
+    """Checks shared by every backend; subclasses provide make_backend()."""
+
+    def test_limit_reached_within_window(self):
+        backend = self.make_backend()
+        self.assertEqual(hits(backend, "a", 1000.0, 4), [True, True, True, False])
+
+    def test_clients_are_counted_separately(self):
+        backend = self.make_backend()
+        hits(backend, "a", 1000.0, 3)
+        self.assertTrue(backend.hit("b", 1000.0, WINDOW, LIMIT))
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        backend = self.make_backend()
+        start = 1020.0  # windows start at multiples of WINDOW
+        hits(backend, "a", start, 3)
+        # At the start of the next window the previous three still count fully
+        self.assertFalse(backend.hit("a", start + WINDOW, WINDOW, LIMIT))
+        # Two thirds in, they weigh one: two more requests fit
+        self.assertEqual(hits(backend, "a", start + WINDOW + 40, 3), [True, True, False])
+
+    def test_window_expiry(self):
+        backend = self.make_backend()
+        hits(backend, "a", 1000.0, 3)
+        self.assertEqual(hits(backend, "a", 1000.0 + 2 * WINDOW, 4), [True, True, True, False])
+
+
+class MemoryBackendTest(BackendBehaviour, unittest.TestCase):
+    def make_backend(self, max_clients=100):
+        return rate_limiter.MemoryBackend(max_clients=max_clients)
+
+    def test_least_recently_seen_client_is_evicted(self):
+        backend = self.make_backend(max_clients=2)
+        hits(backend, "a", 1000.0, 3)
+        hits(backend, "b", 1000.0, 3)
+        hits(backend, "a", 1000.0, 1)  # a is now more recent than b
+        backend.hit("c", 1000.0, WINDOW, LIMIT)
+        self.assertEqual(len(backend), 2)
+        # a was kept and is still limited; b was forgotten, so its count starts over
+        self.assertFalse(backend.hit("a", 1000.0, WINDOW, LIMIT))
+        self.assertTrue(backend.hit("b", 1000.0, WINDOW, LIMIT))
+
+
+class SQLiteBackendTest(BackendBehaviour, unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "limits.sqlite3")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_backend(self, max_clients=100):
+        return rate_limiter.SQLiteBackend(self.path, max_clients=max_clients)
+
+    def test_counts_are_shared_through_the_file(self):
+        first, second = self.make_backend(), self.make_backend()
+        hits(first, "a", 1000.0, 2)
+        self.assertEqual(hits(second, "a", 1000.0, 2), [True, False])
+
+    def test_prune_keeps_most_recent_clients(self):
+        backend = self.make_backend(max_clients=2)
+        for offset, key in enumerate(("a", "b", "c")):
+            backend.hit(key, 1000.0 + offset, WINDOW, LIMIT)
+        connection = backend._connect()
+        backend._prune(connection, 1003.0, WINDOW)
+        clients = {row[0] for row in connection.execute("SELECT client FROM rate_limits")}
+        self.assertEqual(clients, {"b", "c"})
+
+
+class ClientAddressTest(unittest.TestCase):
+    def test_header_ignored_without_trusted_proxies(self):
+        self.assertEqual(rate_limiter.client_address("1.2.3.4", "10.0.0.1", 0), "10.0.0.1")
+
+    def test_client_is_counted_from_the_right(self):
+        forwarded = "6.6.6.6, 1.2.3.4, 10.0.0.2"
+        self.assertEqual(rate_limiter.client_address(forwarded, "10.0.0.1", 1), "10.0.0.2")
+        self.assertEqual(rate_limiter.client_address(forwarded, "10.0.0.1", 2), "1.2.3.4")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import unittest
+
+from corpus_case import CorpusTestCase
+from visualizer import graph_builder, graph_delta, node_details_helper, snapshot
+
+SUBCOMPONENT = "subcomponents/component-0-sub-0.json"
+
+
+def rename(data):
+    data["name"] = "Renamed"
+
+
+class CompiledCorpusCase(CorpusTestCase):
+    """A synthetic corpus with a freshly compiled snapshot and a cold corpus cache."""
+
+    def setUp(self):
+        super().setUp()
+        self.snapshot_path = snapshot.compile_snapshot()
+        self.graph = graph_builder.build_graph_data(
+            node_details_helper.get_root_data(),
+            node_details_helper.get_components(),
+            node_details_helper.get_subcomponents(),
+        )
+        # As a fresh process would start
+        node_details_helper.CORPUS_CACHE.clear()
+
+
+class SnapshotTest(CompiledCorpusCase):
+    def test_round_trip(self):
+        compiled = snapshot.load_snapshot()
+        self.assertEqual(compiled.path, self.snapshot_path)
+        self.assertEqual(compiled.graph_data(), self.graph)
+        self.assertEqual(len(compiled.graph_layout()), len(self.graph["nodes"]))
+        self.assertEqual(compiled.graph_version_id(), graph_delta.GraphVersion(self.graph).id)
+        self.assertEqual(json.loads(compiled.graph_payload().body)["nodes"][0]["id"], "ai-alignment")
+
+        store = compiled.detail_store()
+        for node_id in ("ai-alignment", "component-0", "component-0-sub-0", "component-0-sub-0.cap-0.fn-0"):
+            with self.subTest(node_id=node_id):
+                details, status_code = node_details_helper.get_node_details(node_id)
+                self.assertEqual(status_code, 200)
+                self.assertEqual(json.loads(bytes(store.get(node_id))), details)
+        self.assertIsNone(store.get("no-such-node"))
+        self.assertTrue(compiled.search_index().search("component-0-sub-0"))
+
+    def test_edited_file_makes_it_stale(self):
+        self.edit(SUBCOMPONENT, rename)
+        self.assertIsNone(snapshot.load_snapshot())
+
+    def test_added_file_makes_it_stale(self):
+        with open(self.path("subcomponents", "extra.json"), "w") as f:
+            json.dump({"id": "extra", "parent": "component-0"}, f)
+        self.assertIsNone(snapshot.load_snapshot())
+
+    def test_check_command(self):
+        self.assertEqual(snapshot.main(["check"]), 0)
+        self.edit(SUBCOMPONENT, rename)
+        self.assertEqual(snapshot.main(["check"]), 1)
+
+
+class SnapshotServingTest(CompiledCorpusCase):
+    def setUp(self):
+        super().setUp()
+        self.visualizer = self.make_visualizer()
+        self.client = self.visualizer.app.test_client()
+
+    def fetch_graph(self):
+        response = self.client.get("/api/graph")
+        response.close()
+        return response
+
+    def test_graph_and_details_come_from_the_snapshot(self):
+        response = self.fetch_graph()
+        self.assertIsNotNone(self.visualizer.snapshot)
+        self.assertEqual(response.headers["X-Graph-Version"], self.visualizer.snapshot.graph_version_id())
+        self.assertEqual(len(response.get_json()["nodes"]), len(self.graph["nodes"]))
+        self.assertEqual(self.client.get("/api/details/component-0").get_json()["id"], "component-0")
+        # Only stat'ed: nothing was parsed
+        self.assertEqual(node_details_helper.CORPUS_CACHE.stats()["files"], 0)
+
+    def test_edit_falls_back_to_the_files(self):
+        served = self.fetch_graph().headers["X-Graph-Version"]
+        self.edit(SUBCOMPONENT, rename)
+        response = self.fetch_graph()
+        self.assertNotEqual(response.headers["X-Graph-Version"], served)
+        names = {node["id"]: node["name"] for node in response.get_json()["nodes"]}
+        self.assertEqual(names["component-0-sub-0"], "Renamed")
+
+    def test_delta_from_the_snapshot_version(self):
+        served = self.fetch_graph().headers["X-Graph-Version"]
+        self.edit(SUBCOMPONENT, rename)
+        response = self.client.get(f"/api/graph/delta?since={served}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([node["name"] for node in response.get_json()["nodes"]["changed"].values()], ["Renamed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
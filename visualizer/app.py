@@ -1,35 +1,46 @@
 import os
-import sys
-from pathlib import Path
-
-# Add the project root to Python path for Vercel
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+import time
 
-# Also add the visualizer directory for module imports
-visualizer_dir = project_root / "visualizer"
-sys.path.insert(0, str(visualizer_dir))
+# Startup profile (AI_ALIGNMENT_STARTUP_PROFILE=1): imports are timed from here
+_IMPORT_START = time.perf_counter()
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, g, render_template, jsonify, request
+from flask.logging import default_handler
 import json
-import glob
 import logging
-import time
 import re
-from collections import defaultdict
+import threading
+from collections import OrderedDict
 
 try:
-    # Try relative import first
     from . import node_details_helper
     from . import config
+    from . import encoded_payload
+    from . import graph_builder
+    from . import snapshot
+    from . import rate_limiter
+    from . import search_index
+    from . import graph_columns
+    from . import corpus_watcher
+    from . import graph_delta
+    from . import graph_layout
+    from .metrics import METRICS, server_timing
 except ImportError:
-    # Fallback for Vercel serverless environment
-    import sys
-    from pathlib import Path
-    visualizer_dir = Path(__file__).parent
-    sys.path.insert(0, str(visualizer_dir))
+    # Run as a script (python visualizer/app.py): this directory is on sys.path
     import node_details_helper
     import config
+    import encoded_payload
+    import graph_builder
+    import snapshot
+    import rate_limiter
+    import search_index
+    import graph_columns
+    import corpus_watcher
+    import graph_delta
+    import graph_layout
+    from metrics import METRICS, server_timing
+
+_IMPORT_END = time.perf_counter()
 
 class AIAlignmentVisualizer:
     def __init__(self):
@@ -42,13 +53,44 @@ class AIAlignmentVisualizer:
                         static_folder=static_folder,
                         template_folder=template_folder)
         
-        # Simple rate limiting storage (in-memory for Vercel serverless)
-        self.request_counts = defaultdict(list)
-        self.rate_limit_window = config.RATE_LIMIT_WINDOW
-        self.rate_limit_max_requests = config.RATE_LIMIT_MAX_REQUESTS
+        self.rate_limiter = rate_limiter.RateLimiter(
+            rate_limiter.create_backend(
+                config.RATE_LIMIT_BACKEND,
+                path=config.RATE_LIMIT_SQLITE_PATH,
+                max_clients=config.RATE_LIMIT_MAX_CLIENTS
+            ),
+            limit=config.RATE_LIMIT_MAX_REQUESTS,
+            window=config.RATE_LIMIT_WINDOW
+        )
+        
+        # Per-subcomponent graph fragments, reused across rebuilds for unchanged files
+        self.graph_fragments = graph_builder.FragmentCache()
+        
+        # Recent graph versions, the bases /api/graph/delta and /api/graph/events diff against
+        self.graph_history = graph_delta.GraphHistory(config.GRAPH_DELTA_HISTORY)
+        
+        # Last deep health check as (time.monotonic(), body, status code)
+        self.started_at = time.time()
+        self._deep_health = None
+        self._deep_health_lock = threading.Lock()
+        
+        # Guards the per-version cache of /api/graph/summary results
+        self._summary_lock = threading.Lock()
+        
+        # Held while a detail store is built after a response, so only one thread builds it
+        self._detail_store_lock = threading.Lock()
+        
+        # The snapshot is adopted lazily, before the first request that reads the corpus
+        self.snapshot = None
+        self._corpus_ready = False
+        self._corpus_lock = threading.Lock()
+        self.watcher = None
+        
+        node_details_helper.CORPUS_CACHE.configure_pool(config.CORPUS_LOAD_EXECUTOR, config.CORPUS_LOAD_WORKERS)
         
         self.setup_logging()
         self.setup_paths()
+        self.setup_metrics()
         self.setup_routes()
         
     def setup_logging(self):
@@ -59,47 +101,145 @@ class AIAlignmentVisualizer:
         ))
         # Only log warnings and errors in production
         handler.setLevel(logging.WARNING)
+        # Replace Flask's default handler rather than logging every line twice
+        self.app.logger.removeHandler(default_handler)
         self.app.logger.addHandler(handler)
         self.app.logger.setLevel(logging.WARNING)
         self.app.logger.warning('AI Alignment Visualization startup')
         
     def setup_paths(self):
-        self.APP_DIR = os.path.abspath(os.path.dirname(__file__))
-        self.PARENT_DIR = os.path.abspath(os.path.join(self.APP_DIR, ".."))
-        self.COMPONENTS_DIR = os.path.normpath(os.path.join(self.PARENT_DIR, "components"))
-        self.SUBCOMPONENTS_DIR = os.path.normpath(os.path.join(self.PARENT_DIR, "subcomponents"))
-        self.ROOT_JSON_FILE = os.path.normpath(os.path.join(self.PARENT_DIR, "ai-alignment.json"))
+        paths = node_details_helper.setup_paths()
+        self.APP_DIR = paths['APP_DIR']
+        self.PARENT_DIR = paths['PARENT_DIR']
+        self.COMPONENTS_DIR = paths['COMPONENTS_DIR']
+        self.SUBCOMPONENTS_DIR = paths['SUBCOMPONENTS_DIR']
+        self.ROOT_JSON_FILE = paths['ROOT_JSON_FILE']
         
+    def setup_snapshot(self):
+        """Serve derived data from the compiled snapshot when it is present and fresh."""
+        compiled = snapshot.load_snapshot()
+        self.snapshot = compiled
+        if compiled is not None:
+            snapshot.prime_cache(compiled)
+            self.app.logger.warning(f"Serving from snapshot {compiled.path}")
+
+    def setup_corpus(self):
+        """Run setup_snapshot exactly once, before the first request that reads the corpus."""
+        if self._corpus_ready:
+            return
+        with self._corpus_lock:
+            if not self._corpus_ready:
+                self.setup_snapshot()
+                if config.CORPUS_WATCH_ENABLED:
+                    self.start_watcher()
+                self._corpus_ready = True
+
+    def start_watcher(self):
+        """Rebuild and publish the corpus on a background thread now and whenever its files change."""
+        self.watcher = corpus_watcher.CorpusWatcher(
+            [
+                (self.PARENT_DIR, os.path.basename(self.ROOT_JSON_FILE)),
+                (self.COMPONENTS_DIR, "*.json"),
+                (self.SUBCOMPONENTS_DIR, "*.json"),
+            ],
+            self.rebuild_corpus,
+            interval=config.CORPUS_WATCH_INTERVAL
+        ).start()
+        self.app.logger.warning(f"Watching corpus files ({self.watcher.backend})")
+
+    def rebuild_corpus(self):
+        """Build every derived structure for the current files, then publish them in one swap."""
+        start = time.perf_counter()
+        version = node_details_helper.CORPUS_CACHE.rebuild(self.warm_corpus)
+        if version is not None:
+            self.app.logger.warning(
+                f"Published corpus version {version} in {(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+            # Push the new graph version to open event streams
+            self.get_graph_version()
+
+    def warm_corpus(self):
+        """Build everything requests read from the corpus cache."""
+        node_details_helper.get_root_data()
+        node_details_helper.get_components()
+        node_details_helper.get_subcomponents()
+        node_details_helper.get_node_index()
+        node_details_helper.get_detail_store()
+        # Before the payloads, which pick it up through get_graph_layout
+        node_details_helper.CORPUS_CACHE.memoize("graph_layout", self.build_graph_layout)
+        self.get_graph_payload()
+        node_details_helper.CORPUS_CACHE.memoize("graph_version", self.build_graph_version)
+        self.get_graph_version_id()
+        self.get_graph_columns_payload()
+        self.get_graph_index()
+        self.get_graph_summaries()
+        self.get_hierarchy_paths()
+        self.get_search_index()
+
+    def setup_metrics(self):
+        """Time each request and add a Server-Timing header listing the stages it went through."""
+        METRICS.enabled = config.METRICS_ENABLED
+        if not METRICS.enabled:
+            return
+
+        @self.app.before_request
+        def start_request_timer():
+            g.metrics_token = METRICS.begin_request()
+            g.request_start = time.perf_counter()
+
+        @self.app.after_request
+        def add_server_timing(response):
+            if 'metrics_token' not in g:
+                return response
+            elapsed = time.perf_counter() - g.request_start
+            stages = METRICS.end_request(g.pop('metrics_token'), request.endpoint or 'unmatched', elapsed)
+            response.headers['Server-Timing'] = server_timing(stages, elapsed)
+            return response
+
     def check_rate_limit(self):
-        """Simple rate limiting check"""
-        client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
+        """Per-client rate limiting check"""
+        client_ip = rate_limiter.client_address(
+            request.environ.get('HTTP_X_FORWARDED_FOR'),
+            request.remote_addr,
+            config.RATE_LIMIT_TRUSTED_PROXIES
+        )
         if not client_ip:
             return True  # Allow if we can't determine IP
             
-        current_time = time.time()
-        
-        # Clean old requests outside the window
-        self.request_counts[client_ip] = [
-            req_time for req_time in self.request_counts[client_ip]
-            if current_time - req_time < self.rate_limit_window
-        ]
-        
-        # Check if under limit
-        if len(self.request_counts[client_ip]) >= self.rate_limit_max_requests:
-            return False
-            
-        # Add current request
-        self.request_counts[client_ip].append(current_time)
-        return True
+        with METRICS.timer("rate_limit"):
+            return self.rate_limiter.allow(client_ip)
 
     def setup_routes(self):
+        @self.app.before_request
+        def prepare_corpus():
+            if request.endpoint not in ('static', 'health_live'):
+                self.setup_corpus()
+                # Every corpus file is stat'ed once here rather than on each memoized lookup
+                node_details_helper.CORPUS_CACHE.begin_request()
+
+        @self.app.teardown_request
+        def release_corpus(error=None):
+            node_details_helper.CORPUS_CACHE.end_request()
+
         self.app.route('/')(self.index)
         self.app.route('/api/graph', methods=['GET'])(self.graph)
+        self.app.route('/api/graph/delta', methods=['GET'])(self.graph_delta)
+        self.app.route('/api/graph/events', methods=['GET'])(self.graph_events)
+        self.app.route('/api/graph/children/<node_id>', methods=['GET'])(self.graph_children)
+        self.app.route('/api/graph/subtree/<node_id>', methods=['GET'])(self.graph_subtree)
+        self.app.route('/api/graph/summary', methods=['GET'])(self.graph_summary)
         self.app.route('/api/hierarchy-path/<node_id>')(self.hierarchy_path)
+        self.app.route('/api/hierarchy-paths', methods=['GET'])(self.hierarchy_paths)
         self.app.route('/api/health')(self.health_check)
+        self.app.route('/api/health/live')(self.health_live)
+        self.app.route('/api/health/ready')(self.health_ready)
+        self.app.route('/api/search', methods=['GET'])(self.search)
         self.app.route('/api/root')(self.root_details)
         self.app.route('/api/details/<node_id>')(self.node_details)
+        self.app.route('/api/details', methods=['GET'])(self.node_details_batch)
         self.app.route('/api/audio-config')(self.audio_config)
+        if METRICS.enabled:
+            self.app.route('/metrics')(self.metrics)
         
     def run(self, host='0.0.0.0', port=3000, debug=False):
         self.app.run(host=host, port=port, debug=debug)
@@ -113,15 +253,253 @@ class AIAlignmentVisualizer:
         if not self.check_rate_limit():
             return jsonify({"error": "Rate limit exceeded"}), 429
             
+        mimetype = request.accept_mimetypes.best_match(
+            ['application/json', 'application/x-ndjson', graph_columns.MIMETYPE]
+        )
+        if mimetype == 'application/x-ndjson':
+            return self.graph_stream()
+
         try:
-            graph_data = self.build_graph_data()
-            return jsonify(graph_data)
+            if mimetype == graph_columns.MIMETYPE:
+                payload = self.get_graph_columns_payload()
+            else:
+                payload = self.get_graph_payload()
+            response = payload.make_response(request, Response)
+            response.headers["Vary"] = "Accept, Accept-Encoding"
+            version_id = self.get_graph_version_id()
+            response.headers["X-Graph-Version"] = version_id
+            if version_id not in self.graph_history:
+                # Clients ask for deltas from the version they were sent, so it
+                # must be recorded; hashing it waits until the response is out,
+                # which keeps a snapshot-served cold start fast
+                response.call_on_close(self.get_graph_version)
+            if config.CORPUS_WATCH_ENABLED:
+                # Advertises /api/graph/events; without a watcher the graph cannot change under the page
+                response.headers["X-Graph-Live"] = "1"
+            return response
         except Exception as e:
-            self.app.logger.error(f"Error building graph data")
+            self.app.logger.error(f"Error building graph data: {str(e)}", exc_info=True)
             return jsonify({
                 "error": "Unable to load graph data"
             }), 500
             
+    def graph_stream(self):
+        """Stream the graph as newline-delimited JSON while the corpus is walked.
+
+        Each line is {"node": ...} (always after its parent's line), {"link": ...},
+        {"dangling": ...} for a cross-link to an unknown id, and finally
+        {"end": {...counts}}; an {"error": ...} line
+        ends a stream that failed part way.
+        """
+        try:
+            root_data = self.get_root_data()
+            if not isinstance(root_data, dict):
+                self.app.logger.error(f"Root data is not a dictionary: {type(root_data)}")
+                return jsonify({"error": "Unable to load graph data"}), 500
+            components = self.get_components()
+            subcomponents = self.get_subcomponents()
+        except Exception as e:
+            self.app.logger.error(f"Error loading corpus for graph stream: {str(e)}")
+            return jsonify({"error": "Unable to load graph data"}), 500
+
+        logger = self.app.logger
+
+        def records():
+            node_count = link_count = dangling_count = 0
+            try:
+                for record in graph_builder.iter_graph(root_data, components, subcomponents, logger):
+                    if record[0] == "node":
+                        node_count += 1
+                        yield {"node": record[1]}
+                        link = record[2]
+                    elif record[0] == "dangling":
+                        dangling_count += 1
+                        yield {"dangling": record[1]}
+                        continue
+                    else:
+                        link = record[1]
+                    if link is not None:
+                        link_count += 1
+                        yield {"link": link}
+            except Exception as e:
+                logger.error(f"Error streaming graph data: {str(e)}", exc_info=True)
+                yield {"error": "Unable to load graph data"}
+                return
+            yield {"end": {"nodes": node_count, "links": link_count, "dangling_links": dangling_count}}
+
+        response = Response(
+            encoded_payload.ndjson_chunks(records(), config.GRAPH_STREAM_CHUNK_BYTES),
+            mimetype='application/x-ndjson'
+        )
+        response.headers["Vary"] = "Accept"
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    @staticmethod
+    def is_valid_graph_version(version_id):
+        return bool(re.fullmatch(r'[0-9a-f]{24}', version_id))
+
+    def graph_delta(self):
+        """Return the changes from the graph version a client holds (?since=) to the current one.
+
+        Answers 410 when that version is no longer remembered; the client
+        should then refetch /api/graph.
+        """
+        # Check rate limit for API endpoints
+        if not self.check_rate_limit():
+            return jsonify({"error": "Rate limit exceeded"}), 429
+
+        since = request.args.get('since', '')
+        if not self.is_valid_graph_version(since):
+            return jsonify({"error": "Invalid or missing graph version"}), 400
+
+        try:
+            version = self.get_graph_version()
+            with METRICS.timer("graph_delta"):
+                delta = self.graph_history.delta(since, version)
+        except Exception as e:
+            self.app.logger.error(f"Error computing graph delta: {str(e)}")
+            return jsonify({"error": "Unable to load graph data"}), 500
+
+        if delta is None:
+            response = jsonify({"error": "Unknown graph version", "version": version.id})
+            response.status_code = 410
+        else:
+            response = jsonify(delta)
+        response.headers["X-Graph-Version"] = version.id
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    def graph_events(self):
+        """Server-Sent Events stream of graph deltas.
+
+        The client's version comes from ?since= or, on reconnect, the
+        Last-Event-ID header, which takes precedence. Each new version is sent as a "delta" event
+        (the /api/graph/delta body) with the new version as its id; when the
+        client's version cannot be patched a "reset" event carries the
+        current version and the client should refetch /api/graph. Streams
+        end after GRAPH_EVENTS_MAX_SECONDS and the browser reconnects. Only
+        served with CORPUS_WATCH_ENABLED; otherwise answers 204.
+        """
+        # Check rate limit for API endpoints
+        if not self.check_rate_limit():
+            return jsonify({"error": "Rate limit exceeded"}), 429
+
+        # No live reload, no events: 204 tells EventSource not to reconnect
+        if not config.CORPUS_WATCH_ENABLED:
+            return Response(status=204)
+
+        # EventSource reconnects to the original URL, so Last-Event-ID is the newer version
+        since = request.headers.get('Last-Event-ID') or request.args.get('since') or None
+        if since is not None and not self.is_valid_graph_version(since):
+            return jsonify({"error": "Invalid graph version"}), 400
+
+        logger = self.app.logger
+
+        def event(name, data, event_id=None):
+            lines = [f"event: {name}"]
+            if event_id:
+                lines.append(f"id: {event_id}")
+            lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}")
+            return "\n".join(lines) + "\n\n"
+
+        def events():
+            held = since
+            deadline = time.monotonic() + config.GRAPH_EVENTS_MAX_SECONDS
+            try:
+                yield f"retry: {config.GRAPH_EVENTS_POLL_INTERVAL * 1000}\n\n"
+                while True:
+                    # Picks up file changes itself unless a watcher publishes them
+                    version = self.get_graph_version()
+                    if version.id != held:
+                        delta = self.graph_history.delta(held, version) if held else None
+                        if delta is None:
+                            yield event("reset", {"version": version.id}, version.id)
+                        else:
+                            yield event("delta", delta, version.id)
+                        held = version.id
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    latest = self.graph_history.wait(held, min(config.GRAPH_EVENTS_POLL_INTERVAL, remaining))
+                    if latest is None or latest.id == held:
+                        yield ": keep-alive\n\n"
+            except Exception as e:
+                logger.error(f"Error streaming graph events: {str(e)}", exc_info=True)
+
+        response = Response(events(), mimetype='text/event-stream')
+        response.headers["Cache-Control"] = "no-cache"
+        # Proxies such as nginx would otherwise hold events back until a buffer fills
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+    def graph_children(self, node_id):
+        """Return the direct children of a node, for expanding one level at a time."""
+        # Check rate limit for API endpoints
+        if not self.check_rate_limit():
+            return jsonify({"error": "Rate limit exceeded"}), 429
+
+        if not self.is_valid_node_id(node_id):
+            return jsonify({"error": "Invalid node identifier"}), 400
+
+        window = self.get_graph_index().children_of(node_id)
+        if window is None:
+            return jsonify({"error": "Node not found"}), 404
+        return jsonify(window)
+
+    def graph_subtree(self, node_id):
+        """Return a node and its descendants down to ?depth= levels (default 1)."""
+        # Check rate limit for API endpoints
+        if not self.check_rate_limit():
+            return jsonify({"error": "Rate limit exceeded"}), 429
+
+        if not self.is_valid_node_id(node_id):
+            return jsonify({"error": "Invalid node identifier"}), 400
+
+        depth = request.args.get('depth', '1')
+        if not depth.isdigit() or int(depth) > config.GRAPH_WINDOW_MAX_DEPTH:
+            return jsonify({"error": f"depth must be between 0 and {config.GRAPH_WINDOW_MAX_DEPTH}"}), 400
+
+        window = self.get_graph_index().subtree(node_id, int(depth))
+        if window is None:
+            return jsonify({"error": "Node not found"}), 404
+        return jsonify(window)
+
+    def graph_summary(self):
+        """Return the graph with deep or large subtrees collapsed into super-nodes.
+
+        ?max_nodes= bounds the number of nodes returned (default
+        GRAPH_SUMMARY_DEFAULT_NODES) and ?depth= the deepest level shown.
+        """
+        # Check rate limit for API endpoints
+        if not self.check_rate_limit():
+            return jsonify({"error": "Rate limit exceeded"}), 429
+
+        max_nodes = request.args.get('max_nodes', str(config.GRAPH_SUMMARY_DEFAULT_NODES))
+        if not max_nodes.isdigit() or int(max_nodes) < 1:
+            return jsonify({"error": "max_nodes must be a positive integer"}), 400
+
+        depth = request.args.get('depth', str(config.GRAPH_WINDOW_MAX_DEPTH))
+        if not depth.isdigit() or int(depth) > config.GRAPH_WINDOW_MAX_DEPTH:
+            return jsonify({"error": f"depth must be between 0 and {config.GRAPH_WINDOW_MAX_DEPTH}"}), 400
+
+        # Budgets beyond the graph's size all give the whole graph
+        index = self.get_graph_index()
+        key = (min(int(max_nodes), index.node_count), int(depth))
+        summaries = self.get_graph_summaries()
+        with self._summary_lock:
+            summary = summaries.get(key)
+            if summary is not None:
+                summaries.move_to_end(key)
+        if summary is None:
+            summary = index.summary(*key)
+            with self._summary_lock:
+                summaries[key] = summary
+                while len(summaries) > config.GRAPH_SUMMARY_CACHE_SIZE:
+                    summaries.popitem(last=False)
+        return jsonify(summary)
+
     def node_details(self, node_id):
         # Check rate limit for API endpoints
         if not self.check_rate_limit():
@@ -138,11 +516,16 @@ class AIAlignmentVisualizer:
             }), 400
             
         try:
-            result, status_code = node_details_helper.get_node_details(node_id)
-            if status_code == 200:
-                return jsonify(result)
-            else:
-                return jsonify(result), status_code
+            body = self.get_detail_bytes(node_id)
+            if body is not None:
+                return self.detail_response(body)
+            if self.get_detail_store() is not None:
+                return jsonify(node_details_helper.node_not_found(node_id)), 404
+            with METRICS.timer("node_details_build"):
+                result, status_code = node_details_helper.get_node_details(node_id)
+            response = jsonify(result)
+            response.status_code = status_code
+            return self.build_detail_store_after(response)
         except Exception as e:
             self.app.logger.error(f"Error getting node details for {node_id}")
             return jsonify({
@@ -153,52 +536,238 @@ class AIAlignmentVisualizer:
                 "type": "error"
             }), 500
 
+    def node_details_batch(self):
+        """Stream the details of a comma-separated list of node ids (?ids=a,b,c) as one JSON object."""
+        # Check rate limit for API endpoints
+        if not self.check_rate_limit():
+            return jsonify({"error": "Rate limit exceeded"}), 429
+
+        node_ids = list(dict.fromkeys(node_id for node_id in request.args.get('ids', '').split(',') if node_id))
+        if not node_ids:
+            return jsonify({"error": "No node identifiers given"}), 400
+        if len(node_ids) > config.BATCH_MAX_NODE_IDS:
+            return jsonify({"error": f"At most {config.BATCH_MAX_NODE_IDS} node identifiers per request"}), 400
+        if not all(self.is_valid_node_id(node_id) for node_id in node_ids):
+            return jsonify({
+                "error": "Invalid node identifier",
+                "id": "invalid",
+                "name": "Invalid Node",
+                "description": "Node identifier contains invalid characters",
+                "type": "error"
+            }), 400
+
+        def generate():
+            # Ids are validated to [A-Za-z0-9_-], so they can be used as JSON keys verbatim
+            not_found = []
+            separator = b""
+            has_store = self.get_detail_store() is not None
+            yield b'{"details":{'
+            for node_id in node_ids:
+                body = self.get_detail_bytes(node_id)
+                if body is None and has_store:
+                    not_found.append(node_id)
+                    continue
+                if body is None:
+                    result, status_code = node_details_helper.get_node_details(node_id)
+                    if status_code != 200:
+                        not_found.append(node_id)
+                        continue
+                    body = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                yield separator + f'"{node_id}":'.encode("utf-8")
+                yield body
+                separator = b","
+            yield b'},"not_found":' + json.dumps(not_found).encode("utf-8") + b'}'
+
+        response = Response(generate(), mimetype='application/json')
+        if self.get_detail_store() is None:
+            return self.build_detail_store_after(response)
+        return response
+
+    @staticmethod
+    def is_valid_node_id(node_id):
+        """Basic input validation - only allow alphanumeric, hyphens, underscores"""
+        return bool(node_id) and isinstance(node_id, str) and node_id.replace('-', '').replace('_', '').isalnum()
+
     def hierarchy_path(self, node_id):
         """Returns the path from root to the specified node."""
         # Check rate limit for API endpoints
         if not self.check_rate_limit():
             return jsonify({"error": "Rate limit exceeded"}), 429
             
-        # Basic input validation - only allow alphanumeric, hyphens, underscores
-        if not node_id or not isinstance(node_id, str) or not node_id.replace('-', '').replace('_', '').isalnum():
+        if not self.is_valid_node_id(node_id):
             return jsonify({"error": "Invalid node identifier"}), 400
             
-        graph_data = self.build_graph_data()
-        
-        # Find the node
-        target_node = None
-        for node in graph_data["nodes"]:
-            if node["id"] == node_id:
-                target_node = node
-                break
-        
-        if not target_node:
+        path = self.get_hierarchy_paths().get(node_id)
+        if path is None:
             return jsonify({"error": "Node not found"}), 404
         
-        # Build the path
-        path = [{"id": target_node["id"], "name": target_node["name"], "type": target_node["type"]}]
-        
-        # Traverse up the hierarchy
-        current_node = target_node
-        while "parent" in current_node:
-            parent_id = current_node["parent"]
-            parent_node = None
-            
-            for node in graph_data["nodes"]:
-                if node["id"] == parent_id:
-                    parent_node = node
-                    break
-            
-            if parent_node:
-                path.insert(0, {"id": parent_node["id"], "name": parent_node["name"], "type": parent_node["type"]})
-                current_node = parent_node
-            else:
-                break
-        
         return jsonify({"path": path})
 
+    def hierarchy_paths(self):
+        """Returns root-to-node paths for a comma-separated list of node ids (?ids=a,b,c)."""
+        # Check rate limit for API endpoints
+        if not self.check_rate_limit():
+            return jsonify({"error": "Rate limit exceeded"}), 429
+
+        node_ids = [node_id for node_id in request.args.get('ids', '').split(',') if node_id]
+        if not node_ids:
+            return jsonify({"error": "No node identifiers given"}), 400
+        if len(node_ids) > config.BATCH_MAX_NODE_IDS:
+            return jsonify({"error": f"At most {config.BATCH_MAX_NODE_IDS} node identifiers per request"}), 400
+        if not all(self.is_valid_node_id(node_id) for node_id in node_ids):
+            return jsonify({"error": "Invalid node identifier"}), 400
+
+        all_paths = self.get_hierarchy_paths()
+        paths = {}
+        not_found = []
+        for node_id in node_ids:
+            if node_id in all_paths:
+                paths[node_id] = all_paths[node_id]
+            else:
+                not_found.append(node_id)
+
+        return jsonify({"paths": paths, "not_found": not_found})
+
+    def get_hierarchy_paths(self):
+        """Return node id -> root-to-node path for every graph node, built once per corpus version."""
+        return node_details_helper.CORPUS_CACHE.memoize("hierarchy_paths", self.build_hierarchy_paths)
+
+    def build_hierarchy_paths(self):
+        """Build every node's ancestor path from the graph's parent pointers."""
+        graph = self.get_graph_data()
+        with METRICS.timer("hierarchy_paths_build"):
+            return self.ancestor_paths(graph)
+
+    @staticmethod
+    def ancestor_paths(graph):
+        """Return node id -> root-to-node path for every node of graph."""
+        nodes_by_id = {}
+        for node in graph["nodes"]:
+            # First occurrence wins, as with a linear scan over the node list
+            nodes_by_id.setdefault(node["id"], node)
+
+        paths = {}
+
+        def path_to(node_id):
+            # Walk up to the nearest ancestor with a known path, then unwind
+            chain = []
+            seen = set()
+            current = nodes_by_id.get(node_id)
+            while current is not None and current["id"] not in paths and current["id"] not in seen:
+                seen.add(current["id"])
+                chain.append(current)
+                current = nodes_by_id.get(current.get("parent"))
+            prefix = paths[current["id"]] if current is not None and current["id"] in paths else []
+            for node in reversed(chain):
+                prefix = prefix + [{"id": node["id"], "name": node["name"], "type": node["type"]}]
+                paths[node["id"]] = prefix
+            return paths.get(node_id)
+
+        for node_id in nodes_by_id:
+            path_to(node_id)
+        return paths
+
+    def search(self):
+        """Ranked full-text search over node names, descriptions and literature (?q=...&limit=N)."""
+        # Check rate limit for API endpoints
+        if not self.check_rate_limit():
+            return jsonify({"error": "Rate limit exceeded"}), 429
+
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "Missing search query"}), 400
+        if len(query) > config.SEARCH_MAX_QUERY_LENGTH:
+            return jsonify({"error": "Search query too long"}), 400
+        limit = request.args.get('limit', str(config.SEARCH_DEFAULT_RESULTS))
+        if not limit.isdigit() or not 1 <= int(limit) <= config.SEARCH_MAX_RESULTS:
+            return jsonify({"error": f"limit must be between 1 and {config.SEARCH_MAX_RESULTS}"}), 400
+
+        try:
+            index = self.get_search_index()
+            with METRICS.timer("search"):
+                total, matches = index.search(query, limit=int(limit))
+            paths = self.get_hierarchy_paths()
+            return jsonify({
+                "query": query,
+                "total": total,
+                "results": [
+                    {
+                        "id": document["id"],
+                        "name": document["name"],
+                        "type": document["type"],
+                        "score": round(score, 4),
+                        "path": paths.get(document["id"], [])
+                    }
+                    for document, score in matches
+                ]
+            })
+        except Exception as e:
+            self.app.logger.error(f"Error searching for {query!r}: {str(e)}")
+            return jsonify({"error": "Unable to search"}), 500
+
+    def get_search_index(self):
+        """Return the full-text search index, built once per corpus version."""
+        def build():
+            graph = self.get_graph_data()
+            root_data = self.get_root_data()
+            components = self.get_components()
+            subcomponents = self.get_subcomponents()
+            node_index = node_details_helper.get_node_index()
+            with METRICS.timer("search_index_build"):
+                return search_index.SearchIndex(search_index.build_documents(
+                    graph, root_data, components, subcomponents, node_index
+                ))
+        return node_details_helper.CORPUS_CACHE.memoize("search_index", build)
+
+    def metrics(self):
+        """Stage and request latency histograms in the Prometheus text format."""
+        return Response(METRICS.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    def health_live(self):
+        """Liveness probe: the process is up and serving requests. Touches no files."""
+        return jsonify({"status": "ok", "uptime": round(time.time() - self.started_at, 3)})
+
+    def health_ready(self):
+        """Readiness probe: report the cached corpus version without re-reading anything.
+
+        The first probe of a cold process loads the corpus and builds the
+        graph, so the process is warm before the balancer sends it traffic.
+        """
+        cache = node_details_helper.CORPUS_CACHE
+        stats = cache.stats()
+        if stats["tracked"] == 0:
+            try:
+                self.get_graph_data()
+            except Exception as e:
+                self.app.logger.error(f"Error building graph data: {str(e)}")
+            stats = cache.stats()
+
+        ready = stats["tracked"] > 0
+        return jsonify({
+            "status": "ready" if ready else "not_ready",
+            "corpus": {
+                "version": stats["version"],
+                "files": stats["tracked"],
+                "last_reload": stats["last_reload"],
+                "published": stats["published"]
+            },
+            "snapshot": self.snapshot.path if self.snapshot is not None else None
+        }), 200 if ready else 503
+
     def health_check(self):
-        """Check the health of the application and JSON file loading."""
+        """Deep check of the corpus files, run at most once per HEALTH_DEEP_CHECK_INTERVAL; other probes get the last result."""
+        with self._deep_health_lock:
+            now = time.monotonic()
+            if self._deep_health is None or now - self._deep_health[0] >= config.HEALTH_DEEP_CHECK_INTERVAL:
+                self._deep_health = (now,) + self.deep_health_check()
+            checked_at, body, status_code = self._deep_health
+        return jsonify(dict(body, checked_seconds_ago=round(now - checked_at, 3))), status_code
+
+    def deep_health_check(self):
+        """Check that the root, component and subcomponent files all load, through the corpus cache.
+
+        Returns (body, status code). Unchanged files are only stat'ed.
+        """
         try:
             health_status = {
                 "status": "ok",
@@ -209,175 +778,75 @@ class AIAlignmentVisualizer:
             }
             
             # Check root data
-            root_data = self.get_root_data()
-            if root_data:
+            if node_details_helper.CORPUS_CACHE.load(self.ROOT_JSON_FILE):
                 health_status["root_data"] = True
             else:
                 health_status["errors"].append(f"Failed to load root data from {self.ROOT_JSON_FILE}")
                 
-            # Check components
-            if os.path.isdir(self.COMPONENTS_DIR):
-                component_files = glob.glob(os.path.join(self.COMPONENTS_DIR, "*.json"))
-                for file_path in component_files:
-                    component_id = os.path.basename(file_path).replace(".json", "")
-                    try:
-                        data = self.load_json_file(file_path)
-                        if data:
-                            health_status["components"].append({
-                                "id": component_id,
-                                "status": "loaded",
-                                "file": file_path
-                            })
-                        else:
-                            health_status["components"].append({
-                                "id": component_id,
-                                "status": "failed",
-                                "file": file_path
-                            })
-                            health_status["errors"].append(f"Failed to load component: {file_path}")
-                    except Exception as e:
-                        health_status["components"].append({
-                            "id": component_id,
-                            "status": "error",
-                            "file": file_path,
-                            "error": str(e)
-                        })
-                        health_status["errors"].append(f"Error loading component {file_path}: {str(e)}")
-            else:
-                health_status["errors"].append(f"Components directory not found: {self.COMPONENTS_DIR}")
-                
-            # Check subcomponents
-            if os.path.isdir(self.SUBCOMPONENTS_DIR):
-                subcomponent_files = glob.glob(os.path.join(self.SUBCOMPONENTS_DIR, "*.json"))
-                for file_path in subcomponent_files:
-                    subcomp_id = os.path.basename(file_path).replace(".json", "")
+            # Check components and subcomponents
+            for key, label, directory in (
+                ("components", "component", self.COMPONENTS_DIR),
+                ("subcomponents", "subcomponent", self.SUBCOMPONENTS_DIR),
+            ):
+                if not os.path.isdir(directory):
+                    health_status["errors"].append(f"{label.capitalize()}s directory not found: {directory}")
+                    continue
+                for file_path in node_details_helper.CORPUS_CACHE.list_files(directory):
+                    entry = {
+                        "id": os.path.basename(file_path).replace(".json", ""),
+                        "status": "loaded",
+                        "file": file_path
+                    }
                     try:
-                        data = self.load_json_file(file_path)
-                        if data:
-                            health_status["subcomponents"].append({
-                                "id": subcomp_id,
-                                "status": "loaded",
-                                "file": file_path
-                            })
-                        else:
-                            health_status["subcomponents"].append({
-                                "id": subcomp_id,
-                                "status": "failed",
-                                "file": file_path
-                            })
-                            health_status["errors"].append(f"Failed to load subcomponent: {file_path}")
+                        if not node_details_helper.CORPUS_CACHE.load(file_path):
+                            entry["status"] = "failed"
+                            health_status["errors"].append(f"Failed to load {label}: {file_path}")
                     except Exception as e:
-                        health_status["subcomponents"].append({
-                            "id": subcomp_id,
-                            "status": "error",
-                            "file": file_path,
-                            "error": str(e)
-                        })
-                        health_status["errors"].append(f"Error loading subcomponent {file_path}: {str(e)}")
-            else:
-                health_status["errors"].append(f"Subcomponents directory not found: {self.SUBCOMPONENTS_DIR}")
+                        entry["status"] = "error"
+                        entry["error"] = str(e)
+                        health_status["errors"].append(f"Error loading {label} {file_path}: {str(e)}")
+                    health_status[key].append(entry)
                 
+            health_status["cache"] = node_details_helper.CORPUS_CACHE.stats()
+            health_status["load_ms"] = {
+                os.path.relpath(path, self.PARENT_DIR): ms
+                for path, ms in node_details_helper.CORPUS_CACHE.timings().items()
+            }
+            health_status["links"] = self.link_report()
+
             if health_status["errors"]:
                 health_status["status"] = "error"
-                return jsonify(health_status), 500
+                return health_status, 500
                 
-            return jsonify(health_status)
+            return health_status, 200
             
         except Exception as e:
-            return jsonify({
+            return {
                 "status": "error",
                 "error": str(e)
-            }), 500
+            }, 500
+
+    def link_report(self, examples=10):
+        """Summarize the current graph's resolved and dangling cross-links."""
+        graph = self.get_graph_data()
+        dangling = graph.get("dangling_links", [])
+        return {
+            "total": len(graph.get("links", [])),
+            "dangling": len(dangling),
+            "dangling_examples": dangling[:examples]
+        }
 
     def get_root_data(self):
         """Get the root AI Alignment data."""
-        root_data = node_details_helper.load_json_file(self.ROOT_JSON_FILE)
-        if not root_data:
-            self.app.logger.warning(f"Using default root data since {self.ROOT_JSON_FILE} was not found")
-            return node_details_helper.DEFAULT_ROOT_DATA
-        return root_data
+        return node_details_helper.get_root_data()
 
     def get_components(self):
         """Get all component data."""
-        components = {}
-        
-        # Check if components directory exists
-        if not os.path.isdir(self.COMPONENTS_DIR):
-            self.app.logger.warning(f"Components directory not found: {self.COMPONENTS_DIR}")
-            # Use components from the default data
-            for component in node_details_helper.DEFAULT_ROOT_DATA["components"]:
-                components[component["id"]] = component
-            return components
-        
-        # Load components
-        component_files = glob.glob(os.path.join(self.COMPONENTS_DIR, "*.json"))
-        self.app.logger.info(f"Found {len(component_files)} component files")
-        
-        # If no component files found, use default components
-        if not component_files:
-            self.app.logger.warning("No component files found, using default components")
-            for component in node_details_helper.DEFAULT_ROOT_DATA["components"]:
-                components[component["id"]] = component
-            return components
-        
-        for file_path in component_files:
-            self.app.logger.debug(f"Loading component file: {file_path}")
-            component_data = node_details_helper.load_json_file(file_path)
-            if component_data:
-                component_id = os.path.basename(file_path).replace(".json", "")
-                components[component_id] = component_data
-                self.app.logger.debug(f"Successfully loaded component: {component_id}")
-            else:
-                self.app.logger.error(f"Failed to load component file: {file_path}")
-        
-        # If no components were successfully loaded, use default components
-        if not components:
-            self.app.logger.warning("No components were successfully loaded, using default components")
-            for component in node_details_helper.DEFAULT_ROOT_DATA["components"]:
-                components[component["id"]] = component
-        
-        return components
+        return node_details_helper.get_components()
 
     def get_subcomponents(self):
         """Get all subcomponent data."""
-        subcomponents = {}
-        
-        if not os.path.isdir(self.SUBCOMPONENTS_DIR):
-            self.app.logger.warning(f"Subcomponents directory not found: {self.SUBCOMPONENTS_DIR}")
-            return subcomponents
-        
-        # Load subcomponents
-        subcomponent_files = glob.glob(os.path.join(self.SUBCOMPONENTS_DIR, "*.json"))
-        self.app.logger.info(f"Found {len(subcomponent_files)} subcomponent files")
-        
-        for file_path in subcomponent_files:
-            self.app.logger.debug(f"Loading subcomponent file: {file_path}")
-            data = node_details_helper.load_json_file(file_path)
-            if data:
-                subcomponent_id = os.path.basename(file_path).replace(".json", "")
-                if "id" not in data:
-                    data["id"] = subcomponent_id
-                subcomponents[subcomponent_id] = data
-                self.app.logger.debug(f"Successfully loaded subcomponent: {subcomponent_id}")
-            else:
-                self.app.logger.error(f"Failed to load subcomponent file: {file_path}")
-        
-        return subcomponents
-
-    def load_json_file(self, file_path):
-        """Load and parse a JSON file with robust error handling."""
-        try:
-            self.app.logger.info(f"Attempting to load file: {file_path}")
-            data = node_details_helper.load_json_file(file_path)
-            if data:
-                self.app.logger.info(f"Successfully loaded {file_path}")
-                return data
-            else:
-                self.app.logger.error(f"Failed to load {file_path}")
-                return None
-        except Exception as e:
-            self.app.logger.error(f"Error loading {file_path}: {str(e)}")
-            return None
+        return node_details_helper.get_subcomponents()
 
     def root_details(self):
         # Check rate limit for API endpoints
@@ -385,8 +854,13 @@ class AIAlignmentVisualizer:
             return jsonify({"error": "Rate limit exceeded"}), 429
             
         try:
+            body = self.get_detail_bytes("ai-alignment")
+            if body is not None:
+                return self.detail_response(body)
             node_data, status_code = node_details_helper.get_node_details("ai-alignment")
-            return jsonify(node_data), status_code
+            response = jsonify(node_data)
+            response.status_code = status_code
+            return self.build_detail_store_after(response)
         except Exception as e:
             self.app.logger.error("Error in root_details")
             return jsonify({
@@ -408,541 +882,161 @@ class AIAlignmentVisualizer:
                 "fallback_to_generated": True
             }), 500
 
-    def build_graph_data(self):
-        """Build visualization graph data with nodes and links."""
+    def get_detail_store(self):
+        """Return the store of pre-encoded details when it is ready, else None.
+
+        Encoding every node's details takes over 100 ms on the current corpus,
+        so requests never wait for it: compiled snapshots and watcher rebuilds
+        provide the store, and otherwise it is built after the response that
+        found it missing (see build_detail_store_after).
+        """
         try:
-            # Get data sources
-            root_data = self.get_root_data()
-            if not isinstance(root_data, dict):
-                self.app.logger.error(f"Root data is not a dictionary: {type(root_data)}")
-                return {"nodes": [], "links": [], "error": "Root data is not valid"}
-                
-            components = self.get_components()
-            subcomponents = self.get_subcomponents()
-            
-            # Create nodes and links with optimized data structures
-            nodes = []
-            links = []
-            node_map = {}  # For faster lookups
-            
-            # Add root node
-            root_node = {
-                "id": root_data.get("id", "ai-alignment"),
-                "name": root_data.get("name", "AI Alignment"),
-                "type": "component_group",
-                "description": root_data.get("description", "AI Alignment"),
-                "level": 0,
-                "expandable": True,
-                "has_children": bool(components)  # Faster than len() check
-            }
-            nodes.append(root_node)
-            node_map[root_node["id"]] = root_node
-            
-            # Add component nodes with batch processing
-            for component_id, component in components.items():
-                if not isinstance(component, dict):
-                    self.app.logger.warning(f"Component {component_id} is not a dictionary, skipping")
-                    continue
-                    
-                # Check if this component has any subcomponents - use set for faster lookup
-                component_subcomponents = {s_id: s for s_id, s in subcomponents.items() 
-                                        if isinstance(s, dict) and "parent" in s and s["parent"] == component_id}
-                has_children = bool(component_subcomponents)
-                
-                component_node = {
-                    "id": component_id,
-                    "name": component.get("name", component_id),
-                    "type": "component",
-                    "description": component.get("description", ""),
-                    "parent": root_node["id"],
-                    "level": 1,
-                    "expandable": has_children,
-                    "has_children": has_children
-                }
-                nodes.append(component_node)
-                node_map[component_id] = component_node
-                
-                # Add link from root to component
-                links.append({
-                    "source": root_node["id"],
-                    "target": component_id,
-                    "type": "contains"
-                })
-                
-                # Process subcomponents in batches
-                for subcomp_id, subcomp in component_subcomponents.items():
-                    capabilities = []
-                    if "capabilities" in subcomp:
-                        cap_obj = subcomp["capabilities"]
-                        if isinstance(cap_obj, list):
-                            capabilities = cap_obj
-                        elif isinstance(cap_obj, dict) and "items" in cap_obj:
-                            capabilities = cap_obj["items"]
-                        else:
-                            self.app.logger.warning(f"Unexpected capabilities format in {subcomp_id}: {type(cap_obj)}")
-                    
-                    has_children = bool(capabilities)
-                    
-                    subcomp_node = {
-                        "id": subcomp_id,
-                        "name": subcomp.get("name", subcomp_id),
-                        "type": "subcomponent",
-                        "description": subcomp.get("description", ""),
-                        "parent": component_id,
-                        "level": 2,
-                        "expandable": has_children,
-                        "has_children": has_children
-                    }
-                    nodes.append(subcomp_node)
-                    node_map[subcomp_id] = subcomp_node
-                    
-                    links.append({
-                        "source": component_id,
-                        "target": subcomp_id,
-                        "type": "contains"
-                    })
-                    
-                    # Now add capabilities and their deeper descendants
-                    for capability in capabilities:
-                        if not isinstance(capability, dict):
-                            self.app.logger.warning(f"Capability in {subcomp_id} is not a dictionary, skipping")
-                            continue
-                            
-                        capability_id = capability.get("id", f"{subcomp_id}-capability-{len(nodes)}")
-                        functions = capability.get("functions", [])
-                        has_capability_children = bool(functions)
-                        
-                        capability_node = {
-                            "id": capability_id,
-                            "name": capability.get("name", "Capability"),
-                            "type": "capability",
-                            "description": capability.get("description", ""),
-                            "parent": subcomp_id,
-                            "level": 3,
-                            "expandable": has_capability_children,
-                            "has_children": has_capability_children
-                        }
-                        
-                        nodes.append(capability_node)
-                        node_map[capability_id] = capability_node
-                        
-                        links.append({
-                            "source": subcomp_id,
-                            "target": capability_id,
-                            "type": "has_capability"
-                        })
-                        
-                        # Add functions
-                        for function in functions:
-                            if not isinstance(function, dict):
-                                self.app.logger.warning(f"Function in {capability_id} is not a dictionary, skipping")
-                                continue
-                                
-                            function_id = function.get("id", f"{capability_id}-function-{len(nodes)}")
-                            specifications = function.get("specifications", [])
-                            has_function_children = bool(specifications)
-                            
-                            function_node = {
-                                "id": function_id,
-                                "name": function.get("name", "Function"),
-                                "type": "function",
-                                "description": function.get("description", ""),
-                                "parent": capability_id,
-                                "level": 4,
-                                "expandable": has_function_children,
-                                "has_children": has_function_children
-                            }
-                            
-                            nodes.append(function_node)
-                            node_map[function_id] = function_node
-                            
-                            links.append({
-                                "source": capability_id,
-                                "target": function_id,
-                                "type": "has_function"
-                            })
-                            
-                            # Add specifications
-                            for spec in specifications:
-                                if not isinstance(spec, dict):
-                                    self.app.logger.warning(f"Specification in {function_id} is not a dictionary, skipping")
-                                    continue
-                                    
-                                spec_id = spec.get("id", f"{function_id}-spec-{len(nodes)}")
-                                integration = spec.get("integration")
-                                has_spec_children = bool(integration)
-                                
-                                spec_node = {
-                                    "id": spec_id,
-                                    "name": spec.get("name", "Specification"),
-                                    "type": "specification",
-                                    "description": spec.get("description", ""),
-                                    "parent": function_id,
-                                    "level": 5,
-                                    "expandable": has_spec_children,
-                                    "has_children": has_spec_children
-                                }
-                                
-                                nodes.append(spec_node)
-                                node_map[spec_id] = spec_node
-                                
-                                links.append({
-                                    "source": function_id,
-                                    "target": spec_id,
-                                    "type": "has_specification"
-                                })
-                                
-                                # Add integration if present
-                                if integration and isinstance(integration, dict):
-                                    integration_id = integration.get("id", f"{spec_id}-integration-{len(nodes)}")
-                                    techniques = integration.get("techniques", [])
-                                    has_integration_children = bool(techniques)
-                                    
-                                    integration_node = {
-                                        "id": integration_id,
-                                        "name": integration.get("name", "Integration"),
-                                        "type": "integration",
-                                        "description": integration.get("description", ""),
-                                        "parent": spec_id,
-                                        "level": 6,
-                                        "expandable": has_integration_children,
-                                        "has_children": has_integration_children
-                                    }
-                                    
-                                    nodes.append(integration_node)
-                                    node_map[integration_id] = integration_node
-                                    
-                                    links.append({
-                                        "source": spec_id,
-                                        "target": integration_id,
-                                        "type": "has_integration"
-                                    })
-                                    
-                                    # Add techniques 
-                                    for technique in techniques:
-                                        if not isinstance(technique, dict):
-                                            self.app.logger.warning(f"Technique in {integration_id} is not a dictionary, skipping")
-                                            continue
-                                            
-                                        technique_id = technique.get("id", f"{integration_id}-technique-{len(nodes)}")
-                                        applications = technique.get("applications", [])
-                                        has_technique_children = bool(applications)
-                                        
-                                        technique_node = {
-                                            "id": technique_id,
-                                            "name": technique.get("name", "Technique"),
-                                            "type": "technique",
-                                            "description": technique.get("description", ""),
-                                            "parent": integration_id,
-                                            "level": 7,
-                                            "expandable": has_technique_children,
-                                            "has_children": has_technique_children
-                                        }
-                                        
-                                        nodes.append(technique_node)
-                                        node_map[technique_id] = technique_node
-                                        
-                                        links.append({
-                                            "source": integration_id,
-                                            "target": technique_id,
-                                            "type": "has_technique"
-                                        })
-                                        
-                                        # Add applications (deeper level)
-                                        for app in applications:
-                                            if not isinstance(app, dict):
-                                                self.app.logger.warning(f"Application in {technique_id} is not a dictionary, skipping")
-                                                continue
-                                                
-                                            app_id = app.get("id", f"{technique_id}-app-{len(nodes)}")
-                                            
-                                            # Get inputs and directly extract outputs
-                                            inputs = app.get("inputs", [])
-                                            standalone_outputs = app.get("outputs", [])  # Some apps have direct outputs
-                                            nested_outputs = []  # Outputs from inputs
-                                            
-                                            # Extract all outputs from inputs
-                                            for input_item in inputs:
-                                                if isinstance(input_item, dict) and "outputs" in input_item:
-                                                    input_outputs = input_item.get("outputs", [])
-                                                    if isinstance(input_outputs, list):
-                                                        nested_outputs.extend(input_outputs)
-                                                    elif isinstance(input_outputs, dict):
-                                                        nested_outputs.append(input_outputs)
-                                            
-                                            # Combine all outputs
-                                            outputs = standalone_outputs + nested_outputs
-                                            
-                                            # Ensure uniqueness by ID
-                                            unique_outputs = []
-                                            output_ids = set()
-                                            for output in outputs:
-                                                if not isinstance(output, dict):
-                                                    continue
-                                                output_id = output.get("id")
-                                                if output_id and output_id not in output_ids:
-                                                    output_ids.add(output_id)
-                                                    unique_outputs.append(output)
-                                                elif not output_id:  # If no ID, include anyway
-                                                    unique_outputs.append(output)
-                                            
-                                            outputs = unique_outputs
-                                            has_app_children = bool(inputs) or bool(outputs)
-                                            
-                                            app_node = {
-                                                "id": app_id,
-                                                "name": app.get("name", "Application"),
-                                                "type": "application",
-                                                "description": app.get("description", ""),
-                                                "parent": technique_id,
-                                                "level": 8,
-                                                "expandable": has_app_children,
-                                                "has_children": has_app_children
-                                            }
-                                            
-                                            nodes.append(app_node)
-                                            node_map[app_id] = app_node
-                                            
-                                            links.append({
-                                                "source": technique_id,
-                                                "target": app_id,
-                                                "type": "has_application"
-                                            })
-                                            
-                                            # Add inputs as direct children of application
-                                            for input_item in inputs:
-                                                if not isinstance(input_item, dict):
-                                                    continue
-                                                    
-                                                input_id = input_item.get("id", f"{app_id}-input-{len(nodes)}")
-                                                
-                                                input_node = {
-                                                    "id": input_id,
-                                                    "name": input_item.get("name", "Input"),
-                                                    "type": "input",
-                                                    "description": input_item.get("description", ""),
-                                                    "parent": app_id,
-                                                    "level": 9,
-                                                    "expandable": False,
-                                                    "has_children": False
-                                                }
-                                                
-                                                nodes.append(input_node)
-                                                node_map[input_id] = input_node
-                                                
-                                                links.append({
-                                                    "source": app_id,
-                                                    "target": input_id,
-                                                    "type": "has_input"
-                                                })
-                                            
-                                            # Add outputs as direct children of application (siblings to inputs)
-                                            for output_idx, output_item in enumerate(outputs):
-                                                if not isinstance(output_item, dict):
-                                                    continue
-                                                    
-                                                # Ensure output has a good ID to avoid clashes
-                                                if "id" in output_item and output_item["id"]:
-                                                    output_id = output_item["id"]
-                                                else:
-                                                    output_id = f"{app_id}-output-{output_idx}"
-                                                    
-                                                output_node = {
-                                                    "id": output_id,
-                                                    "name": output_item.get("name", f"Output {output_idx+1}"),
-                                                    "type": "output",
-                                                    "description": output_item.get("description", ""),
-                                                    "parent": app_id,  # Direct child of application
-                                                    "level": 9,        # Same level as inputs
-                                                    "expandable": False,
-                                                    "has_children": False
-                                                }
-                                                
-                                                # Only add if not already in nodes
-                                                if output_id not in node_map:
-                                                    nodes.append(output_node)
-                                                    node_map[output_id] = output_node
-                                                    
-                                                    links.append({
-                                                        "source": app_id,
-                                                        "target": output_id,
-                                                        "type": "has_output"
-                                                    })
-            
-            # Process cross-connections and additional relationships
-            for component_id, component in components.items():
-                if not isinstance(component, dict):
-                    continue
-                    
-                # Handle component relationships
-                if "relationships" in component:
-                    relationships = component["relationships"]
-                    if isinstance(relationships, list):
-                        for rel in relationships:
-                            if not isinstance(rel, dict):
-                                continue
-                                
-                            rel_id = rel.get("id")
-                            rel_type = rel.get("relationship_type")
-                            if rel_id and rel_type:
-                                links.append({
-                                    "source": component_id,
-                                    "target": rel_id,
-                                    "type": rel_type,
-                                    "description": rel.get("description", "")
-                                })
-                                
-                                # Add integration points if they exist
-                                if "integration_points" in rel:
-                                    for point in rel["integration_points"]:
-                                        if isinstance(point, dict) and "this_component_function" in point and "other_component_function" in point:
-                                            links.append({
-                                                "source": point["this_component_function"],
-                                                "target": point["other_component_function"],
-                                                "type": "integration_point",
-                                                "description": point.get("description", "")
-                                            })
-                    else:
-                        self.app.logger.warning(f"Relationships in {component_id} is not a list: {type(relationships)}")
+            return node_details_helper.get_ready_detail_store()
+        except Exception as e:
+            self.app.logger.error(f"Detail store unavailable: {str(e)}")
+            return None
 
-            # Process subcomponent cross-connections
-            for subcomp_id, subcomp in subcomponents.items():
-                if not isinstance(subcomp, dict):
-                    continue
-                    
-                if "cross_connections" in subcomp:
-                    connections = subcomp["cross_connections"]
-                    if isinstance(connections, list):
-                        for conn in connections:
-                            if not isinstance(conn, dict):
-                                continue
-                                
-                            source_id = conn.get("source_id")
-                            target_id = conn.get("target_id")
-                            conn_type = conn.get("type")
-                            if source_id and target_id and conn_type:
-                                links.append({
-                                    "source": source_id,
-                                    "target": target_id,
-                                    "type": conn_type,
-                                    "description": conn.get("description", "")
-                                })
-                    else:
-                        self.app.logger.warning(f"Cross connections in {subcomp_id} is not a list: {type(connections)}")
+    def build_detail_store_after(self, response):
+        """Have the detail store built once response has been sent; returns response."""
+        response.call_on_close(self.build_detail_store)
+        return response
 
-            # Process capability implementations
-            for subcomp_id, subcomp in subcomponents.items():
-                if not isinstance(subcomp, dict):
-                    continue
-                    
-                if "capabilities" in subcomp:
-                    capabilities = subcomp["capabilities"]
-                    if isinstance(capabilities, list):
-                        for cap in capabilities:
-                            if not isinstance(cap, dict):
-                                continue
-                                
-                            if "implements_component_capabilities" in cap:
-                                impls = cap["implements_component_capabilities"]
-                                if isinstance(impls, list):
-                                    for impl_cap in impls:
-                                        links.append({
-                                            "source": cap.get("id", ""),
-                                            "target": impl_cap,
-                                            "type": "implements",
-                                            "description": "Implements component capability"
-                                        })
-                                else:
-                                    self.app.logger.warning(f"Implements component capabilities in {cap.get('id', '')} is not a list: {type(impls)}")
-                    else:
-                        self.app.logger.warning(f"Capabilities in {subcomp_id} is not a list: {type(capabilities)}")
+    def build_detail_store(self):
+        """Build the detail store for the current corpus version, unless another thread is already at it."""
+        if not self._detail_store_lock.acquire(blocking=False):
+            return
+        try:
+            node_details_helper.get_detail_store()
+        except Exception as e:
+            self.app.logger.error(f"Could not build the detail store: {str(e)}")
+        finally:
+            self._detail_store_lock.release()
 
-            # Process function implementations
-            for subcomp_id, subcomp in subcomponents.items():
-                if not isinstance(subcomp, dict):
-                    continue
-                    
-                if "functions" in subcomp:
-                    functions = subcomp["functions"]
-                    if isinstance(functions, list):
-                        for func in functions:
-                            if not isinstance(func, dict):
-                                continue
-                                
-                            if "implements_component_functions" in func:
-                                impls = func["implements_component_functions"]
-                                if isinstance(impls, list):
-                                    for impl_func in impls:
-                                        links.append({
-                                            "source": func.get("id", ""),
-                                            "target": impl_func,
-                                            "type": "implements",
-                                            "description": "Implements component function"
-                                        })
-                                else:
-                                    self.app.logger.warning(f"Implements component functions in {func.get('id', '')} is not a list: {type(impls)}")
-                    else:
-                        self.app.logger.warning(f"Functions in {subcomp_id} is not a list: {type(functions)}")
+    def get_detail_bytes(self, node_id):
+        """Return a memoryview of a node's pre-encoded details, or None when the node has none.
 
-            self.app.logger.info(f"Built comprehensive graph with {len(nodes)} nodes and {len(links)} links")
-            return {"nodes": nodes, "links": links}
-        except Exception as e:
-            self.app.logger.error(f"Error in build_graph_data: {str(e)}", exc_info=True)
-            # Return an empty graph rather than failing completely
-            return {"nodes": [], "links": [], "error": str(e)}
+        The store holds every node get_node_details resolves, so callers only
+        fall back to get_node_details while the store is not ready.
+        """
+        store = self.get_detail_store()
+        if store is None:
+            return None
+        with METRICS.timer("detail_lookup"):
+            return store.get(node_id)
+
+    def detail_response(self, body):
+        """Stream a pre-encoded detail payload without copying it out of the store."""
+        response = Response([body], mimetype='application/json')
+        response.content_length = body.nbytes
+        return response
+
+    def get_graph_data(self):
+        """Return the graph data, built once per corpus version."""
+        return node_details_helper.CORPUS_CACHE.memoize("graph", self.build_graph_data)
+
+    def get_graph_layout(self):
+        """Return [[x, y, z]] per graph node when one was computed off the request path, else None.
+
+        Layouts come from a compiled snapshot or from the watcher's rebuild
+        (warm_corpus). Requests never run the simulation: without either,
+        the graph is served without positions and the page lays it out.
+        """
+        return node_details_helper.CORPUS_CACHE.memoize("graph_layout", lambda: None)
+
+    def build_graph_layout(self):
+        """Run the layout simulation, or return None when disabled or without NumPy."""
+        if not config.GRAPH_LAYOUT_ENABLED:
+            return None
+        graph = self.get_graph_data()
+        with METRICS.timer("graph_layout"):
+            return graph_layout.compute_layout(
+                graph, config.GRAPH_LAYOUT_ITERATIONS, config.GRAPH_LAYOUT_SAMPLES
+            )
+
+    def get_positioned_graph(self):
+        """Return the graph with x/y/z on every node when a layout is available."""
+        graph = self.get_graph_data()
+        layout = self.get_graph_layout()
+        if layout is None:
+            return graph
+        # Copies the nodes: graph's own are shared with the fragment cache
+        return graph_layout.with_positions(graph, layout)
+
+    def get_graph_payload(self):
+        """Return the graph encoded as JSON bytes with compressed variants, once per corpus version."""
+        def build():
+            graph = self.get_positioned_graph()
+            with METRICS.timer("graph_serialize"):
+                return encoded_payload.EncodedPayload.from_json(graph)
+        return node_details_helper.CORPUS_CACHE.memoize("graph_payload", build)
+
+    def get_graph_version(self):
+        """Return the graph's content hashes and version id, computed once per corpus version."""
+        version = node_details_helper.CORPUS_CACHE.memoize("graph_version", self.build_graph_version)
+        # Recorded when served rather than when built, so a version the watcher
+        # is still preparing does not wake event streams early
+        self.graph_history.record(version)
+        return version
+
+    def get_graph_version_id(self):
+        """Return the graph's version id, without recording it; compiled snapshots carry it, so a cold process need not hash the graph.
+
+        Whoever sends the id to a client must see that the version gets recorded (see graph()).
+        """
+        return node_details_helper.CORPUS_CACHE.memoize("graph_version_id", self.build_graph_version_id)
+
+    def build_graph_version_id(self):
+        return node_details_helper.CORPUS_CACHE.memoize("graph_version", self.build_graph_version).id
+
+    def build_graph_version(self):
+        graph = self.get_graph_data()
+        with METRICS.timer("graph_hash"):
+            return graph_delta.GraphVersion(graph, previous=self.graph_history.latest)
+
+    def get_graph_columns_payload(self):
+        """Return the graph in the columnar binary encoding with compressed variants, once per corpus version."""
+        def build():
+            graph = self.get_positioned_graph()
+            with METRICS.timer("graph_columns_serialize"):
+                return encoded_payload.EncodedPayload(graph_columns.encode_graph(graph), mimetype=graph_columns.MIMETYPE)
+        return node_details_helper.CORPUS_CACHE.memoize("graph_columns_payload", build)
+
+    def get_graph_index(self):
+        """Return the parent/children index over the graph, built once per corpus version."""
+        return node_details_helper.CORPUS_CACHE.memoize(
+            "graph_index",
+            lambda: graph_builder.GraphIndex(self.get_graph_data())
+        )
+
+    def get_graph_summaries(self):
+        """Return the (max_nodes, depth) -> summary cache, emptied with each corpus version."""
+        return node_details_helper.CORPUS_CACHE.memoize("graph_summaries", OrderedDict)
+
+    def build_graph_data(self):
+        """Build visualization graph data with nodes and links.
+
+        Raises when the corpus cannot be turned into a graph, so nothing is
+        memoized for the version and the next request tries again; routes
+        build their own error responses.
+        """
+        # Get data sources
+        root_data = self.get_root_data()
+        if not isinstance(root_data, dict):
+            raise ValueError(f"Root data is not a dictionary: {type(root_data)}")
+
+        components = self.get_components()
+        subcomponents = self.get_subcomponents()
+
+        with METRICS.timer("graph_build"):
+            return graph_builder.build_graph_data(
+                root_data, components, subcomponents, self.app.logger, fragments=self.graph_fragments
+            )
 
 # Create and run the application
-def create_app():
+def _build_app():
     visualizer = AIAlignmentVisualizer()
     app = visualizer.app
 
-    # Add routes that need to use the app instance directly
-    @app.route('/api/details/<node_id>')
-    def node_details_route(node_id):
-        # Check rate limit for API endpoints
-        if not visualizer.check_rate_limit():
-            return jsonify({"error": "Rate limit exceeded"}), 429
-            
-        # Basic input validation - only allow alphanumeric, hyphens, underscores
-        if not node_id or not isinstance(node_id, str) or not node_id.replace('-', '').replace('_', '').isalnum():
-            return jsonify({
-                "error": "Invalid node identifier",
-                "id": "invalid",
-                "name": "Invalid Node",
-                "description": "Node identifier contains invalid characters",
-                "type": "error"
-            }), 400
-            
-        try:
-            # Use the new helper module for all node requests
-            node_data, status_code = node_details_helper.get_node_details(node_id)
-            return jsonify(node_data), status_code
-        except Exception as e:
-            app.logger.error(f"Error in node_details_route for {node_id}")
-            return jsonify({
-                "error": "Server error processing node",
-                "id": node_id,
-                "name": "Error Loading Node",
-                "description": "Could not load node details",
-                "type": "error"
-            }), 500
-    
-    # Add a specific route for the root node
-    @app.route('/api/root')
-    def root_node():
-        # Check rate limit for API endpoints
-        if not visualizer.check_rate_limit():
-            return jsonify({"error": "Rate limit exceeded"}), 429
-            
-        try:
-            node_data, status_code = node_details_helper.get_node_details("ai-alignment")
-            return jsonify(node_data), status_code
-        except Exception as e:
-            app.logger.error("Error in root_node")
-            return jsonify({
-                "error": "Server error processing root node"
-            }), 500
-
     @app.errorhandler(404)
     def not_found(error):
         return jsonify({"error": "Resource not found"}), 404
@@ -990,54 +1084,56 @@ def create_app():
 
     return app
 
-app = create_app()
-
-# Define absolute paths correctly for Windows environment
-APP_DIR = os.path.abspath(os.path.dirname(__file__))
-PARENT_DIR = os.path.abspath(os.path.join(APP_DIR, ".."))
-COMPONENTS_DIR = os.path.normpath(os.path.join(PARENT_DIR, "components"))
-SUBCOMPONENTS_DIR = os.path.normpath(os.path.join(PARENT_DIR, "subcomponents"))
-ROOT_JSON_FILE = os.path.normpath(os.path.join(PARENT_DIR, "ai-alignment.json"))
-
-# Print paths to verify
-app.logger.info(f"APP_DIR: {APP_DIR}")
-app.logger.info(f"PARENT_DIR: {PARENT_DIR}")
-app.logger.info(f"COMPONENTS_DIR: {COMPONENTS_DIR}")
-app.logger.info(f"SUBCOMPONENTS_DIR: {SUBCOMPONENTS_DIR}")
-app.logger.info(f"ROOT_JSON_FILE: {ROOT_JSON_FILE}")
-
-# Default data to use if files aren't found
-DEFAULT_ROOT_DATA = {
-    "id": "ai-alignment",
-    "name": "AI Alignment",
-    "description": "Methods to ensure AI systems remain aligned with human values and intentions.",
-    "type": "component_group",
-    "components": [
-        {
-            "id": "technical-safeguards",
-            "name": "Technical Safeguards",
-            "description": "Engineering approaches to ensure AI systems behave as intended"
-        },
-        {
-            "id": "value-learning",
-            "name": "Value Learning",
-            "description": "Systems that enable AI to learn and internalize human values"
-        },
-        {
-            "id": "interpretability-tools",
-            "name": "Interpretability Tools",
-            "description": "Methods to understand AI reasoning and decision-making"
-        },
-        {
-            "id": "oversight-mechanisms",
-            "name": "Oversight Mechanisms",
-            "description": "Systems for monitoring and evaluating AI behavior"
-        }
-    ]
-}
+
+def profile_startup(app, setup_seconds):
+    """Log import and app setup time, and the latency of the first request."""
+    app.logger.warning(
+        f"Startup profile: imports {(_IMPORT_END - _IMPORT_START) * 1000:.1f} ms, "
+        f"app setup {setup_seconds * 1000:.1f} ms"
+    )
+    first = {}
+
+    @app.before_request
+    def start_first_request():
+        if not first:
+            first["start"] = time.perf_counter()
+
+    @app.after_request
+    def log_first_request(response):
+        if "start" in first and "done" not in first:
+            first["done"] = True
+            now = time.perf_counter()
+            app.logger.warning(
+                f"Startup profile: first request {request.path} took {(now - first['start']) * 1000:.1f} ms, "
+                f"{(now - _IMPORT_START) * 1000:.1f} ms after import"
+            )
+        return response
+
+
+_app = None
+_app_lock = threading.Lock()
+
+
+def create_app():
+    """Return this process's Flask app, creating it and registering its routes on the first call."""
+    global _app
+    with _app_lock:
+        if _app is None:
+            start = time.perf_counter()
+            _app = _build_app()
+            if os.environ.get("AI_ALIGNMENT_STARTUP_PROFILE"):
+                profile_startup(_app, time.perf_counter() - start)
+    return _app
+
+
+def __getattr__(name):
+    # WSGI servers import "visualizer.app:app"; build it on first access rather than at import
+    if name == "app":
+        return create_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 3000))
     print(f"Starting AI Alignment Visualization on http://localhost:{port}/")
-    visualizer = AIAlignmentVisualizer()
-    visualizer.run(port=port) 
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=port, debug=False)
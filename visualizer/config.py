@@ -1,5 +1,7 @@
 # Security Configuration for AI Alignment Visualizer
 
+import os
+
 # Your domain configuration - update this when you get your custom domain
 ALLOWED_ORIGINS = [
     'https://ai-alignment.vercel.app',  # Your main Vercel domain
@@ -15,6 +17,61 @@ VERCEL_PREVIEW_PATTERN = r'^https://ai-alignment-[a-z0-9]+-raphaes-projects-7d61
 # Rate limiting settings (per IP address)
 RATE_LIMIT_WINDOW = 60          # Time window in seconds (1 minute)
 RATE_LIMIT_MAX_REQUESTS = 100   # Max requests per window per IP
+RATE_LIMIT_BACKEND = 'memory'   # 'memory' (per process) or 'sqlite' (shared by workers on one host)
+RATE_LIMIT_SQLITE_PATH = '/tmp/ai-alignment-rate-limits.sqlite3'  # Used by the sqlite backend
+RATE_LIMIT_MAX_CLIENTS = 10000  # Least recently seen clients beyond this are forgotten
+# Proxies in front of the app that append to X-Forwarded-For. Must match the real proxy chain:
+# with more than there are, clients choose their own rate limit key by sending the header.
+# Vercel (which sets VERCEL=1) puts exactly one in front; elsewhere the socket address is used.
+RATE_LIMIT_TRUSTED_PROXIES = 1 if os.environ.get('VERCEL') else 0
+
+# Batch endpoints
+BATCH_MAX_NODE_IDS = 100        # Max node ids accepted by a single batch request
+
+# Lazy graph windows
+GRAPH_WINDOW_MAX_DEPTH = 9      # Deepest subtree a single /api/graph/subtree request may ask for
+
+# Level-of-detail summaries (/api/graph/summary)
+GRAPH_SUMMARY_DEFAULT_NODES = 500  # Node budget when a request gives no ?max_nodes=
+GRAPH_SUMMARY_CACHE_SIZE = 32      # Summaries kept per corpus version, most recently used first
+
+# Streaming graph (Accept: application/x-ndjson)
+GRAPH_STREAM_CHUNK_BYTES = 16384  # NDJSON lines are flushed to the client in chunks of about this size
+
+# Server-side 3D layout, served as x/y/z on /api/graph nodes. Computed when compiling a
+# snapshot and on hot-reload rebuilds, never on a request. Needs NumPy (optional, not in
+# requirements.txt); without a layout the page lays the graph out itself.
+GRAPH_LAYOUT_ENABLED = True
+GRAPH_LAYOUT_ITERATIONS = 100   # Simulation steps, run once per snapshot or rebuild
+GRAPH_LAYOUT_SAMPLES = 64       # Nodes each step estimates repulsion from
+
+# Graph deltas (/api/graph/delta) and change events (/api/graph/events)
+GRAPH_DELTA_HISTORY = 16        # Graph versions remembered as delta bases; older clients refetch the graph
+GRAPH_EVENTS_POLL_INTERVAL = 15  # Seconds between change checks and keep-alives on an event stream
+GRAPH_EVENTS_MAX_SECONDS = 300  # Streams are closed after this long; browsers reconnect with Last-Event-ID
+
+# Corpus loading
+# 'serial', 'thread' or 'process'. Threads pay off when reads are slow (network-backed
+# storage); parsing holds the GIL, and process pools pay to pickle results back, so
+# with the corpus in the page cache serial loading is fastest.
+CORPUS_LOAD_EXECUTOR = 'serial'
+CORPUS_LOAD_WORKERS = 4         # Files read and parsed at once by the 'thread' and 'process' executors
+
+# Hot reload. A background thread rebuilds the corpus when files change and requests are
+# served the last completed build; leave off on serverless hosts, which freeze idle threads.
+CORPUS_WATCH_ENABLED = False
+CORPUS_WATCH_INTERVAL = 1.0     # Seconds between polls when inotify_simple is not installed
+
+# Instrumentation
+METRICS_ENABLED = False         # Time request stages, serve /metrics and add Server-Timing headers
+
+# Health checks
+HEALTH_DEEP_CHECK_INTERVAL = 10  # Seconds a deep /api/health result is reused before checking again
+
+# Search
+SEARCH_MAX_QUERY_LENGTH = 200   # Longer queries are rejected
+SEARCH_DEFAULT_RESULTS = 20     # Results returned when no limit is given
+SEARCH_MAX_RESULTS = 100        # Upper bound for ?limit=
 
 # Security headers
 SECURITY_HEADERS = {
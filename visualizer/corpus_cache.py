@@ -0,0 +1,322 @@
+import os
+import glob
+import logging
+import threading
+import time
+from concurrent import futures
+
+logger = logging.getLogger(__name__)
+
+# Placeholder for files registered by prime() that have not been parsed yet
+_UNPARSED = object()
+
+# memoize()'s marker for a name missing from the published values
+_MISSING = object()
+
+# Executors load_many can parse with; "serial" parses in the calling thread
+EXECUTORS = {
+    "thread": futures.ThreadPoolExecutor,
+    "process": futures.ProcessPoolExecutor,
+}
+
+
+def _timed_parse(parser, path):
+    """Parse path, returning (data, seconds). Module level so process pools can pickle it."""
+    start = time.perf_counter()
+    data = parser(path)
+    return data, time.perf_counter() - start
+
+
+class CorpusCache:
+    """Process-wide cache of parsed JSON files, revalidated by stat signature.
+
+    Each file is parsed once and kept until its (mtime, size, inode) signature
+    changes. The cache also tracks the listing of every directory it has been
+    asked to scan, so added or removed files are noticed as well.
+
+    ``version`` is bumped whenever a previously seen file or directory listing
+    changes, which lets derived data (graph, indexes, ...) be memoized per
+    corpus version through ``memoize``.
+
+    Outside published mode, ``memoize`` re-stats the corpus on every call,
+    or once per request between ``begin_request`` and ``end_request``.
+
+    Once ``rebuild`` has run, the cache is in published mode: a background
+    thread owns change detection, and ``memoize`` answers from the last
+    published set of derived values without stat'ing anything, while the
+    next set is built on that thread.
+    """
+
+    def __init__(self, parser, executor="serial", workers=1):
+        self._parser = parser
+        self.executor = executor
+        self.workers = workers
+        self._timings = {}      # path -> seconds its last parse took
+        self._lock = threading.RLock()
+        self._entries = {}      # path -> (signature, data)
+        self._listings = {}     # (directory, pattern) -> tuple of paths
+        self._derived = {}      # name -> (version, value, built by rebuild())
+        self._stale = set()     # paths dropped by refresh(), reparsed as reloads
+        self._primed = {}       # name -> (version, builder) overriding memoize's builder
+        self._published = None  # (version, {name: value}) served to requests once rebuild() has run
+        # .rebuilding is set on the thread running rebuild(), .in_request between begin_request() and end_request()
+        self._local = threading.local()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.last_reload = None  # time.time() a file was last parsed or adopted
+
+    @property
+    def version(self):
+        return self._version
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _bump(self, reason):
+        self._version += 1
+        self._derived.clear()
+        self._primed.clear()
+        logger.debug(f"Corpus version {self._version}: {reason}")
+
+    def configure_pool(self, executor, workers):
+        """Set how load_many parses files: "serial", "thread" or "process", with up to workers at once."""
+        if executor != "serial" and executor not in EXECUTORS:
+            raise ValueError(f"Unknown corpus load executor: {executor}")
+        self.executor = executor
+        self.workers = workers
+
+    def load(self, file_path):
+        """Return the parsed contents of file_path, parsing only on first use or change."""
+        path = os.path.normpath(file_path)
+        return self.load_many([path])[path]
+
+    def load_many(self, file_paths):
+        """Return {normalized path: parsed contents} for file_paths, in the order given.
+
+        Files that are new or changed are parsed together, concurrently when
+        a pool is configured; results are stored in path order, so the
+        outcome does not depend on which parse finishes first.
+        """
+        paths = [os.path.normpath(path) for path in file_paths]
+        results = {}
+        pending = []  # (path, signature) still to parse
+        with self._lock:
+            for path in dict.fromkeys(paths):
+                signature = self._signature(path)
+                entry = self._entries.get(path)
+                if entry is not None and signature is not None and entry[0] == signature:
+                    if entry[1] is not _UNPARSED:
+                        self.hits += 1
+                        results[path] = entry[1]
+                        continue
+                    entry = None
+
+                if entry is not None:
+                    self.reloads += 1
+                    del self._entries[path]
+                    self._bump(f"{path} changed")
+                elif path in self._stale:
+                    self.reloads += 1
+                    self._stale.discard(path)
+                else:
+                    self.misses += 1
+                pending.append((path, signature))
+
+            if pending:
+                parsed = self._parse_all([path for path, _ in pending])
+                for (path, signature), (data, seconds) in zip(pending, parsed):
+                    self._timings[path] = seconds
+                    # Parse failures are cached too, so a broken file is only retried
+                    # once it changes; missing files are retried on every call.
+                    if signature is not None:
+                        self._entries[path] = (signature, data)
+                    results[path] = data
+                self.last_reload = time.time()
+        return {path: results[path] for path in paths}
+
+    def _parse_all(self, paths):
+        """Return [(data, seconds)] for paths, through the configured pool when it is worth it."""
+        workers = min(self.workers, len(paths))
+        if self.executor != "serial" and workers > 1:
+            try:
+                with EXECUTORS[self.executor](max_workers=workers) as pool:
+                    return list(pool.map(_timed_parse, [self._parser] * len(paths), paths))
+            except (OSError, RuntimeError, NotImplementedError, futures.BrokenExecutor) as e:
+                # Some sandboxes (e.g. serverless runtimes without /dev/shm) can't start pools
+                logger.warning(f"Parallel corpus load failed, loading serially: {str(e)}")
+        return [_timed_parse(self._parser, path) for path in paths]
+
+    def timings(self):
+        """Return {path: milliseconds} of each file's last parse, slowest first."""
+        with self._lock:
+            ordered = sorted(self._timings.items(), key=lambda item: item[1], reverse=True)
+        return {path: round(seconds * 1000, 3) for path, seconds in ordered}
+
+    def list_files(self, directory, pattern="*.json"):
+        """Return the sorted list of files in directory matching pattern."""
+        directory = os.path.normpath(directory)
+        files = tuple(sorted(glob.glob(os.path.join(directory, pattern))))
+        key = (directory, pattern)
+        with self._lock:
+            previous = self._listings.get(key)
+            if previous is not None and previous != files:
+                for path in set(previous) - set(files):
+                    self._entries.pop(path, None)
+                self._bump(f"listing of {directory} changed")
+            self._listings[key] = files
+        return list(files)
+
+    def refresh(self):
+        """Re-stat every known file and directory, bumping the version on change."""
+        with self._lock:
+            for (directory, pattern) in list(self._listings):
+                self.list_files(directory, pattern)
+            for path, (signature, _) in list(self._entries.items()):
+                if self._signature(path) != signature:
+                    del self._entries[path]
+                    self._stale.add(path)
+                    self._bump(f"{path} changed")
+            return self._version
+
+    def prime(self, files, listings, builders):
+        """Adopt files and directory listings without parsing them, and preload derived builders.
+
+        Used when derived data comes from somewhere other than the files
+        (e.g. a compiled snapshot): the files are only stat'ed so later
+        changes are still detected, and until then memoize() uses the
+        primed builders instead of the ones it is given.
+        """
+        with self._lock:
+            for (directory, pattern), paths in listings.items():
+                self._listings[(os.path.normpath(directory), pattern)] = tuple(sorted(paths))
+            for path in files:
+                path = os.path.normpath(path)
+                signature = self._signature(path)
+                if signature is not None and path not in self._entries:
+                    self._entries[path] = (signature, _UNPARSED)
+            for name, builder in builders.items():
+                self._primed[name] = (self._version, builder)
+            self.last_reload = time.time()
+
+    def begin_request(self):
+        """Re-stat the corpus once for a request; memoize on this thread then trusts it until end_request()."""
+        if self._published is None:
+            self.refresh()
+        self._local.in_request = True
+
+    def end_request(self):
+        self._local.in_request = False
+
+    def memoize(self, name, builder):
+        """Return builder() computed once per corpus version."""
+        published = self._published
+        rebuilding = getattr(self._local, "rebuilding", False)
+        if published is not None and not rebuilding:
+            value = published[1].get(name, _MISSING)
+            if value is not _MISSING:
+                return value
+            # Not built by rebuild(): build it for the current version, without re-stat'ing
+            version = self._version
+        elif getattr(self._local, "in_request", False) and not rebuilding:
+            # Re-stat'ed by begin_request()
+            version = self._version
+        else:
+            version = self.refresh()
+        with self._lock:
+            cached = self._derived.get(name)
+            # A rebuild only reuses what rebuilds built: requests may build
+            # some values differently (e.g. without the graph layout)
+            if cached is not None and cached[0] == version and (cached[2] or not rebuilding):
+                return cached[1]
+            primed = self._primed.get(name)
+            if primed is not None and primed[0] == version:
+                builder = primed[1]
+        value = builder()
+        with self._lock:
+            # Skip storing if the corpus changed while building, and never
+            # replace a rebuild's value with one a request built meanwhile
+            cached = self._derived.get(name)
+            if self._version == version and (rebuilding or cached is None or not cached[2]):
+                self._derived[name] = (version, value, rebuilding)
+        return value
+
+    def peek(self, name, builder):
+        """Return memoize(name, builder) when the value is ready, else None without building it.
+
+        Ready means published, memoized for the current version or primed
+        (primed builders read a compiled snapshot and are cheap). Versions
+        are not re-checked here; call it within a request, or after memoize.
+        """
+        published = self._published
+        if published is not None and not getattr(self._local, "rebuilding", False) and name in published[1]:
+            return published[1][name]
+        with self._lock:
+            cached = self._derived.get(name)
+            if cached is not None and cached[0] == self._version:
+                return cached[1]
+            primed = self._primed.get(name)
+            if primed is None or primed[0] != self._version:
+                return None
+        return self.memoize(name, builder)
+
+    def rebuild(self, warm):
+        """Pick up file changes, run warm() to build derived values, then publish them all at once.
+
+        warm() runs on the calling thread and should memoize everything
+        requests read. Until it returns, requests keep getting the values
+        published before, so none of them waits on the rebuild. Returns the
+        published version, or None when the corpus changed again while
+        building (the next rebuild will publish).
+        """
+        self._local.rebuilding = True
+        try:
+            version = self.refresh()
+            warm()
+        finally:
+            self._local.rebuilding = False
+        with self._lock:
+            if self._version != version:
+                return None
+            values = {
+                name: value for name, (built, value, by_rebuild) in self._derived.items()
+                if built == version and by_rebuild
+            }
+            # One reference assignment; readers see either the old set or the new one
+            self._published = (version, values)
+        logger.debug(f"Published corpus version {version} ({len(values)} derived values)")
+        return version
+
+    @property
+    def published_version(self):
+        published = self._published
+        return published[0] if published is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._published = None
+            self._entries.clear()
+            self._listings.clear()
+            self._stale.clear()
+            self._bump("cache cleared")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "version": self._version,
+                "files": sum(1 for _, data in self._entries.values() if data is not _UNPARSED),
+                "tracked": len(self._entries),
+                "last_reload": self.last_reload,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "derived": sorted(self._derived),
+                "primed": sorted(self._primed),
+                "published": self.published_version,
+            }
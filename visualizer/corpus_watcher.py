@@ -0,0 +1,124 @@
+"""
+Background watcher that rebuilds the corpus when its files change.
+
+The watcher waits for changes to the root file and the components/ and
+subcomponents/ directories, using inotify when ``inotify_simple`` is
+installed and polling file signatures otherwise. After a burst of changes
+has settled it calls ``on_change`` from its own thread, so rebuilding never
+happens on the request path. ``on_change`` also runs once when the watcher
+starts, to build the first version.
+"""
+
+import fnmatch
+import glob
+import logging
+import os
+import threading
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusWatcher:
+    """Calls on_change() on a daemon thread whenever a watched file changes.
+
+    ``targets`` is a list of (directory, pattern) pairs; a change is any file
+    matching a pattern being written, created, moved or deleted.
+    """
+
+    def __init__(self, targets, on_change, interval=1.0, settle=0.2):
+        self.targets = [(os.path.normpath(directory), pattern) for directory, pattern in targets]
+        self.on_change = on_change
+        self.interval = interval  # seconds between polls, or between stop checks with inotify
+        self.settle = settle      # seconds without further changes before on_change runs
+        self.backend = "inotify" if inotify_simple is not None else "poll"
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="corpus-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        if self.backend == "inotify":
+            try:
+                self._watch_inotify()
+                return
+            except OSError as e:
+                # Out of watches, or a filesystem without inotify support
+                logger.warning(f"inotify unavailable, polling corpus files instead: {str(e)}")
+                self.backend = "poll"
+        self._watch_poll()
+
+    def _changed(self):
+        try:
+            self.on_change()
+        except Exception as e:
+            logger.error(f"Corpus rebuild failed: {str(e)}", exc_info=True)
+
+    def signatures(self):
+        """Return {path: (mtime_ns, size, inode)} of every watched file."""
+        result = {}
+        for directory, pattern in self.targets:
+            for path in glob.glob(os.path.join(directory, pattern)):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                result[path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return result
+
+    def _watch_poll(self):
+        previous = self.signatures()
+        self._changed()
+        while not self._stop.wait(self.interval):
+            current = self.signatures()
+            if current == previous:
+                continue
+            # Let a burst of writes (e.g. a git checkout) finish first
+            while not self._stop.wait(self.settle):
+                settled = self.signatures()
+                if settled == current:
+                    break
+                current = settled
+            previous = current
+            self._changed()
+
+    def _watch_inotify(self):
+        flags = inotify_simple.flags
+        mask = flags.CLOSE_WRITE | flags.CREATE | flags.DELETE | flags.MOVED_FROM | flags.MOVED_TO
+        inotify = inotify_simple.INotify()
+        try:
+            patterns = {}
+            for directory, pattern in self.targets:
+                if os.path.isdir(directory):
+                    patterns.setdefault(inotify.add_watch(directory, mask), []).append(pattern)
+            self._changed()
+
+            def relevant(events):
+                return any(
+                    fnmatch.fnmatch(event.name, pattern)
+                    for event in events for pattern in patterns.get(event.wd, ())
+                )
+
+            while not self._stop.is_set():
+                if not relevant(inotify.read(timeout=int(self.interval * 1000))):
+                    continue
+                # Drain the rest of the burst before rebuilding
+                while not self._stop.is_set() and inotify.read(timeout=int(self.settle * 1000)):
+                    pass
+                self._changed()
+        finally:
+            inotify.close()
@@ -0,0 +1,136 @@
+"""
+Memory-mapped node detail store.
+
+Every node's detail payload is JSON-encoded once and written back to back
+into one file, with an id -> (offset, length) index. Lookups return a
+memoryview into the mapping, so the details endpoint can hand the bytes to
+the response without decoding or re-encoding them, and worker processes
+opening the same file share its pages through the OS page cache.
+
+File layout::
+
+    MAGIC | index length (uint32 LE) | index JSON | payload bytes ...
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"AIADETL1"
+_INDEX_LENGTH = struct.Struct("<I")
+
+
+class DetailStoreError(Exception):
+    pass
+
+
+def encode_details(details):
+    """Encode {node_id: detail dict} into (index, payload bytes)."""
+    data = bytearray()
+    index = {}
+    for node_id, detail in details.items():
+        body = json.dumps(detail, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        index[node_id] = [len(data), len(body)]
+        data.extend(body)
+    return index, bytes(data)
+
+
+class DetailStore:
+    """Read-only id -> pre-encoded JSON payload lookups over a buffer."""
+
+    def __init__(self, buffer, index, data_offset=0, path=None):
+        self.path = path  # backing file written by build_shared_store, if any
+        self._view = memoryview(buffer)
+        self._index = index
+        self._data_offset = data_offset
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a store file written by build_shared_store."""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(MAGIC)] != MAGIC:
+            raise DetailStoreError(f"Not a detail store file: {path}")
+        start = len(MAGIC)
+        (index_length,) = _INDEX_LENGTH.unpack_from(mapped, start)
+        start += _INDEX_LENGTH.size
+        index = json.loads(mapped[start:start + index_length])
+        return cls(mapped, index, start + index_length, path)
+
+    def get(self, node_id):
+        """Return a memoryview of node_id's encoded payload, or None."""
+        entry = self._index.get(node_id)
+        if entry is None:
+            return None
+        start = self._data_offset + entry[0]
+        return self._view[start:start + entry[1]]
+
+    def __contains__(self, node_id):
+        return node_id in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+
+def _write_store(path, header, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _matches(path, header, size):
+    """Check an existing store file has the expected size and header (magic and index)."""
+    try:
+        if os.path.getsize(path) != size:
+            return False
+        with open(path, "rb") as f:
+            return f.read(len(header)) == header
+    except OSError:
+        return False
+
+
+def private_directory(directory):
+    """Create directory readable only by this user, refusing one that others can write to."""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not hasattr(os, "getuid"):
+        return directory
+    st = os.lstat(directory)
+    if not os.path.isdir(directory) or os.path.islink(directory) or st.st_uid != os.getuid() or st.st_mode & 0o022:
+        raise DetailStoreError(f"Detail store directory is not private to this user: {directory}")
+    return directory
+
+
+def build_shared_store(directory, details, previous=None):
+    """Write details to a content-addressed file in directory and map it.
+
+    Workers that build the same corpus version end up with the same file
+    name, so they map one file and share its pages instead of each keeping
+    a private copy of the payloads. The name hashes the index and the
+    payloads; an existing file is only reused when its size and header
+    match. ``previous`` is the path of the store this one replaces, whose
+    file is deleted (mappings of it stay valid until they are closed).
+    """
+    index, data = encode_details(details)
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    header = MAGIC + _INDEX_LENGTH.pack(len(index_bytes)) + index_bytes
+    digest = hashlib.sha256(header)
+    digest.update(data)
+    path = os.path.join(private_directory(directory), f"ai-alignment-details-{digest.hexdigest()[:24]}.bin")
+    if not _matches(path, header, len(header) + len(data)):
+        _write_store(path, header, data)
+        logger.info(f"Wrote detail store {path} ({len(data)} bytes, {len(index)} nodes)")
+    store = DetailStore.open(path)
+    if previous and previous != path:
+        try:
+            os.remove(previous)
+            logger.debug(f"Removed superseded detail store {previous}")
+        except OSError:
+            pass
+    return store
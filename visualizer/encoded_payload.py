@@ -0,0 +1,88 @@
+import gzip
+import hashlib
+import json
+import logging
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only gzip is offered
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+def compress_variants(body):
+    """Return {content_encoding: compressed bytes} for every supported encoding."""
+    # mtime=0 keeps the gzip bytes identical across rebuilds of the same content
+    variants = {"gzip": gzip.compress(body, compresslevel=6, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=9)
+    return variants
+
+
+def ndjson_chunks(records, chunk_size=16384):
+    """Encode records as newline-delimited JSON, yielding chunks of about chunk_size bytes."""
+    buffer = []
+    size = 0
+    for record in records:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+class EncodedPayload:
+    """A JSON response body encoded once, with precompressed variants and a strong ETag."""
+
+    def __init__(self, body, mimetype="application/json", variants=None):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = compress_variants(body) if variants is None else dict(variants)
+
+    @classmethod
+    def from_json(cls, data):
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body)
+
+    def etag_for(self, encoding):
+        """The entity tag of the variant with content_encoding encoding (None for the identity body)."""
+        return f"{self.etag}-{encoding}" if encoding else self.etag
+
+    def etags(self):
+        """All entity tags this payload may be served under."""
+        return [self.etag_for(None)] + [self.etag_for(encoding) for encoding in self.variants]
+
+    def negotiate(self, accept_encodings):
+        """Pick the smallest variant the client accepts: (content_encoding or None, bytes)."""
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accept_encodings[encoding] > 0:
+                return encoding, self.variants[encoding]
+        return None, self.body
+
+    def make_response(self, request, response_class):
+        """Build a response for request, answering 304 when the client's ETag still matches."""
+        encoding, data = self.negotiate(request.accept_encodings)
+        if request.if_none_match.star_tag:
+            matched = self.etag_for(encoding)
+        else:
+            matched = next((tag for tag in self.etags() if request.if_none_match.contains(tag)), None)
+        if matched is not None:
+            # Repeat the tag the client holds, so caches see the same ETag as on the 200
+            response = response_class(status=304)
+            response.set_etag(matched)
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+
+        response = response_class(data, status=200, mimetype=self.mimetype)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.set_etag(self.etag_for(encoding))
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = "no-cache"
+        return response
@@ -0,0 +1,666 @@
+import heapq
+import logging
+import threading
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Node types below a subcomponent. Each entry describes how the node is
+# rendered (level, default name, link type from its parent, fallback id
+# infix) and which child collections it owns, in visiting order.
+NODE_LEVELS = {
+    "capability": {
+        "level": 3, "name": "Capability", "link": "has_capability", "id_infix": "capability",
+        "children": (("functions", "function"),),
+    },
+    "function": {
+        "level": 4, "name": "Function", "link": "has_function", "id_infix": "function",
+        "children": (("specifications", "specification"),),
+    },
+    "specification": {
+        "level": 5, "name": "Specification", "link": "has_specification", "id_infix": "spec",
+        "children": (("integration", "integration"),),
+    },
+    "integration": {
+        "level": 6, "name": "Integration", "link": "has_integration", "id_infix": "integration",
+        "children": (("techniques", "technique"),),
+    },
+    "technique": {
+        "level": 7, "name": "Technique", "link": "has_technique", "id_infix": "technique",
+        "children": (("applications", "application"),),
+    },
+    "application": {
+        "level": 8, "name": "Application", "link": "has_application", "id_infix": "app",
+        "children": (("inputs", "input"), ("outputs", "output")),
+    },
+    "input": {
+        "level": 9, "name": "Input", "link": "has_input", "id_infix": "input",
+        "children": (),
+    },
+    "output": {
+        "level": 9, "name": "Output", "link": "has_output", "id_infix": "output",
+        "children": (),
+    },
+}
+
+# Keys that hold a single child object rather than a list
+SINGLE_CHILD_KEYS = {"integration"}
+
+
+def get_capabilities(subcomp, subcomp_id, log=logger):
+    """Return a subcomponent's capability list, accepting the {"items": [...]} form."""
+    if "capabilities" not in subcomp:
+        return []
+    cap_obj = subcomp["capabilities"]
+    if isinstance(cap_obj, list):
+        return cap_obj
+    if isinstance(cap_obj, dict) and "items" in cap_obj:
+        return cap_obj["items"]
+    log.warning(f"Unexpected capabilities format in {subcomp_id}: {type(cap_obj)}")
+    return []
+
+
+def group_subcomponents(subcomponents):
+    """Group subcomponents by parent component id in a single pass, keeping file order."""
+    grouped = defaultdict(dict)
+    for subcomp_id, subcomp in subcomponents.items():
+        if isinstance(subcomp, dict) and "parent" in subcomp:
+            grouped[subcomp["parent"]][subcomp_id] = subcomp
+    return grouped
+
+
+def application_outputs(app):
+    """Return an application's direct outputs plus those nested in its inputs, unique by id."""
+    outputs = list(app.get("outputs", []))
+    for input_item in app.get("inputs", []):
+        if isinstance(input_item, dict) and "outputs" in input_item:
+            input_outputs = input_item.get("outputs", [])
+            if isinstance(input_outputs, list):
+                outputs.extend(input_outputs)
+            elif isinstance(input_outputs, dict):
+                outputs.append(input_outputs)
+
+    unique_outputs = []
+    output_ids = set()
+    for output in outputs:
+        if not isinstance(output, dict):
+            continue
+        output_id = output.get("id")
+        if output_id and output_id not in output_ids:
+            output_ids.add(output_id)
+            unique_outputs.append(output)
+        elif not output_id:  # If no ID, include anyway
+            unique_outputs.append(output)
+    return unique_outputs
+
+
+def child_collections(node, node_type):
+    """Return [(child_type, raw_value)] for each child collection of a node."""
+    if node_type == "application":
+        return [("input", node.get("inputs", [])), ("output", application_outputs(node))]
+    return [(child_type, node.get(key, [])) for key, child_type in NODE_LEVELS[node_type]["children"]]
+
+
+def as_child_list(key_type, raw):
+    """Normalize a raw child collection to a list."""
+    if isinstance(raw, list):
+        return raw
+    if key_type in SINGLE_CHILD_KEYS and isinstance(raw, dict) and raw:
+        return [raw]
+    return []
+
+
+def make_node(node_id, name, node_type, description, parent_id, level, has_children):
+    return {
+        "id": node_id,
+        "name": name,
+        "type": node_type,
+        "description": description,
+        "parent": parent_id,
+        "level": level,
+        "expandable": has_children,
+        "has_children": has_children
+    }
+
+
+class GraphWalker:
+    """Yield graph nodes and containment links for the levels below a subcomponent."""
+
+    def __init__(self, node_ids, count=0, log=logger):
+        self.node_ids = node_ids
+        # Nodes emitted so far; fallback ids are numbered by it
+        self.count = count
+        self.log = log
+
+    def walk(self, parent_id, node_type, items):
+        """Yield (node, link to its parent) for every item of node_type under parent_id, depth-first."""
+        spec = NODE_LEVELS[node_type]
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                if spec["children"]:
+                    self.log.warning(f"{spec['name']} in {parent_id} is not a dictionary, skipping")
+                continue
+
+            if node_type == "output":
+                # Outputs may be shared between applications; keep the first
+                node_id = item["id"] if item.get("id") else f"{parent_id}-output-{index}"
+                name = item.get("name", f"Output {index+1}")
+                if node_id in self.node_ids:
+                    continue
+            else:
+                node_id = item.get("id", f"{parent_id}-{spec['id_infix']}-{self.count}")
+                name = item.get("name", spec["name"])
+
+            collections = child_collections(item, node_type)
+            has_children = any(bool(raw) for _, raw in collections)
+            self.node_ids.add(node_id)
+            self.count += 1
+            yield (
+                make_node(node_id, name, node_type, item.get("description", ""), parent_id, spec["level"], has_children),
+                {"source": parent_id, "target": node_id, "type": spec["link"]}
+            )
+
+            for child_type, raw in collections:
+                yield from self.walk(node_id, child_type, as_child_list(child_type, raw))
+
+
+class GraphFragment:
+    """The nodes and links contributed by one subcomponent file.
+
+    nodes and links are parallel: links[i] joins nodes[i] to its parent.
+    Fallback ids for nodes without one are numbered within the file, so
+    editing one file never renames nodes of another.
+    """
+
+    def __init__(self, source, nodes, links, cross_links):
+        self.source = source
+        self.nodes = nodes
+        self.links = links
+        self.cross_links = cross_links
+
+
+def iter_subcomponent(subcomp_id, subcomp, log=logger):
+    """Yield (node, link to its parent) for a subcomponent and everything below it."""
+    capabilities = get_capabilities(subcomp, subcomp_id, log)
+    yield (
+        make_node(
+            subcomp_id, subcomp.get("name", subcomp_id), "subcomponent",
+            subcomp.get("description", ""), subcomp.get("parent"), 2, bool(capabilities)
+        ),
+        {"source": subcomp.get("parent"), "target": subcomp_id, "type": "contains"}
+    )
+    yield from GraphWalker({subcomp_id}, 1, log).walk(subcomp_id, "capability", capabilities)
+
+
+def build_subcomponent_fragment(subcomp_id, subcomp, log=logger):
+    """Build the graph fragment for one subcomponent: its node, everything below it and its cross-links."""
+    nodes = []
+    links = []
+    for node, link in iter_subcomponent(subcomp_id, subcomp, log):
+        nodes.append(node)
+        links.append(link)
+    return GraphFragment(subcomp, nodes, links, build_subcomponent_cross_links(subcomp_id, subcomp, log))
+
+
+class FragmentCache:
+    """Per-subcomponent graph fragments, rebuilt only when that subcomponent's data changes.
+
+    Changes are detected by object identity: the corpus cache hands out a
+    new object whenever it reparses a file. Safe to share between threads
+    building graphs concurrently; two of them may build the same fragment,
+    and the last one stored wins.
+    """
+
+    def __init__(self):
+        self._fragments = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.reuses = 0
+
+    def get(self, subcomp_id, subcomp, log=logger):
+        with self._lock:
+            fragment = self._fragments.get(subcomp_id)
+            if fragment is not None and fragment.source is subcomp:
+                self.reuses += 1
+                return fragment
+        # Built outside the lock, so other subcomponents are not held up
+        fragment = build_subcomponent_fragment(subcomp_id, subcomp, log)
+        with self._lock:
+            self._fragments[subcomp_id] = fragment
+            self.builds += 1
+        return fragment
+
+    def retain(self, subcomp_ids):
+        """Forget fragments of subcomponents that no longer exist."""
+        with self._lock:
+            for subcomp_id in set(self._fragments) - set(subcomp_ids):
+                del self._fragments[subcomp_id]
+
+
+def build_component_cross_links(components, log=logger):
+    """Build relationship and integration point links declared by components."""
+    links = []
+
+    # Process cross-connections and additional relationships
+    for component_id, component in components.items():
+        if not isinstance(component, dict):
+            continue
+
+        # Handle component relationships
+        if "relationships" in component:
+            relationships = component["relationships"]
+            if isinstance(relationships, list):
+                for rel in relationships:
+                    if not isinstance(rel, dict):
+                        continue
+
+                    rel_id = rel.get("id")
+                    rel_type = rel.get("relationship_type")
+                    if rel_id and rel_type:
+                        links.append({
+                            "source": component_id,
+                            "target": rel_id,
+                            "type": rel_type,
+                            "description": rel.get("description", "")
+                        })
+
+                        # Add integration points if they exist
+                        if "integration_points" in rel:
+                            for point in rel["integration_points"]:
+                                if isinstance(point, dict) and "this_component_function" in point and "other_component_function" in point:
+                                    links.append({
+                                        "source": point["this_component_function"],
+                                        "target": point["other_component_function"],
+                                        "type": "integration_point",
+                                        "description": point.get("description", "")
+                                    })
+            else:
+                log.warning(f"Relationships in {component_id} is not a list: {type(relationships)}")
+
+    return links
+
+
+def build_subcomponent_cross_links(subcomp_id, subcomp, log=logger):
+    """Build the cross-connection and implements links declared by one subcomponent."""
+    links = []
+
+    # Process subcomponent cross-connections
+    if "cross_connections" in subcomp:
+        connections = subcomp["cross_connections"]
+        if isinstance(connections, list):
+            for conn in connections:
+                if not isinstance(conn, dict):
+                    continue
+
+                source_id = conn.get("source_id")
+                target_id = conn.get("target_id")
+                conn_type = conn.get("type")
+                if source_id and target_id and conn_type:
+                    links.append({
+                        "source": source_id,
+                        "target": target_id,
+                        "type": conn_type,
+                        "description": conn.get("description", "")
+                    })
+        else:
+            log.warning(f"Cross connections in {subcomp_id} is not a list: {type(connections)}")
+
+    # Process capability and function implementations
+    for key, impl_key, description in (
+        ("capabilities", "implements_component_capabilities", "Implements component capability"),
+        ("functions", "implements_component_functions", "Implements component function"),
+    ):
+        if key not in subcomp:
+            continue
+        items = subcomp[key]
+        if not isinstance(items, list):
+            log.warning(f"{key.capitalize()} in {subcomp_id} is not a list: {type(items)}")
+            continue
+        for item in items:
+            if not isinstance(item, dict) or impl_key not in item:
+                continue
+            impls = item[impl_key]
+            if isinstance(impls, list):
+                for impl_id in impls:
+                    links.append({
+                        "source": item.get("id", ""),
+                        "target": impl_id,
+                        "type": "implements",
+                        "description": description
+                    })
+            else:
+                log.warning(f"Implements component {key} in {item.get('id', '')} is not a list: {type(impls)}")
+
+    return links
+
+
+def iter_graph(root_data, components, subcomponents, log=logger, fragments=None):
+    """Yield the graph as it is walked: ("node", node, link to its parent or None) records, then cross-links.
+
+    Cross-links come last, as ("link", link) when both ends are nodes of the
+    graph and ("dangling", flagged copy) otherwise; see resolve_cross_links.
+    A node is always yielded after its parent, so a consumer can place it as
+    soon as it arrives. With fragments (a FragmentCache) subcomponents whose
+    data is unchanged are replayed from their cached fragment; without it
+    they are walked directly and nothing beyond the set of emitted ids is
+    held in memory.
+    """
+    root_node = {
+        "id": root_data.get("id", "ai-alignment"),
+        "name": root_data.get("name", "AI Alignment"),
+        "type": "component_group",
+        "description": root_data.get("description", "AI Alignment"),
+        "level": 0,
+        "expandable": True,
+        "has_children": bool(components)
+    }
+    yield "node", root_node, None
+    node_ids = {root_node["id"]}
+
+    if fragments is not None:
+        fragments.retain(subcomp_id for subcomp_id, subcomp in subcomponents.items() if isinstance(subcomp, dict))
+
+    subcomponents_by_parent = group_subcomponents(subcomponents)
+
+    for component_id, component in components.items():
+        if not isinstance(component, dict):
+            log.warning(f"Component {component_id} is not a dictionary, skipping")
+            continue
+
+        component_subcomponents = subcomponents_by_parent.get(component_id, {})
+        has_children = bool(component_subcomponents)
+        yield "node", make_node(
+            component_id, component.get("name", component_id), "component",
+            component.get("description", ""), root_node["id"], 1, has_children
+        ), {"source": root_node["id"], "target": component_id, "type": "contains"}
+        node_ids.add(component_id)
+
+        for subcomp_id, subcomp in component_subcomponents.items():
+            if fragments is not None:
+                fragment = fragments.get(subcomp_id, subcomp, log)
+                pairs = zip(fragment.nodes, fragment.links)
+            else:
+                pairs = iter_subcomponent(subcomp_id, subcomp, log)
+            for node, link in pairs:
+                # Outputs may be shared between applications; keep the first
+                if node["type"] == "output" and node["id"] in node_ids:
+                    continue
+                yield "node", node, link
+                node_ids.add(node["id"])
+
+    # Every node has been emitted, so cross-links can be resolved against them
+    yield from resolve_cross_links(build_component_cross_links(components, log), node_ids)
+    for subcomp_id, subcomp in subcomponents.items():
+        if not isinstance(subcomp, dict):
+            continue
+        if fragments is not None:
+            cross_links = fragments.get(subcomp_id, subcomp, log).cross_links
+        else:
+            cross_links = build_subcomponent_cross_links(subcomp_id, subcomp, log)
+        yield from resolve_cross_links(cross_links, node_ids)
+
+
+def resolve_cross_links(links, node_ids):
+    """Yield ("link", link) for links whose ends are both in node_ids, else ("dangling", copy naming the missing ends)."""
+    for link in links:
+        missing = [end for end in ("source", "target") if link[end] not in node_ids]
+        if missing:
+            # Links may belong to a cached fragment; flag a copy
+            yield "dangling", dict(link, missing=missing)
+        else:
+            yield "link", link
+
+
+def build_graph_data(root_data, components, subcomponents, log=logger, fragments=None):
+    """Build visualization graph data with nodes and links.
+
+    Subcomponents are turned into fragments (reused from fragments, a
+    FragmentCache, when their data is unchanged) and merged under their
+    components. Every link in "links" joins two nodes of the graph; cross-links
+    naming an id no node has are listed under "dangling_links" instead.
+    """
+    if fragments is None:
+        fragments = FragmentCache()
+    nodes = []
+    links = []
+    dangling_links = []
+    for record in iter_graph(root_data, components, subcomponents, log, fragments):
+        if record[0] == "node":
+            nodes.append(record[1])
+            if record[2] is not None:
+                links.append(record[2])
+        elif record[0] == "link":
+            links.append(record[1])
+        else:
+            dangling_links.append(record[1])
+
+    if dangling_links:
+        log.warning(f"Dropped {len(dangling_links)} cross-links to ids no node has")
+    log.info(f"Built comprehensive graph with {len(nodes)} nodes and {len(links)} links")
+    return {"nodes": nodes, "links": links, "dangling_links": dangling_links}
+
+
+def split_links(graph):
+    """Return (each node's link to its parent or None, in node order; the cross-links) of a built graph.
+
+    build_graph_data lists the parent links first, one per node that has a
+    parent and in node order, so they are matched to nodes by position:
+    ids are not unique in the corpus, and looking a link's target up by id
+    would find the wrong node for every repeat.
+    """
+    links = graph.get("links", [])
+    parent_links = []
+    position = 0
+    for node in graph["nodes"]:
+        link = links[position] if position < len(links) else None
+        if (
+            link is not None and "parent" in node
+            and link["target"] == node["id"] and link["source"] == node["parent"]
+        ):
+            parent_links.append(link)
+            position += 1
+        else:
+            parent_links.append(None)
+    return parent_links, links[position:]
+
+
+class GraphIndex:
+    """Parent -> children and per-node cross-link lookups over a built graph."""
+
+    def __init__(self, graph):
+        self.nodes_by_id = {}
+        self.children = defaultdict(list)
+        self.parent_links = {}  # id(node) -> the link joining that node to its parent
+        self.cross_links = defaultdict(list)
+        self.node_count = len(graph["nodes"])
+        self._descendants = None
+
+        parent_links, self._cross_link_list = split_links(graph)
+        for node, link in zip(graph["nodes"], parent_links):
+            # First occurrence wins, as with a linear scan over the node list
+            self.nodes_by_id.setdefault(node["id"], node)
+            if "parent" in node:
+                self.children[node["parent"]].append(node)
+            if link is not None:
+                self.parent_links[id(node)] = link
+        # Nodes whose parent is missing start trees of their own
+        self.roots = [node for node in graph["nodes"] if node.get("parent") not in self.nodes_by_id]
+
+        for link in self._cross_link_list:
+            self.cross_links[link["source"]].append(link)
+            if link["target"] != link["source"]:
+                self.cross_links[link["target"]].append(link)
+
+    def window_links(self, nodes):
+        """Containment links for nodes plus cross-links whose ends are both in nodes."""
+        ids = {node["id"] for node in nodes}
+        links = []
+        for node in nodes:
+            link = self.parent_links.get(id(node))
+            if link is not None and link["source"] in ids:
+                links.append(link)
+        seen = set()
+        for node_id in ids:
+            for link in self.cross_links.get(node_id, ()):
+                if link["source"] in ids and link["target"] in ids and id(link) not in seen:
+                    seen.add(id(link))
+                    links.append(link)
+        return links
+
+    def subtree(self, node_id, depth):
+        """Return the node and its descendants down to depth levels below it, or None if unknown."""
+        node = self.nodes_by_id.get(node_id)
+        if node is None:
+            return None
+        nodes = [node]
+        seen = {id(node)}
+        frontier = [node]
+        for _ in range(depth):
+            # Ids are not unique in the corpus, so the same child list can be
+            # reached through two parents sharing an id; emit each node once
+            next_frontier = []
+            for parent in frontier:
+                for child in self.children.get(parent["id"], ()):
+                    if id(child) not in seen:
+                        seen.add(id(child))
+                        next_frontier.append(child)
+            if not next_frontier:
+                break
+            nodes.extend(next_frontier)
+            frontier = next_frontier
+        return {"root": node_id, "depth": depth, "nodes": nodes, "links": self.window_links(nodes)}
+
+    def children_of(self, node_id):
+        """Return the direct children of a node with the links joining them, or None if unknown."""
+        window = self.subtree(node_id, 1)
+        if window is None:
+            return None
+        return {"parent": node_id, "nodes": window["nodes"][1:], "links": window["links"]}
+
+    def _hierarchy(self):
+        """Return ({id(node): children}, {id(node): Counter of descendant types}), computed once.
+
+        Ids are not unique in the corpus, so a child list can be reached
+        through two parents sharing an id; each node is owned by the first
+        parent reaching it, breadth first, which makes the result a tree
+        whose descendant counts add up to the graph's node count.
+        """
+        if self._descendants is None:
+            owned = {}
+            order = list(self.roots)
+            seen = {id(node) for node in order}
+            for node in order:
+                children = [child for child in self.children.get(node["id"], ()) if id(child) not in seen]
+                seen.update(id(child) for child in children)
+                owned[id(node)] = children
+                order.extend(children)
+            types = {}
+            # Children come after their parent in order, so walking it backwards completes them first
+            for node in reversed(order):
+                counts = Counter()
+                for child in owned[id(node)]:
+                    counts[child["type"]] += 1
+                    counts.update(types[id(child)])
+                types[id(node)] = counts
+            self._descendants = (owned, types)
+        return self._descendants
+
+    def summary(self, max_nodes, max_depth=None):
+        """Return the graph reduced to at most max_nodes nodes, none deeper than max_depth.
+
+        Subtrees are expanded shallowest level first, larger subtrees first
+        within a level, for as long as their children fit in the budget; the
+        roots are always kept. A node left unexpanded stands in for its
+        subtree: it is returned as a copy with ``collapsed``, ``descendants``
+        (count), ``descendant_types`` ({type: count}) and
+        ``internal_links`` (cross-links between its own descendants) set.
+        Cross-links are moved onto the nearest visible ancestor of each end
+        and merged per (source, target, type) into one link with a
+        ``count``; links between two visible nodes are returned as they are.
+        """
+        owned, descendants = self._hierarchy()
+
+        def size(node):
+            return sum(descendants[id(node)].values())
+
+        visible = list(self.roots)
+        expanded = set()
+        heap = [(node.get("level", 0), -size(node), order, node) for order, node in enumerate(visible)]
+        heapq.heapify(heap)
+        order = len(heap)
+        while heap:
+            level, _, _, node = heapq.heappop(heap)
+            if max_depth is not None and level >= max_depth:
+                continue
+            children = owned[id(node)]
+            if not children or len(visible) + len(children) > max_nodes:
+                continue
+            expanded.add(id(node))
+            for child in children:
+                visible.append(child)
+                heapq.heappush(heap, (child.get("level", 0), -size(child), order, child))
+                order += 1
+
+        # Nearest visible ancestor of every id, found by walking up the parents
+        visible_ids = {node["id"] for node in visible}
+        representatives = {}
+
+        def representative(node_id):
+            path = []
+            while node_id not in visible_ids and node_id not in representatives:
+                node = self.nodes_by_id.get(node_id)
+                if node is None or node_id in path:
+                    return None
+                path.append(node_id)
+                node_id = node.get("parent")
+            found = node_id if node_id in visible_ids else representatives[node_id]
+            for hidden_id in path:
+                representatives[hidden_id] = found
+            return found
+
+        links = []
+        for node in visible:
+            link = self.parent_links.get(id(node))
+            if link is not None and link["source"] in visible_ids:
+                links.append(link)
+        aggregated = Counter()
+        internal = Counter()
+        for link in self._cross_link_list:
+            source, target = representative(link["source"]), representative(link["target"])
+            if source is None or target is None:
+                continue
+            if source == link["source"] and target == link["target"]:
+                links.append(link)
+            elif source == target:
+                internal[source] += 1
+            else:
+                aggregated[(source, target, link["type"])] += 1
+        links.extend(
+            {"source": source, "target": target, "type": link_type, "count": count, "aggregated": True}
+            for (source, target, link_type), count in aggregated.items()
+        )
+
+        nodes = []
+        collapsed = 0
+        for node in visible:
+            types = descendants[id(node)]
+            if id(node) in expanded or not types:
+                nodes.append(node)
+                continue
+            # Graph nodes are shared with every other payload; annotate a copy
+            collapsed += 1
+            nodes.append(dict(
+                node,
+                collapsed=True,
+                descendants=sum(types.values()),
+                descendant_types=dict(types),
+                internal_links=internal[node["id"]],
+            ))
+        return {
+            "max_nodes": max_nodes,
+            "max_depth": max_depth,
+            "total_nodes": self.node_count,
+            "collapsed": collapsed,
+            "nodes": nodes,
+            "links": links,
+        }
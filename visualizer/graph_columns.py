@@ -0,0 +1,231 @@
+"""
+Columnar binary encoding of the graph.
+
+The JSON graph repeats every key and full string id for each node and link.
+This encoding interns every string once and stores nodes and links as
+fixed-width little-endian columns, so a browser can wrap each column in a
+typed array over the response buffer instead of parsing thousands of
+objects. Served by /api/graph for ``Accept: application/vnd.ai-alignment.graph-columns``.
+The format is for API clients: static/graph_columns.js is a decoder they
+can load, but the page itself still requests the JSON encoding.
+
+File layout::
+
+    MAGIC | header length (uint32 LE) | header JSON | padding | columns ...
+
+The header holds the counts, the node and link type tables and the
+(offset, length, dtype) of every column relative to the start of the file.
+Columns start on 4-byte boundaries.
+
+Columns:
+    strings           JSON array of every distinct string (utf-8)
+    node_id           uint32  string index
+    node_name         uint32  string index
+    node_description  uint32  string index
+    node_parent       int32   node index of the parent, -1 for none
+    node_type         uint8   index into header "node_types"
+    node_level        uint8
+    node_flags        uint8   FLAG_EXPANDABLE | FLAG_HAS_CHILDREN
+    link_source       int32   node index, or -1 - string index for an id no node has
+    link_target       int32   as link_source
+    link_type         uint8   index into header "link_types"
+    link_description  int32   string index, -1 for none
+    node_x, node_y, node_z
+                      float32 layout position; only present when the nodes have one
+
+Ids are not unique in the corpus; links and parents refer to the first node
+with a given id, as everywhere else. Only "nodes" and "links" are encoded;
+the graph's "dangling_links" report is left to the JSON encoding.
+"""
+
+import json
+import struct
+import sys
+from array import array
+
+MAGIC = b"AIAGCOL1"
+FORMAT_VERSION = 1
+MIMETYPE = "application/vnd.ai-alignment.graph-columns"
+_HEADER_LENGTH = struct.Struct("<I")
+
+FLAG_EXPANDABLE = 1
+FLAG_HAS_CHILDREN = 2
+
+# array typecodes for each column dtype
+DTYPES = {"uint8": "B", "int32": "i", "uint32": "I", "float32": "f"}
+
+
+class GraphColumnsError(Exception):
+    pass
+
+
+class StringTable:
+    """Interns strings, handing out a stable index per distinct value."""
+
+    def __init__(self):
+        self.strings = []
+        self._indices = {}
+
+    def intern(self, value):
+        index = self._indices.get(value)
+        if index is None:
+            index = self._indices[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+def _column_bytes(dtype, values):
+    column = array(DTYPES[dtype], values)
+    if column.itemsize > 1 and sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _text(value):
+    """Names and descriptions are almost always strings; encode anything else as JSON text."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def encode_graph(graph):
+    """Encode a {"nodes", "links"} graph into the columnar binary format."""
+    strings = StringTable()
+    node_types = StringTable()
+    link_types = StringTable()
+    nodes = graph.get("nodes", [])
+    links = graph.get("links", [])
+
+    positions = {}
+    for position, node in enumerate(nodes):
+        positions.setdefault(node["id"], position)
+
+    def endpoint(node_id):
+        position = positions.get(node_id)
+        if position is not None:
+            return position
+        return -1 - strings.intern(_text(node_id))
+
+    columns = {
+        "node_id": ("uint32", [strings.intern(node["id"]) for node in nodes]),
+        "node_name": ("uint32", [strings.intern(_text(node.get("name", ""))) for node in nodes]),
+        "node_description": ("uint32", [strings.intern(_text(node.get("description", ""))) for node in nodes]),
+        "node_parent": ("int32", [positions.get(node.get("parent"), -1) for node in nodes]),
+        "node_type": ("uint8", [node_types.intern(node["type"]) for node in nodes]),
+        "node_level": ("uint8", [node.get("level", 0) for node in nodes]),
+        "node_flags": ("uint8", [
+            (FLAG_EXPANDABLE if node.get("expandable") else 0) | (FLAG_HAS_CHILDREN if node.get("has_children") else 0)
+            for node in nodes
+        ]),
+        "link_source": ("int32", [endpoint(link["source"]) for link in links]),
+        "link_target": ("int32", [endpoint(link["target"]) for link in links]),
+        "link_type": ("uint8", [link_types.intern(link["type"]) for link in links]),
+        "link_description": ("int32", [
+            strings.intern(_text(link["description"])) if "description" in link else -1 for link in links
+        ]),
+    }
+    if nodes and "x" in nodes[0]:
+        for axis in ("x", "y", "z"):
+            columns[f"node_{axis}"] = ("float32", [node[axis] for node in nodes])
+    if len(node_types.strings) > 256 or len(link_types.strings) > 256:
+        raise GraphColumnsError("More than 256 node or link types")
+
+    sections = {"strings": ("json", json.dumps(strings.strings, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))}
+    for name, (dtype, values) in columns.items():
+        sections[name] = (dtype, _column_bytes(dtype, values))
+
+    header = {
+        "format": FORMAT_VERSION,
+        "counts": {"nodes": len(nodes), "links": len(links), "strings": len(strings.strings)},
+        "node_types": node_types.strings,
+        "link_types": link_types.strings,
+        "sections": {},
+    }
+    # Section offsets depend on the header length and the header lists the
+    # offsets, so lay out until the header stops growing
+    header_bytes = b""
+    while True:
+        offset = _aligned(len(MAGIC) + _HEADER_LENGTH.size + len(header_bytes))
+        for name, (dtype, data) in sections.items():
+            header["sections"][name] = [offset, len(data), dtype]
+            offset = _aligned(offset + len(data))
+        encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        if len(encoded) == len(header_bytes):
+            break
+        header_bytes = encoded
+    header_bytes = encoded
+
+    out = bytearray(MAGIC)
+    out += _HEADER_LENGTH.pack(len(header_bytes))
+    out += header_bytes
+    for name, (dtype, data) in sections.items():
+        out += b"\0" * (header["sections"][name][0] - len(out))
+        out += data
+    return bytes(out)
+
+
+def _aligned(offset):
+    return (offset + 3) & ~3
+
+
+def decode_graph(data):
+    """Decode the columnar format back into a {"nodes", "links"} graph."""
+    data = memoryview(data)
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise GraphColumnsError("Not a columnar graph payload")
+    (header_length,) = _HEADER_LENGTH.unpack_from(data, len(MAGIC))
+    start = len(MAGIC) + _HEADER_LENGTH.size
+    header = json.loads(bytes(data[start:start + header_length]))
+    if header.get("format") != FORMAT_VERSION:
+        raise GraphColumnsError(f"Unsupported columnar graph format: {header.get('format')}")
+
+    def column(name):
+        offset, length, dtype = header["sections"][name]
+        raw = data[offset:offset + length]
+        if dtype == "json":
+            return json.loads(bytes(raw))
+        values = array(DTYPES[dtype])
+        values.frombytes(raw)
+        if values.itemsize > 1 and sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+    strings = column("strings")
+    ids = [strings[index] for index in column("node_id")]
+
+    def endpoint(value):
+        return ids[value] if value >= 0 else strings[-1 - value]
+
+    positions = None
+    if "node_x" in header["sections"]:
+        positions = zip(column("node_x"), column("node_y"), column("node_z"))
+
+    nodes = []
+    for node_id, name, description, parent, node_type, level, flags in zip(
+        ids, column("node_name"), column("node_description"), column("node_parent"),
+        column("node_type"), column("node_level"), column("node_flags")
+    ):
+        node = {
+            "id": node_id,
+            "name": strings[name],
+            "type": header["node_types"][node_type],
+            "description": strings[description],
+        }
+        if parent >= 0:
+            node["parent"] = ids[parent]
+        node["level"] = level
+        node["expandable"] = bool(flags & FLAG_EXPANDABLE)
+        node["has_children"] = bool(flags & FLAG_HAS_CHILDREN)
+        if positions is not None:
+            node["x"], node["y"], node["z"] = next(positions)
+        nodes.append(node)
+
+    links = []
+    for source, target, link_type, description in zip(
+        column("link_source"), column("link_target"), column("link_type"), column("link_description")
+    ):
+        link = {"source": endpoint(source), "target": endpoint(target), "type": header["link_types"][link_type]}
+        if description >= 0:
+            link["description"] = strings[description]
+        links.append(link)
+    return {"nodes": nodes, "links": links}
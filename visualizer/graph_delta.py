@@ -0,0 +1,168 @@
+"""
+Content-addressed graph versions and the deltas between them.
+
+Every node and link is hashed from its canonical JSON. A graph's version id
+is a digest of those hashes, so it only depends on the graph's content: two
+processes serving the same corpus report the same id, and a client can ask
+for the delta from the version it holds instead of refetching the graph.
+
+Node ids are not unique in the corpus, so nodes are keyed by id, with the
+n-th repeat of an id (in graph order) keyed ``"<id>#<n>"``. Links have no
+identity beyond their content and are keyed by hash the same way. A delta
+is::
+
+    {
+        "from": "<version id>", "to": "<version id>",
+        "nodes": {"added": {key: node}, "changed": {key: node}, "removed": [key]},
+        "links": {"added": [link], "removed": [link]},
+        "dangling_links": {"added": [link], "removed": [link]}
+    }
+
+Applying it to the "from" graph (see static/graph_delta.js) gives the "to"
+graph, up to the order of nodes and links.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# Graph collections diffed as sets of links
+LINK_COLLECTIONS = ("links", "dangling_links")
+
+# Shared, since json.dumps with options builds a new encoder per call
+_CANONICAL = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def content_hash(value):
+    """Return a short hex digest of value's canonical JSON."""
+    return hashlib.blake2b(_CANONICAL.encode(value).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _keyed(labels):
+    """Yield label, then "label#n" for its n-th repeat."""
+    seen = {}
+    for label in labels:
+        count = seen.get(label, 0)
+        seen[label] = count + 1
+        yield label if count == 0 else f"{label}#{count}"
+
+
+class GraphVersion:
+    """A graph with its nodes and links keyed and hashed, and the resulting version id.
+
+    Graph nodes and links are never mutated once built, and rebuilds reuse
+    them for unchanged subcomponents, so hashes are carried over from
+    ``previous`` for every object it shares with this graph.
+    """
+
+    def __init__(self, graph, previous=None):
+        # id(object) -> hash; self.nodes and self.links keep the objects alive, so ids stay unique
+        self._hashes = {}
+        known = previous._hashes if previous is not None else {}
+
+        def hashed(value):
+            value_hash = known.get(id(value))
+            if value_hash is None:
+                value_hash = content_hash(value)
+            self._hashes[id(value)] = value_hash
+            return value_hash
+
+        nodes = graph.get("nodes", [])
+        self.nodes = dict(zip(_keyed(node["id"] for node in nodes), nodes))
+        self.node_hashes = {key: hashed(node) for key, node in self.nodes.items()}
+        self.links = {}
+        for collection in LINK_COLLECTIONS:
+            links = graph.get(collection, [])
+            self.links[collection] = dict(zip(_keyed(hashed(link) for link in links), links))
+
+        digest = hashlib.blake2b(digest_size=12)
+        for key, node_hash in sorted(self.node_hashes.items()):
+            digest.update(f"n {key} {node_hash}\n".encode("utf-8"))
+        for collection in LINK_COLLECTIONS:
+            for key in sorted(self.links[collection]):
+                digest.update(f"{collection} {key}\n".encode("utf-8"))
+        self.id = digest.hexdigest()
+
+
+def diff(old, new):
+    """Return the delta turning GraphVersion old into GraphVersion new."""
+    old_hashes = old.node_hashes
+    delta = {
+        "from": old.id,
+        "to": new.id,
+        "nodes": {
+            "added": {key: new.nodes[key] for key in new.node_hashes if key not in old_hashes},
+            "changed": {
+                key: new.nodes[key] for key, node_hash in new.node_hashes.items()
+                if key in old_hashes and old_hashes[key] != node_hash
+            },
+            "removed": [key for key in old_hashes if key not in new.node_hashes],
+        },
+    }
+    for collection in LINK_COLLECTIONS:
+        old_links, new_links = old.links[collection], new.links[collection]
+        delta[collection] = {
+            "added": [link for key, link in new_links.items() if key not in old_links],
+            "removed": [link for key, link in old_links.items() if key not in new_links],
+        }
+    return delta
+
+
+class GraphHistory:
+    """The most recent graph versions, oldest first, and the deltas computed between them.
+
+    Waiters (e.g. event streams) block in ``wait`` until a version other than
+    the one they hold is recorded.
+    """
+
+    def __init__(self, size=16):
+        self.size = size
+        self._versions = OrderedDict()  # version id -> GraphVersion
+        self._deltas = OrderedDict()    # (from id, to id) -> delta
+        self._condition = threading.Condition()
+
+    @property
+    def latest(self):
+        with self._condition:
+            return next(reversed(self._versions.values()), None)
+
+    def __contains__(self, version_id):
+        with self._condition:
+            return version_id in self._versions
+
+    def record(self, version):
+        """Make version the latest, forgetting the oldest beyond size."""
+        with self._condition:
+            if self._versions and next(reversed(self._versions)) == version.id:
+                return
+            self._versions.pop(version.id, None)
+            self._versions[version.id] = version
+            while len(self._versions) > self.size:
+                self._versions.popitem(last=False)
+            self._condition.notify_all()
+
+    def delta(self, since_id, version):
+        """Return the delta from since_id to version, or None when since_id is not remembered."""
+        key = (since_id, version.id)
+        with self._condition:
+            cached = self._deltas.get(key)
+            old = self._versions.get(since_id)
+        if cached is not None:
+            return cached
+        if old is None:
+            return None
+        delta = diff(old, version)
+        with self._condition:
+            self._deltas[key] = delta
+            while len(self._deltas) > self.size:
+                self._deltas.popitem(last=False)
+        return delta
+
+    def wait(self, version_id, timeout):
+        """Block until the latest version is not version_id, or timeout seconds pass; return the latest."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._versions and next(reversed(self._versions)) != version_id, timeout
+            )
+            return next(reversed(self._versions.values()), None)
@@ -0,0 +1,150 @@
+"""
+Server-side 3D layout of the graph.
+
+Positions every node of a build_graph_data graph with a force-directed
+simulation vectorized over NumPy arrays, so browsers start from a settled
+layout instead of simulating one on every load. Forces:
+
+    springs     pull each child toward its parent at the browser's
+                parent/child distance, and cross-linked nodes weakly together
+    repulsion   pushes nodes apart; estimated each step from a random sample
+                of nodes, which keeps a step O(n*k) rather than O(n^2)
+    radial      moves each node toward its level's shell after every step,
+                as the page's spacing pass does, so both layouts share units
+                and overall shape
+
+The simulation is seeded, so a graph always gets the same layout. NumPy is
+optional: without it compute_layout returns None and the browser lays the
+graph out itself.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from . import graph_builder
+except ImportError:
+    import graph_builder
+
+# Force constants, in the page's scene units
+REPULSION = 1500.0      # strength of the inverse-distance repulsion between two nodes
+SPRING = 0.15           # fraction of a parent/child spring's stretch corrected per step
+CROSS_LINK_SPRING = 0.01
+CROSS_LINK_LENGTH = 150.0
+RADIAL = 0.5            # fraction of the distance to a node's shell corrected per step
+
+
+def shell_radii(levels):
+    """The page's target radius for each level (applyHyperbolicSpacing)."""
+    max_level = levels.max()
+    sphere_radius = 400 + 50 * max_level
+    return np.where(levels > 0, sphere_radius * (0.3 + 0.65 * levels / (max_level + 1)), 0.0)
+
+
+def _edges(graph):
+    """Return (parent index per node or -1, cross-link source indices, cross-link target indices)."""
+    nodes = graph["nodes"]
+    positions = {}
+    for index, node in enumerate(nodes):
+        positions.setdefault(node["id"], index)
+
+    parents = np.array([positions.get(node.get("parent"), -1) for node in nodes], dtype=np.intp)
+    _, cross_links = graph_builder.split_links(graph)
+    cross = [
+        (positions[link["source"]], positions[link["target"]]) for link in cross_links
+        if link["source"] in positions and link["target"] in positions
+    ]
+    cross = np.array(cross, dtype=np.intp).reshape(-1, 2)
+    return parents, cross[:, 0], cross[:, 1]
+
+
+def _initial_positions(levels, parents, shells, rng):
+    """Place each level on its shell, children scattered around their parent's direction."""
+    directions = np.zeros((len(levels), 3))
+    noise = rng.normal(size=(len(levels), 3))
+    for level in range(1, int(levels.max()) + 1):
+        members = np.nonzero(levels == level)[0]
+        parent = parents[members]
+        base = np.where((parent >= 0)[:, None], directions[np.maximum(parent, 0)], 0.0)
+        # Narrower spread for deeper levels, as in the page
+        spread = 1.0 if level == 1 else 0.6 * 0.8 ** (level - 1)
+        vectors = base + noise[members] * spread
+        directions[members] = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+    return directions * shells[:, None]
+
+
+def _spring(positions, displacement, sources, targets, lengths, strength):
+    """Move each (source, target) pair toward its rest length, splitting the correction between both ends."""
+    if not len(sources):
+        return
+    delta = positions[targets] - positions[sources]
+    distance = np.maximum(np.linalg.norm(delta, axis=1), 1e-9)
+    correction = delta * (strength * (distance - lengths) / distance / 2)[:, None]
+    for axis in range(3):
+        displacement[:, axis] += np.bincount(sources, correction[:, axis], minlength=len(positions))
+        displacement[:, axis] -= np.bincount(targets, correction[:, axis], minlength=len(positions))
+
+
+def compute_layout(graph, iterations=100, samples=64, seed=0):
+    """Return [[x, y, z], ...] for graph["nodes"], in order, or None when NumPy is not installed."""
+    if np is None:
+        return None
+    nodes = graph.get("nodes", [])
+    if not nodes:
+        return []
+
+    rng = np.random.default_rng(seed)
+    count = len(nodes)
+    levels = np.array([node.get("level", 0) for node in nodes], dtype=float)
+    parents, cross_sources, cross_targets = _edges(graph)
+    shells = shell_radii(levels)
+    positions = _initial_positions(levels, parents, shells, rng)
+
+    children = np.nonzero(parents >= 0)[0]
+    child_parents = parents[children]
+    # The page's parent/child distance, without its per-type node sizes
+    child_lengths = 80 + 30 * levels[children]
+    cross_lengths = np.full(len(cross_sources), CROSS_LINK_LENGTH)
+
+    sample_size = min(samples, count)
+    repulsion_scale = REPULSION * count / sample_size
+    # Largest step per iteration, cooling linearly
+    temperatures = np.linspace(shells.max() * 0.05, shells.max() * 0.002, iterations)
+
+    for temperature in temperatures:
+        # sum_j w_ij (p_i - s_j) with w_ij = 1 / (|p_i - s_j|^2 + 1), as (n, k) matrix
+        # products rather than an (n, k, 3) array of differences
+        sample = positions[rng.choice(count, size=sample_size, replace=False)]
+        squared = np.einsum("ij,ij->i", positions, positions)
+        distance2 = squared[:, None] + np.einsum("ij,ij->i", sample, sample)[None, :] - 2 * positions @ sample.T
+        weights = 1.0 / (np.maximum(distance2, 0.0) + 1.0)
+        displacement = (positions * weights.sum(axis=1)[:, None] - weights @ sample) * repulsion_scale
+
+        _spring(positions, displacement, child_parents, children, child_lengths, SPRING)
+        _spring(positions, displacement, cross_sources, cross_targets, cross_lengths, CROSS_LINK_SPRING)
+
+        step = np.maximum(np.linalg.norm(displacement, axis=1), 1e-9)
+        positions += displacement * (np.minimum(step, temperature) / step)[:, None]
+
+        # Applied after the move, so repulsion mostly spreads nodes along their shell
+        radius = np.maximum(np.linalg.norm(positions, axis=1), 1e-9)
+        positions *= (1 + RADIAL * (shells - radius) / radius)[:, None]
+
+    roots = np.nonzero(levels == 0)[0]
+    if len(roots):
+        positions -= positions[roots[0]]
+    return np.round(positions, 1).tolist()
+
+
+def with_positions(graph, layout):
+    """Return a copy of graph whose nodes carry x, y and z from layout; graph's own nodes are shared and left untouched."""
+    nodes = [dict(node, x=x, y=y, z=z) for node, (x, y, z) in zip(graph["nodes"], layout)]
+    return dict(graph, nodes=nodes)
+
+
+def without_positions(graph):
+    """Inverse of with_positions."""
+    nodes = [{key: value for key, value in node.items() if key not in ("x", "y", "z")} for node in graph["nodes"]]
+    return dict(graph, nodes=nodes)
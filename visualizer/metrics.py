@@ -0,0 +1,187 @@
+"""
+In-process request instrumentation.
+
+Stages of the hot path (file read, JSON parse, graph build, serialization,
+rate-limit check, ...) are timed with ``METRICS.timer(stage)`` and recorded
+into fixed-bucket histograms, from which p50/p95/p99 are estimated. The
+registry renders itself in the Prometheus text format, and the stages timed
+while serving a request are summed into its ``Server-Timing`` header.
+
+While disabled, ``timer`` hands back a shared no-op context manager, so an
+instrumented call costs one attribute check.
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+
+# Histogram bucket upper bounds in seconds: 50us doubling up to ~52s
+BUCKETS = tuple(0.00005 * 2 ** i for i in range(21))
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Stage timings of the request being served: list of (stage, seconds), or None
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    """Counts of observations per bucket, with their sum and maximum."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q):
+        """Estimate the q-quantile by interpolating inside the bucket that holds it."""
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            maximum = self.max
+        if not count:
+            return 0.0
+        rank = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else maximum
+                return min(lower + (upper - lower) * (rank - cumulative) / bucket_count, maximum)
+            cumulative += bucket_count
+        return maximum
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Registry of per-stage and per-endpoint latency histograms."""
+
+    def __init__(self, enabled=False, prefix="ai_alignment"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._stages = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, table, key):
+        histogram = table.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(key, Histogram())
+        return histogram
+
+    def timer(self, stage):
+        """Context manager timing one stage; a no-op while disabled."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def observe(self, stage, seconds):
+        self._histogram(self._stages, stage).observe(seconds)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, seconds))
+
+    def begin_request(self):
+        """Start collecting stage timings for the request being served by this context."""
+        return _request_timings.set([])
+
+    def end_request(self, token, endpoint, seconds):
+        """Record the request's duration and return its stage timings summed per stage, in first-seen order."""
+        timings = _request_timings.get() or []
+        _request_timings.reset(token)
+        self._histogram(self._requests, endpoint).observe(seconds)
+        totals = {}
+        for stage, duration in timings:
+            totals[stage] = totals.get(stage, 0.0) + duration
+        return totals
+
+    def render_prometheus(self):
+        """Render every histogram, plus quantile estimates as gauges, in the Prometheus text format."""
+        lines = []
+        for family, label, table, description in (
+            ("stage_seconds", "stage", self._stages, "Time spent in each stage of serving a request."),
+            ("request_seconds", "endpoint", self._requests, "Time spent serving requests, by endpoint."),
+        ):
+            name = f"{self.prefix}_{family}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} histogram")
+            histograms = sorted(table.items())
+            for key, histogram in histograms:
+                counts, count, total = histogram.snapshot()
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{{label}="{_label(key)}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{label}="{_label(key)}",le="+Inf"}} {count}')
+                lines.append(f'{name}_sum{{{label}="{_label(key)}"}} {total:.9g}')
+                lines.append(f'{name}_count{{{label}="{_label(key)}"}} {count}')
+
+            quantile_name = f"{self.prefix}_{family.replace('_seconds', '_quantile_seconds')}"
+            lines.append(f"# HELP {quantile_name} Estimated latency quantiles of {name}.")
+            lines.append(f"# TYPE {quantile_name} gauge")
+            for key, histogram in histograms:
+                for q in QUANTILES:
+                    lines.append(
+                        f'{quantile_name}{{{label}="{_label(key)}",quantile="{q:g}"}} {histogram.quantile(q):.9g}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def server_timing(totals, total_seconds):
+    """Format per-stage totals (seconds) as a Server-Timing header value in milliseconds."""
+    entries = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in totals.items()]
+    entries.append(f"total;dur={total_seconds * 1000:.3f}")
+    return ", ".join(entries)
+
+
+# Process-wide registry; AIAlignmentVisualizer enables it from config.METRICS_ENABLED
+METRICS = Metrics()
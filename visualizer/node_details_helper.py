@@ -1,112 +1,165 @@
+import codecs
 import json
 import os
-import glob
 import logging
+import tempfile
 
-# Setup basic logging for production
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it files are parsed with the json module
+    orjson = None
+
+try:
+    from . import corpus_cache
+    from . import detail_store
+    from . import graph_builder
+    from .metrics import METRICS
+except ImportError:
+    import corpus_cache
+    import detail_store
+    import graph_builder
+    from metrics import METRICS
+
+# Handlers are configured by the application (AIAlignmentVisualizer.setup_logging)
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
+
+# Parser for UTF-8 bytes; orjson is several times faster when installed
+json_loads = orjson.loads if orjson is not None else json.loads
 
 def setup_paths():
     APP_DIR = os.path.abspath(os.path.dirname(__file__))
-    PARENT_DIR = os.path.abspath(os.path.join(APP_DIR, ".."))
+    # The corpus lives next to the app unless AI_ALIGNMENT_DATA_DIR points elsewhere (e.g. benchmarks)
+    PARENT_DIR = os.path.abspath(os.environ.get("AI_ALIGNMENT_DATA_DIR") or os.path.join(APP_DIR, ".."))
     COMPONENTS_DIR = os.path.normpath(os.path.join(PARENT_DIR, "components"))
     SUBCOMPONENTS_DIR = os.path.normpath(os.path.join(PARENT_DIR, "subcomponents"))
     ROOT_JSON_FILE = os.path.normpath(os.path.join(PARENT_DIR, "ai-alignment.json"))
+    SNAPSHOT_FILE = os.path.normpath(os.path.join(PARENT_DIR, "ai-alignment.snapshot"))
+    # Private to this user: store files found there are mapped and served as they are
+    DETAIL_STORE_DIR = os.environ.get("AI_ALIGNMENT_CACHE_DIR") or os.path.join(
+        tempfile.gettempdir(), f"ai-alignment-{os.getuid() if hasattr(os, 'getuid') else 'cache'}"
+    )
     
     return {
         'APP_DIR': APP_DIR,
         'PARENT_DIR': PARENT_DIR,
         'COMPONENTS_DIR': COMPONENTS_DIR,
         'SUBCOMPONENTS_DIR': SUBCOMPONENTS_DIR,
-        'ROOT_JSON_FILE': ROOT_JSON_FILE
+        'ROOT_JSON_FILE': ROOT_JSON_FILE,
+        'SNAPSHOT_FILE': SNAPSHOT_FILE,
+        'DETAIL_STORE_DIR': DETAIL_STORE_DIR
     }
 
+# Byte order marks, longest first: the UTF-32 LE mark starts with the UTF-16 LE one
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Encodings tried, after the detected one, for files that are not valid UTF;
+# latin1 decodes any bytes, so it has to come last
+FALLBACK_ENCODINGS = ('cp1252', 'latin1')
+
+
+def detect_encoding(raw):
+    """Return the encoding named by raw's byte order mark, or utf-8."""
+    for bom, encoding in BYTE_ORDER_MARKS:
+        if raw.startswith(bom):
+            return encoding
+    return 'utf-8'
+
+
+def parse_json_bytes(raw):
+    """Parse a JSON object or array from raw file bytes.
+
+    Plain UTF-8 (with or without a BOM) is parsed straight from the bytes,
+    with orjson when it is installed. Anything else, or bytes the fast
+    parser rejects, is decoded as text with the detected encoding and then
+    the fallback encodings. Raises ValueError when nothing parses.
+    """
+    encoding = detect_encoding(raw)
+    if encoding in ('utf-8', 'utf-8-sig'):
+        body = raw[len(codecs.BOM_UTF8):] if encoding == 'utf-8-sig' else raw
+        body = body.strip()
+        if body[:1] in (b'{', b'['):
+            try:
+                return json_loads(body)
+            except ValueError:
+                pass
+
+    last_error = "no JSON object or array found"
+    for candidate in (encoding,) + FALLBACK_ENCODINGS:
+        try:
+            content = raw.decode(candidate).lstrip('\ufeff').strip()
+        except UnicodeDecodeError:
+            continue
+        if not content.startswith('{') and not content.startswith('['):
+            continue
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError as je:
+            last_error = f"JSON parsing error with {candidate} encoding: {str(je)}"
+    raise ValueError(last_error)
+
+
 def load_json_file(file_path):
-    """Load and parse a JSON file with robust error handling."""
+    """Load and parse a JSON file, reading it once."""
+    normalized_path = os.path.normpath(file_path)
+    is_root = normalized_path.endswith('ai-alignment.json')
     try:
-        logger.info(f"Attempting to load file: {file_path}")
-        
-        # Normalize path for Windows
-        normalized_path = os.path.normpath(file_path)
-        logger.info(f"Normalized path: {normalized_path}")
-        
-        # First check if the file exists
-        if not os.path.isfile(normalized_path):
-            logger.error(f"File not found: {normalized_path}")
-            if normalized_path.endswith('ai-alignment.json'):
-                logger.warning("Using default root data since root file not found")
-                return DEFAULT_ROOT_DATA
-            return None
-        
-        # Try different encodings and handle BOM
-        encodings = ['utf-8-sig', 'utf-8', 'latin1', 'cp1252']
-        content = None
-        last_error = None
-        
-        for encoding in encodings:
-            try:
-                with open(normalized_path, 'r', encoding=encoding) as f:
-                    content = f.read().strip()
-                    if not content:
-                        continue
-                    
-                    # Remove BOM if present
-                    if content.startswith('\ufeff'):
-                        content = content[1:]
-                    
-                    # Remove any non-JSON leading/trailing characters
-                    content = content.strip()
-                    if not content.startswith('{') and not content.startswith('['):
-                        continue
-                        
-                    # Try to parse JSON
-                    try:
-                        data = json.loads(content)
-                        logger.info(f"Successfully loaded {normalized_path} with {encoding} encoding")
-                        return data
-                    except json.JSONDecodeError as je:
-                        last_error = f"JSON parsing error with {encoding} encoding: {str(je)}"
-                        logger.error(last_error)
-                        logger.error(f"Content preview: {content[:200]}...")
-                        continue
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                last_error = f"Error reading file with {encoding} encoding: {str(e)}"
-                logger.error(last_error)
-                continue
-        
-        # If we get here, we couldn't parse the file with any encoding
-        if normalized_path.endswith('ai-alignment.json'):
-            logger.warning("Using default root data since root file could not be parsed")
+        with METRICS.timer("file_read"), open(normalized_path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        logger.error(f"File not found: {normalized_path}")
+        if is_root:
+            logger.warning("Using default root data since root file not found")
             return DEFAULT_ROOT_DATA
-            
-        logger.error(f"Could not parse file with any encoding: {normalized_path}")
         return None
-        
-    except Exception as e:
+    except OSError as e:
         logger.error(f"Unexpected error loading {normalized_path}: {str(e)}")
-        if normalized_path.endswith('ai-alignment.json'):
+        if is_root:
             logger.warning("Using default root data due to error")
             return DEFAULT_ROOT_DATA
         return None
 
+    try:
+        with METRICS.timer("json_parse"):
+            return parse_json_bytes(raw)
+    except ValueError as e:
+        logger.error(f"Could not parse {normalized_path}: {str(e)}")
+        if is_root:
+            logger.warning("Using default root data since root file could not be parsed")
+            return DEFAULT_ROOT_DATA
+        return None
+
+# Shared by AIAlignmentVisualizer and this module so each file is parsed once per process
+CORPUS_CACHE = corpus_cache.CorpusCache(load_json_file)
+
 def get_root_data():
-    """Get the root AI Alignment data."""
+    """Get the root AI Alignment data, read once per corpus version."""
+    return CORPUS_CACHE.memoize("root_data", load_root_data)
+
+def get_components():
+    """Get all component data, read once per corpus version."""
+    return CORPUS_CACHE.memoize("components", load_components)
+
+def get_subcomponents():
+    """Get all subcomponent data, read once per corpus version."""
+    return CORPUS_CACHE.memoize("subcomponents", load_subcomponents)
+
+def load_root_data():
+    """Load the root AI Alignment data."""
     paths = setup_paths()
-    root_data = load_json_file(paths['ROOT_JSON_FILE'])
+    root_data = CORPUS_CACHE.load(paths['ROOT_JSON_FILE'])
     if not root_data:
         logger.warning(f"Using default root data since {paths['ROOT_JSON_FILE']} was not found")
         return DEFAULT_ROOT_DATA
     return root_data
 
-def get_components():
-    """Get all component data."""
+def load_components():
+    """Load all component data."""
     paths = setup_paths()
     components = {}
     
@@ -119,7 +172,7 @@ def get_components():
         return components
     
     # Load components
-    component_files = glob.glob(os.path.join(paths['COMPONENTS_DIR'], "*.json"))
+    component_files = CORPUS_CACHE.list_files(paths['COMPONENTS_DIR'])
     logger.info(f"Found {len(component_files)} component files")
     
     # If no component files found, use default components
@@ -129,9 +182,7 @@ def get_components():
             components[component["id"]] = component
         return components
     
-    for file_path in component_files:
-        logger.debug(f"Loading component file: {file_path}")
-        component_data = load_json_file(file_path)
+    for file_path, component_data in CORPUS_CACHE.load_many(component_files).items():
         if component_data:
             component_id = os.path.basename(file_path).replace(".json", "")
             components[component_id] = component_data
@@ -147,8 +198,8 @@ def get_components():
     
     return components
 
-def get_subcomponents():
-    """Get all subcomponent data."""
+def load_subcomponents():
+    """Load all subcomponent data."""
     paths = setup_paths()
     subcomponents = {}
     
@@ -157,12 +208,10 @@ def get_subcomponents():
         return subcomponents
     
     # Load subcomponents
-    subcomponent_files = glob.glob(os.path.join(paths['SUBCOMPONENTS_DIR'], "*.json"))
+    subcomponent_files = CORPUS_CACHE.list_files(paths['SUBCOMPONENTS_DIR'])
     logger.info(f"Found {len(subcomponent_files)} subcomponent files")
     
-    for file_path in subcomponent_files:
-        logger.debug(f"Loading subcomponent file: {file_path}")
-        data = load_json_file(file_path)
+    for file_path, data in CORPUS_CACHE.load_many(subcomponent_files).items():
         if data:
             subcomponent_id = os.path.basename(file_path).replace(".json", "")
             if "id" not in data:
@@ -249,6 +298,117 @@ def find_nested_node(node_id, subcomponents):
     
     return None
 
+def iter_nested_nodes(subcomponents):
+    """Yield (node, parent_id, depth, subcomponent_id) for every node below the subcomponents, depth-first.
+
+    Walks graph_builder's level table, so the index holds exactly the nested
+    nodes the graph shows (including outputs listed under an input).
+    """
+    def walk(items, node_type, parent_id, subcomp_id):
+        level = graph_builder.NODE_LEVELS[node_type]["level"]
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            yield item, parent_id, level, subcomp_id
+            for child_type, raw in graph_builder.child_collections(item, node_type):
+                yield from walk(graph_builder.as_child_list(child_type, raw), child_type, item.get("id"), subcomp_id)
+
+    for subcomp_id, subcomp in subcomponents.items():
+        if not isinstance(subcomp, dict):
+            continue
+        yield from walk(graph_builder.get_capabilities(subcomp, subcomp_id, logger), "capability", subcomp_id, subcomp_id)
+
+def build_node_index(subcomponents):
+    """Build a flat id -> {node, parent, depth, file} index of all nested nodes."""
+    subcomponents_dir = setup_paths()['SUBCOMPONENTS_DIR']
+    index = {}
+    for node, parent_id, depth, subcomp_id in iter_nested_nodes(subcomponents):
+        node_id = node.get("id")
+        # First occurrence wins, matching find_nested_node for duplicated ids
+        if node_id and node_id not in index:
+            index[node_id] = {
+                "node": node,
+                "parent": parent_id,
+                "depth": depth,
+                "file": os.path.join(subcomponents_dir, f"{subcomp_id}.json")
+            }
+    logger.debug(f"Built node index with {len(index)} nested nodes")
+    return index
+
+def get_node_index():
+    """Get the nested node index, built once per corpus version."""
+    def build():
+        subcomponents = get_subcomponents()
+        with METRICS.timer("node_index_build"):
+            return build_node_index(subcomponents)
+    return CORPUS_CACHE.memoize("node_index", build)
+
+def validate_node_index(index, subcomponents):
+    """Return the ids whose index entry disagrees with a find_nested_node traversal.
+
+    Outputs listed under an input are indexed, as the graph shows them, but
+    find_nested_node does not look there; only ids it finds are compared.
+    """
+    mismatched = []
+    for node_id, entry in index.items():
+        found = find_nested_node(node_id, subcomponents)
+        if found is not entry["node"] and (found is not None or entry["depth"] != graph_builder.NODE_LEVELS["output"]["level"]):
+            mismatched.append(node_id)
+    return mismatched
+
+def build_detail_payloads(root_data, components, subcomponents, node_index):
+    """Return {node_id: detail dict} for every id get_node_details resolves with 200."""
+    details = {}
+    # Later assignments win, mirroring get_node_details' lookup order
+    for node_id, entry in node_index.items():
+        details[node_id] = entry["node"]
+    for node_id, data in subcomponents.items():
+        if isinstance(data, dict):
+            details[node_id] = data
+    for node_id, data in components.items():
+        if isinstance(data, dict):
+            details[node_id] = data
+    details["ai-alignment"] = root_data
+    if root_data.get("id"):
+        details[root_data["id"]] = root_data
+    return details
+
+# File behind the last detail store this process built, deleted when a new version replaces it
+_shared_store_path = None
+
+def build_detail_store():
+    """Encode every node's details into a new shared store file."""
+    global _shared_store_path
+    root_data = get_root_data()
+    components = get_components()
+    subcomponents = get_subcomponents()
+    node_index = get_node_index()
+    with METRICS.timer("detail_store_build"):
+        payloads = build_detail_payloads(root_data, components, subcomponents, node_index)
+        store = detail_store.build_shared_store(setup_paths()['DETAIL_STORE_DIR'], payloads, _shared_store_path)
+    _shared_store_path = store.path
+    return store
+
+def get_detail_store():
+    """Get the memory-mapped store of pre-encoded detail payloads, built once per corpus version."""
+    return CORPUS_CACHE.memoize("detail_store", build_detail_store)
+
+def get_ready_detail_store():
+    """Get the detail store if it is built (or comes from the snapshot) for the current corpus version, else None."""
+    return CORPUS_CACHE.peek("detail_store", build_detail_store)
+
+def node_not_found(node_id):
+    """The details body answered with 404 for an unknown node."""
+    error_msg = f"Node not found: {node_id}"
+    logger.warning(error_msg)
+    return {
+        "error": error_msg,
+        "id": node_id,
+        "name": "Unknown Node",
+        "description": "Node details not found",
+        "type": "unknown"
+    }
+
 def get_node_details(node_id):
     """Get details for a specific node."""
     try:
@@ -310,7 +470,8 @@ def get_node_details(node_id):
                 }, 500
         
         # Look for nested nodes
-        nested_node = find_nested_node(node_id, subcomponents)
+        entry = get_node_index().get(node_id)
+        nested_node = entry["node"] if entry else None
         if nested_node:
             if not isinstance(nested_node, dict):
                 logger.error(f"Found nested node {node_id} but it's not a dictionary: {type(nested_node)}")
@@ -323,15 +484,7 @@ def get_node_details(node_id):
                 }, 500
             return nested_node, 200
             
-        error_msg = f"Node not found: {node_id}"
-        logger.warning(error_msg)
-        return {
-            "error": error_msg,
-            "id": node_id,
-            "name": "Unknown Node",
-            "description": "Node details not found",
-            "type": "unknown"
-        }, 404
+        return node_not_found(node_id), 404
     except Exception as e:
         error_msg = f"Unexpected error in get_node_details for {node_id}: {str(e)}"
         logger.error(error_msg, exc_info=True)
@@ -0,0 +1,165 @@
+"""
+Per-client rate limiting.
+
+Uses a sliding-window counter: each client keeps only the request count of
+the current and the previous fixed window, and the previous count is
+weighted by how much of it still overlaps the sliding window. Memory per
+client is constant and a check is O(1), unlike keeping every timestamp.
+
+Backends:
+    MemoryBackend  - in-process, LRU-bounded to max_clients
+    SQLiteBackend  - a SQLite file shared by all worker processes on a host
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def sliding_window_allows(window_start, current, previous, now, window, limit):
+    """Apply one request to a client's counters.
+
+    Returns (allowed, window_start, current, previous) with the counters
+    rolled forward to the window containing now.
+    """
+    current_start = now - (now % window)
+    if current_start != window_start:
+        # One window later the current count becomes the previous one;
+        # after a longer gap both are empty
+        previous = current if current_start - window_start == window else 0
+        current = 0
+        window_start = current_start
+    overlap = 1.0 - (now - window_start) / window
+    if previous * overlap + current >= limit:
+        return False, window_start, current, previous
+    return True, window_start, current + 1, previous
+
+
+class MemoryBackend:
+    """In-process counters, evicting the least recently seen client beyond max_clients."""
+
+    def __init__(self, max_clients=10000):
+        self.max_clients = max_clients
+        self._clients = OrderedDict()  # key -> (window_start, current, previous)
+        self._lock = threading.Lock()
+
+    def hit(self, key, now, window, limit):
+        with self._lock:
+            window_start, current, previous = self._clients.pop(key, (0, 0, 0))
+            allowed, window_start, current, previous = sliding_window_allows(
+                window_start, current, previous, now, window, limit
+            )
+            self._clients[key] = (window_start, current, previous)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+            return allowed
+
+    def __len__(self):
+        return len(self._clients)
+
+
+class SQLiteBackend:
+    """Counters in a SQLite file so limits hold across worker processes."""
+
+    # Rows idle for longer than this many windows are deleted now and then
+    IDLE_WINDOWS = 2
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, max_clients=10000):
+        # Imported here so the default memory backend doesn't pay for sqlite3 at startup
+        import sqlite3
+        self._sqlite3 = sqlite3
+        self.path = path
+        self.max_clients = max_clients
+        self._local = threading.local()
+        self._hits = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "client TEXT PRIMARY KEY, window_start REAL, current INTEGER, previous INTEGER, last_seen REAL)"
+            )
+
+    def _connect(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+        return connection
+
+    def hit(self, key, now, window, limit):
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT window_start, current, previous FROM rate_limits WHERE client = ?", (key,)
+            ).fetchone()
+            allowed, window_start, current, previous = sliding_window_allows(
+                *(row or (0, 0, 0)), now, window, limit
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?, ?)",
+                (key, window_start, current, previous, now)
+            )
+            self._hits += 1
+            if self._hits % self.PRUNE_EVERY == 0:
+                self._prune(connection, now, window)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return allowed
+
+    def _prune(self, connection, now, window):
+        connection.execute("DELETE FROM rate_limits WHERE last_seen < ?", (now - self.IDLE_WINDOWS * window,))
+        connection.execute(
+            "DELETE FROM rate_limits WHERE client NOT IN "
+            "(SELECT client FROM rate_limits ORDER BY last_seen DESC LIMIT ?)",
+            (self.max_clients,)
+        )
+
+
+def create_backend(name, **options):
+    """Create a backend by name ("memory" or "sqlite")."""
+    if name == "memory":
+        return MemoryBackend(max_clients=options.get("max_clients", 10000))
+    if name == "sqlite":
+        return SQLiteBackend(options["path"], max_clients=options.get("max_clients", 10000))
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+def client_address(forwarded_for, remote_addr, trusted_proxies=1):
+    """Return the client address for a request.
+
+    Each trusted proxy appends the address it received the request from to
+    X-Forwarded-For, so the real client is trusted_proxies entries from the
+    right; anything further left may have been supplied by the client.
+    """
+    if forwarded_for and trusted_proxies > 0:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        if hops:
+            return hops[-min(trusted_proxies, len(hops))]
+    return remote_addr
+
+
+class RateLimiter:
+    """Allow at most limit requests per window seconds per client."""
+
+    def __init__(self, backend, limit, window):
+        self.backend = backend
+        self.limit = limit
+        self.window = window
+
+    def allow(self, key):
+        try:
+            return self.backend.hit(key, time.time(), self.window, self.limit)
+        except Exception as e:
+            # Never take the site down because the limiter's store is unavailable
+            logger.error(f"Rate limit check failed: {str(e)}")
+            return True
@@ -0,0 +1,180 @@
+"""
+Full-text search over graph nodes.
+
+An inverted index over node names, descriptions and literature, ranked with
+BM25. Fields are weighted by repeating their term frequencies (a node whose
+name matches ranks above one that only cites a matching paper), and the last
+query token is matched as a prefix so the index can back a type-ahead box.
+"""
+
+import bisect
+import heapq
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "its", "of", "on", "or", "that", "the", "their", "this", "to", "with", "within",
+))
+
+FIELD_WEIGHTS = {"name": 3, "description": 1, "literature": 1}
+
+LITERATURE_KEYS = ("literature", "supported_by_literature", "literature_connections")
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# How many vocabulary terms a trailing prefix may expand to
+MAX_PREFIX_EXPANSIONS = 50
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def collect_strings(value):
+    """Return every string nested anywhere inside value."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [s for item in value.values() for s in collect_strings(item)]
+    if isinstance(value, list):
+        return [s for item in value for s in collect_strings(item)]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return [str(value)]
+    return []
+
+
+def reference_texts(data):
+    """Map reference id -> searchable text for the references a file declares."""
+    literature = data.get("literature") if isinstance(data, dict) else None
+    references = literature.get("references", []) if isinstance(literature, dict) else []
+    texts = {}
+    for reference in references:
+        if isinstance(reference, dict) and reference.get("id"):
+            texts[reference["id"]] = " ".join(collect_strings(
+                {key: reference.get(key) for key in ("title", "authors", "venue", "year")}
+            ))
+    return texts
+
+
+def literature_text(node, references):
+    """Searchable literature text of one node, resolving cited reference ids to their titles."""
+    parts = []
+    for key in LITERATURE_KEYS:
+        for text in collect_strings(node.get(key)):
+            parts.append(text)
+            # "literature" holds the references themselves; other keys cite them by id
+            if key != "literature" and text in references:
+                parts.append(references[text])
+    return " ".join(parts)
+
+
+class SearchIndex:
+    """BM25 inverted index over documents of the form {id, type, name, fields: {field: text}}."""
+
+    def __init__(self, documents):
+        self.documents = []
+        self.postings = defaultdict(list)  # term -> [(doc number, weighted tf)]
+        lengths = []
+        seen = set()
+        for document in documents:
+            if document["id"] in seen:
+                continue
+            seen.add(document["id"])
+            frequencies = Counter()
+            for field, text in document["fields"].items():
+                weight = FIELD_WEIGHTS.get(field, 1)
+                for token in tokenize(text or ""):
+                    frequencies[token] += weight
+            number = len(self.documents)
+            self.documents.append({"id": document["id"], "type": document["type"], "name": document["name"]})
+            lengths.append(sum(frequencies.values()))
+            for term, frequency in frequencies.items():
+                self.postings[term].append((number, frequency))
+
+        average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        count = len(self.documents)
+        # Store each posting's BM25 contribution so queries only add numbers up
+        self.impacts = {}
+        for term, postings in self.postings.items():
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            self.impacts[term] = [
+                (number, idf * frequency * (K1 + 1) / (frequency + K1 * (1 - B + B * lengths[number] / average_length)))
+                for number, frequency in postings
+            ]
+        self.vocabulary = sorted(self.postings)
+
+    def expand_prefix(self, prefix):
+        """Return the most common vocabulary terms starting with prefix."""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\uffff")
+        terms = self.vocabulary[start:end]
+        if len(terms) > MAX_PREFIX_EXPANSIONS:
+            terms = sorted(terms, key=lambda term: len(self.postings[term]), reverse=True)[:MAX_PREFIX_EXPANSIONS]
+        return terms
+
+    def search(self, query, limit=20, prefix=True):
+        """Return (total matches, [(document, score)]) best first.
+
+        Every query token must match a document; with prefix=True the last
+        token also matches any term it is a prefix of.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return 0, []
+
+        scores = None
+        for position, token in enumerate(tokens):
+            if prefix and position == len(tokens) - 1:
+                terms = self.expand_prefix(token)
+            else:
+                terms = [token] if token in self.postings else []
+            token_scores = defaultdict(float)
+            for term in terms:
+                for number, impact in self.impacts[term]:
+                    token_scores[number] += impact
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {number: score + token_scores[number] for number, score in scores.items() if number in token_scores}
+            if not scores:
+                return 0, []
+
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return len(scores), [(self.documents[number], score) for number, score in best]
+
+
+def build_documents(graph, root_data, components, subcomponents, node_index):
+    """Yield one search document per graph node, enriched with literature from the source data."""
+    sources = {}
+    references_by_file = {}
+    for subcomp_id, data in subcomponents.items():
+        references_by_file[subcomp_id] = reference_texts(data)
+    for node_id, entry in node_index.items():
+        subcomp_id = os.path.splitext(os.path.basename(entry["file"]))[0]
+        sources[node_id] = (entry["node"], references_by_file.get(subcomp_id, {}))
+    for subcomp_id, data in subcomponents.items():
+        sources[subcomp_id] = (data, references_by_file[subcomp_id])
+    for component_id, data in components.items():
+        sources[component_id] = (data, reference_texts(data))
+    if isinstance(root_data, dict):
+        sources[root_data.get("id", "ai-alignment")] = (root_data, reference_texts(root_data))
+
+    for node in graph["nodes"]:
+        source, references = sources.get(node["id"], (None, {}))
+        yield {
+            "id": node["id"],
+            "type": node["type"],
+            "name": node["name"],
+            "fields": {
+                "name": " ".join(collect_strings(node["name"])),
+                "description": " ".join(collect_strings(node.get("description", ""))),
+                "literature": literature_text(source, references) if isinstance(source, dict) else "",
+            },
+        }
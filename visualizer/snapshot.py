@@ -0,0 +1,299 @@
+"""
+Compiled corpus snapshot.
+
+Compiles ai-alignment.json, components/ and subcomponents/ into a single
+binary file holding the encoded graph (with compressed variants and, when
+NumPy is installed, node positions), every node's detail payload and the
+search documents, so a cold process can serve the graph, details,
+hierarchy paths and search after one memory-mapped read instead of
+globbing and parsing the JSON corpus.
+
+File layout::
+
+    MAGIC | header length (uint32 LE) | header JSON | section bytes ...
+
+The header lists the source files (size and sha256) the snapshot was built
+from and the (offset, length) of every section relative to the end of the
+header. A snapshot whose sources no longer match is stale and is ignored.
+
+Usage::
+
+    python -m visualizer.snapshot compile [--output PATH]
+    python -m visualizer.snapshot check [PATH]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+
+try:
+    from . import node_details_helper
+    from . import graph_builder
+    from . import graph_delta
+    from . import graph_layout
+    from . import encoded_payload
+    from . import detail_store
+    from . import search_index
+    from . import config
+except ImportError:
+    import node_details_helper
+    import graph_builder
+    import graph_delta
+    import graph_layout
+    import encoded_payload
+    import detail_store
+    import search_index
+    import config
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"AIASNAP1"
+FORMAT_VERSION = 3
+_HEADER_LENGTH = struct.Struct("<I")
+
+# Code whose output is baked into the snapshot; editing it makes the snapshot stale
+CODE_FILES = (
+    "detail_store.py", "encoded_payload.py", "graph_builder.py", "graph_columns.py", "graph_delta.py", "graph_layout.py",
+    "node_details_helper.py", "search_index.py", "snapshot.py",
+)
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def source_files(paths):
+    """Return {directory key: sorted file list} and the flat list of every source file."""
+    listings = {
+        "components": sorted(node_details_helper.CORPUS_CACHE.list_files(paths['COMPONENTS_DIR'])),
+        "subcomponents": sorted(node_details_helper.CORPUS_CACHE.list_files(paths['SUBCOMPONENTS_DIR'])),
+    }
+    code = [os.path.join(paths['APP_DIR'], name) for name in CODE_FILES]
+    files = [paths['ROOT_JSON_FILE']] + listings["components"] + listings["subcomponents"] + code
+    return listings, files
+
+
+def compile_snapshot(output_path=None):
+    """Build and validate a snapshot of the current corpus and write it to output_path."""
+    paths = node_details_helper.setup_paths()
+    output_path = output_path or paths['SNAPSHOT_FILE']
+
+    root_data = node_details_helper.get_root_data()
+    components = node_details_helper.get_components()
+    subcomponents = node_details_helper.get_subcomponents()
+    if not isinstance(root_data, dict):
+        raise SnapshotError("Root data is not a valid dictionary")
+
+    graph = graph_builder.build_graph_data(root_data, components, subcomponents)
+    node_index = node_details_helper.build_node_index(subcomponents)
+    mismatched = node_details_helper.validate_node_index(node_index, subcomponents)
+    if mismatched:
+        raise SnapshotError(f"Node index disagrees with traversal for {len(mismatched)} ids, e.g. {mismatched[:3]}")
+
+    layout = None
+    if config.GRAPH_LAYOUT_ENABLED:
+        layout = graph_layout.compute_layout(graph, config.GRAPH_LAYOUT_ITERATIONS, config.GRAPH_LAYOUT_SAMPLES)
+    payload = encoded_payload.EncodedPayload.from_json(
+        graph if layout is None else graph_layout.with_positions(graph, layout)
+    )
+    sections = {"graph": payload.body}
+    for encoding, data in payload.variants.items():
+        sections[f"graph.{encoding}"] = data
+    if layout is not None:
+        sections["layout"] = _dumps(layout)
+
+    sections["search_documents"] = _dumps(list(search_index.build_documents(
+        graph, root_data, components, subcomponents, node_index
+    )))
+
+    details_index, sections["details"] = detail_store.encode_details(
+        node_details_helper.build_detail_payloads(root_data, components, subcomponents, node_index)
+    )
+    sections["details_index"] = _dumps(details_index)
+
+    listings, files = source_files(paths)
+    offset = 0
+    layout = {}
+    for name, data in sections.items():
+        layout[name] = [offset, len(data)]
+        offset += len(data)
+
+    header = _dumps({
+        "format": FORMAT_VERSION,
+        "created": time.time(),
+        "sources": [
+            {"path": os.path.relpath(path, paths['PARENT_DIR']), "size": os.path.getsize(path), "sha256": _sha256(path)}
+            for path in files
+        ],
+        "listings": {key: [os.path.relpath(path, paths['PARENT_DIR']) for path in value] for key, value in listings.items()},
+        "sections": layout,
+        "counts": {"nodes": len(graph["nodes"]), "links": len(graph["links"]), "details": len(details_index)},
+        "graph_version": graph_delta.GraphVersion(graph).id,
+    })
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for data in sections.values():
+            f.write(data)
+    os.replace(tmp_path, output_path)
+    logger.info(f"Wrote snapshot {output_path} ({offset} bytes of sections)")
+    return output_path
+
+
+class Snapshot:
+    """A memory-mapped compiled snapshot; sections are sliced lazily."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise SnapshotError(f"Not a snapshot file: {path}")
+        start = len(MAGIC)
+        (header_length,) = _HEADER_LENGTH.unpack_from(self._map, start)
+        start += _HEADER_LENGTH.size
+        self.header = json.loads(self._map[start:start + header_length])
+        if self.header.get("format") != FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot format: {self.header.get('format')}")
+        self._data_start = start + header_length
+
+    def section(self, name):
+        offset, length = self.header["sections"][name]
+        start = self._data_start + offset
+        return self._map[start:start + length]
+
+    def has_section(self, name):
+        return name in self.header["sections"]
+
+    def is_fresh(self, base_dir):
+        """Check the corpus and code on disk still match what the snapshot was built from."""
+        listings = {
+            "components": node_details_helper.CORPUS_CACHE.list_files(os.path.join(base_dir, "components")),
+            "subcomponents": node_details_helper.CORPUS_CACHE.list_files(os.path.join(base_dir, "subcomponents")),
+        }
+        for key, files in listings.items():
+            if [os.path.relpath(path, base_dir) for path in files] != self.header["listings"][key]:
+                return False
+        for source in self.header["sources"]:
+            path = os.path.join(base_dir, source["path"])
+            try:
+                if os.path.getsize(path) != source["size"] or _sha256(path) != source["sha256"]:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def graph_payload(self):
+        variants = {
+            name.split(".", 1)[1]: self.section(name)
+            for name in self.header["sections"] if name.startswith("graph.")
+        }
+        return encoded_payload.EncodedPayload(self.section("graph"), variants=variants)
+
+    def graph_data(self):
+        graph = json.loads(self.section("graph"))
+        if self.has_section("layout"):
+            # The served graph carries positions; the graph itself does not
+            graph = graph_layout.without_positions(graph)
+        return graph
+
+    def graph_layout(self):
+        """Return the compiled [[x, y, z]] per node, or None when compiled without a layout."""
+        if not self.has_section("layout"):
+            return None
+        return json.loads(self.section("layout"))
+
+    def graph_version_id(self):
+        return self.header["graph_version"]
+
+    def search_index(self):
+        return search_index.SearchIndex(json.loads(self.section("search_documents")))
+
+    def detail_store(self):
+        """Return a DetailStore reading payloads straight out of the mapped snapshot."""
+        index = json.loads(self.section("details_index"))
+        offset = self._data_start + self.header["sections"]["details"][0]
+        return detail_store.DetailStore(self._map, index, offset)
+
+
+def load_snapshot(path=None):
+    """Load the snapshot at path if it exists and is fresh, otherwise return None."""
+    paths = node_details_helper.setup_paths()
+    path = path or paths['SNAPSHOT_FILE']
+    if not os.path.isfile(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+        if not snapshot.is_fresh(paths['PARENT_DIR']):
+            logger.warning(f"Ignoring stale snapshot {path}")
+            return None
+        return snapshot
+    except (SnapshotError, OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable snapshot {path}: {str(e)}")
+        return None
+
+
+def prime_cache(snapshot):
+    """Register the corpus files with CORPUS_CACHE and serve derived data from snapshot until they change."""
+    paths = node_details_helper.setup_paths()
+    cache = node_details_helper.CORPUS_CACHE
+    base_dir = paths['PARENT_DIR']
+    listings = {
+        (paths['COMPONENTS_DIR'], "*.json"): [os.path.join(base_dir, p) for p in snapshot.header["listings"]["components"]],
+        (paths['SUBCOMPONENTS_DIR'], "*.json"): [os.path.join(base_dir, p) for p in snapshot.header["listings"]["subcomponents"]],
+    }
+    files = [paths['ROOT_JSON_FILE']] + [path for group in listings.values() for path in group]
+    cache.prime(files, listings, {
+        "graph": snapshot.graph_data,
+        "graph_payload": snapshot.graph_payload,
+        "graph_layout": snapshot.graph_layout,
+        "detail_store": snapshot.detail_store,
+        "search_index": snapshot.search_index,
+        "graph_version_id": snapshot.graph_version_id,
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile or check the corpus snapshot")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compile_parser = subparsers.add_parser("compile", help="Compile the corpus into a snapshot file")
+    compile_parser.add_argument("--output", help="Snapshot path (default: next to ai-alignment.json)")
+    check_parser = subparsers.add_parser("check", help="Report whether a snapshot is present and fresh")
+    check_parser.add_argument("path", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.command == "compile":
+        start = time.perf_counter()
+        path = compile_snapshot(args.output)
+        snapshot = Snapshot(path)
+        print(f"Compiled {path} in {(time.perf_counter() - start) * 1000:.0f} ms: {snapshot.header['counts']}")
+        return 0
+
+    snapshot = load_snapshot(args.path)
+    if snapshot is None:
+        print("Snapshot missing or stale")
+        return 1
+    print(f"Snapshot {snapshot.path} is fresh: {snapshot.header['counts']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+/**
+ * Decoder for the columnar graph encoding served by /api/graph for
+ * Accept: application/vnd.ai-alignment.graph-columns (see visualizer/graph_columns.py).
+ *
+ * decodeGraphColumns(buffer) returns typed-array views over the response
+ * buffer without copying; graphColumnsToObjects(columns) rebuilds the
+ * {nodes, links} shape of the JSON endpoint for code that needs objects.
+ *
+ * Provided for API clients; index.html does not load it and fetches the
+ * JSON encoding.
+ */
+(function (global) {
+    const MAGIC = 'AIAGCOL1';
+    const FLAG_EXPANDABLE = 1;
+    const FLAG_HAS_CHILDREN = 2;
+    const ARRAY_TYPES = { uint8: Uint8Array, int32: Int32Array, uint32: Uint32Array, float32: Float32Array };
+
+    function decodeGraphColumns(buffer) {
+        const bytes = new Uint8Array(buffer);
+        const decoder = new TextDecoder('utf-8');
+        if (decoder.decode(bytes.subarray(0, MAGIC.length)) !== MAGIC) {
+            throw new Error('Not a columnar graph payload');
+        }
+        const view = new DataView(buffer);
+        const headerLength = view.getUint32(MAGIC.length, true);
+        const headerStart = MAGIC.length + 4;
+        const header = JSON.parse(decoder.decode(bytes.subarray(headerStart, headerStart + headerLength)));
+
+        const columns = {};
+        for (const [name, [offset, length, dtype]] of Object.entries(header.sections)) {
+            if (dtype === 'json') {
+                columns[name] = JSON.parse(decoder.decode(bytes.subarray(offset, offset + length)));
+            } else {
+                const ArrayType = ARRAY_TYPES[dtype];
+                columns[name] = new ArrayType(buffer, offset, length / ArrayType.BYTES_PER_ELEMENT);
+            }
+        }
+        return {
+            counts: header.counts,
+            nodeTypes: header.node_types,
+            linkTypes: header.link_types,
+            strings: columns.strings,
+            columns: columns
+        };
+    }
+
+    function graphColumnsToObjects(graph) {
+        const { strings, columns, nodeTypes, linkTypes } = graph;
+        const ids = Array.from(columns.node_id, index => strings[index]);
+        const endpoint = value => (value >= 0 ? ids[value] : strings[-1 - value]);
+
+        const nodes = ids.map((id, i) => {
+            const node = {
+                id: id,
+                name: strings[columns.node_name[i]],
+                type: nodeTypes[columns.node_type[i]],
+                description: strings[columns.node_description[i]]
+            };
+            if (columns.node_parent[i] >= 0) {
+                node.parent = ids[columns.node_parent[i]];
+            }
+            node.level = columns.node_level[i];
+            node.expandable = (columns.node_flags[i] & FLAG_EXPANDABLE) !== 0;
+            node.has_children = (columns.node_flags[i] & FLAG_HAS_CHILDREN) !== 0;
+            if (columns.node_x) {
+                node.x = columns.node_x[i];
+                node.y = columns.node_y[i];
+                node.z = columns.node_z[i];
+            }
+            return node;
+        });
+
+        const links = [];
+        for (let i = 0; i < columns.link_source.length; i++) {
+            const link = {
+                source: endpoint(columns.link_source[i]),
+                target: endpoint(columns.link_target[i]),
+                type: linkTypes[columns.link_type[i]]
+            };
+            if (columns.link_description[i] >= 0) {
+                link.description = strings[columns.link_description[i]];
+            }
+            links.push(link);
+        }
+        return { nodes: nodes, links: links };
+    }
+
+    global.decodeGraphColumns = decodeGraphColumns;
+    global.graphColumnsToObjects = graphColumnsToObjects;
+})(typeof window !== 'undefined' ? window : globalThis);
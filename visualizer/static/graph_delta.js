@@ -0,0 +1,77 @@
+/**
+ * Client side of the graph delta API (see visualizer/graph_delta.py).
+ *
+ * applyGraphDelta(graph, delta) patches a {nodes, links, dangling_links}
+ * graph from /api/graph in place. watchGraphDeltas(version, handlers) opens
+ * the /api/graph/events stream and calls handlers.delta(delta) for each new
+ * version, or handlers.reset(version) when the graph must be refetched.
+ */
+(function (global) {
+    const LINK_COLLECTIONS = ['links', 'dangling_links'];
+
+    // Same keys as the server: the id, then "id#n" for its n-th repeat
+    function nodeKeys(nodes) {
+        const seen = new Map();
+        return nodes.map(node => {
+            const count = seen.get(node.id) || 0;
+            seen.set(node.id, count + 1);
+            return count === 0 ? node.id : `${node.id}#${count}`;
+        });
+    }
+
+    function endpointId(endpoint) {
+        return endpoint !== null && typeof endpoint === 'object' ? endpoint.id : endpoint;
+    }
+
+    function sameLink(a, b) {
+        return endpointId(a.source) === endpointId(b.source) &&
+            endpointId(a.target) === endpointId(b.target) &&
+            a.type === b.type &&
+            a.description === b.description;
+    }
+
+    function applyGraphDelta(graph, delta) {
+        const keys = nodeKeys(graph.nodes);
+        const removed = new Set(delta.nodes.removed);
+        const nodes = [];
+        graph.nodes.forEach((node, index) => {
+            const key = keys[index];
+            if (removed.has(key)) {
+                return;
+            }
+            nodes.push(key in delta.nodes.changed ? delta.nodes.changed[key] : node);
+        });
+        graph.nodes = nodes.concat(Object.values(delta.nodes.added));
+
+        for (const collection of LINK_COLLECTIONS) {
+            const changes = delta[collection];
+            if (!changes) {
+                continue;
+            }
+            const links = graph[collection] || [];
+            for (const link of changes.removed) {
+                const index = links.findIndex(existing => sameLink(existing, link));
+                if (index !== -1) {
+                    links.splice(index, 1);
+                }
+            }
+            graph[collection] = links.concat(changes.added);
+        }
+        return graph;
+    }
+
+    function watchGraphDeltas(version, handlers) {
+        const url = version ? `/api/graph/events?since=${encodeURIComponent(version)}` : '/api/graph/events';
+        const source = new EventSource(url);
+        source.addEventListener('delta', event => handlers.delta(JSON.parse(event.data)));
+        source.addEventListener('reset', event => {
+            if (handlers.reset) {
+                handlers.reset(JSON.parse(event.data).version);
+            }
+        });
+        return source;
+    }
+
+    global.applyGraphDelta = applyGraphDelta;
+    global.watchGraphDeltas = watchGraphDeltas;
+})(typeof window !== 'undefined' ? window : globalThis);